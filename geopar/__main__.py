@@ -0,0 +1,222 @@
+"""
+The GEOPAR command line.
+
+Usage: python -m geopar solve FILE [--index K] [--no-pairing] [--processes N] [--profile TRACE.json] [--proof]
+                             [--changes] [--parametrise] [--integer] [BUDGET]
+       python -m geopar batch FILE [--workers N] [--no-pairing] [--jsonl] [BUDGET]
+       python -m geopar validate FILE [--numpy]
+       python -m geopar bench [benchmark options, see python -m geopar bench --help]
+
+FILE holds configurations in the input.txt format (see README).
+BUDGET is any of --max-seconds S, --max-iterations N, --max-deduced N, limiting each solver run (see TF_Budget).
+Only what a subcommand needs is imported, so that a solve starts within COLD_START_BUDGET:
+NumPy for validate --numpy, multiprocessing for batch with several workers and solve with several processes.
+"""
+
+import argparse
+import os
+import sys
+
+__author__ = 'ebraude'
+
+# Seconds that python -m geopar --help, or a solve or validate of inputs/input.txt, may take
+# from a cold interpreter (see tests/test_main.py)
+COLD_START_BUDGET = 0.5
+
+
+def label_of(a_text):
+    # Returns: the label of the configuration a_text (see TF_CorpusReader.text()), '' if it has none
+
+    lines = a_text.split('\n')
+    number_of_triangles = int(lines[0].split()[0])
+    for line in lines[number_of_triangles + 1:]:
+        if line.strip():
+            return line.strip()
+    return ''
+
+
+def budget_of(arguments):
+    # Returns: a TF_Budget with the limits in arguments, None if there are none
+
+    limits = [arguments.max_seconds, arguments.max_iterations, arguments.max_deduced]
+    if limits == [None, None, None]:
+        return None
+    from geopar.tf_budget import TF_Budget
+    return TF_Budget(*limits)
+
+
+def outcome_line(an_outcome, an_exceeded, some_statistics):
+    # Returns: an_outcome, with some_statistics if a budget ran out (an_exceeded is its reason)
+
+    if not an_exceeded:
+        return an_outcome
+    return '{} ({}): {seconds:.3f}s, {iterations} iterations, {deduced} angles deduced'.format(
+        an_outcome, an_exceeded, **some_statistics)
+
+
+def solve_command(arguments):
+    from geopar.run import Parser, solve
+
+    with open(arguments.file, encoding='utf-8') as file:
+        configurations = Parser(arguments.file).read_configurations_from(file)
+        for _ in range(arguments.index):
+            next(configurations, None)
+        tf = next(configurations, None)
+    if tf is None:
+        print('There is no configuration {} in {}.'.format(arguments.index, arguments.file), file=sys.stderr)
+        return 2
+
+    profiler = None
+    if arguments.profile:
+        from geopar.tf_profiler import TF_Profiler
+        profiler = TF_Profiler()
+
+    derivation = None
+    if arguments.proof:
+        from geopar.tf_derivation import TF_Derivation
+        derivation = TF_Derivation(tf)
+
+    from geopar.tf_writer import TF_Writer
+    with TF_Writer(sys.stdout) as writer:
+        writer.write('Before pre-processing:\n')
+        writer.write_figure(tf)
+        writer.flush()
+
+        premises = TF_Writer.premises(tf)
+        budget = budget_of(arguments)
+        outcome = solve(tf, not arguments.no_pairing, profiler, arguments.processes, budget, derivation,
+                        arguments.integer)
+        exceeded, statistics = (budget.exceeded, budget.statistics()) if budget is not None else (None, None)
+        writer.write('\n' + outcome_line(outcome, exceeded, statistics) + '\n')
+        if arguments.changes:
+            writer.write('Angles deduced:\n')
+            writer.write_changes(tf, premises)
+        else:
+            writer.write('Here is your triangulated figure:\n')
+            writer.write_figure(tf)
+        if derivation is not None:
+            writer.write('\nProof:\n' + derivation.proof() + '\n')
+        if arguments.parametrise and not tf.all_angles_are_known():
+            from geopar.tf_parametrisation import TF_Parametrisation
+            writer.write('\n' + TF_Parametrisation(tf).report() + '\n')
+
+    if profiler is not None:
+        profiler.write_chrome_trace(arguments.profile)
+    return 0
+
+
+def solve_configuration(a_task):
+    # Returns: the record (see tf_results) of the configuration of a_task = (a TF_CorpusReader, k, pairing, arguments)
+
+    from geopar.tf_results import solve_to_record
+
+    reader, k, pairing, arguments = a_task
+    return solve_to_record(k, label_of(reader.text(k)), reader.read(k), pairing, budget_of(arguments))
+
+
+def batch_command(arguments):
+    from geopar.tf_corpus_reader import TF_CorpusReader
+    from geopar.tf_results import TF_ResultsWriter
+
+    # Records are written in order as they are solved, so that memory does not grow with the file
+    with TF_CorpusReader(arguments.file) as reader, TF_ResultsWriter(sys.stdout) as writer:
+        tasks = ((reader, k, not arguments.no_pairing, arguments) for k in range(len(reader)))
+        pool = None
+        if arguments.workers > 1:
+            import multiprocessing
+            pool = multiprocessing.Pool(arguments.workers)
+            records = pool.imap(solve_configuration, tasks, chunksize=max(1, len(reader) // (4 * arguments.workers)))
+        else:
+            records = map(solve_configuration, tasks)
+
+        try:
+            for record in records:
+                if arguments.jsonl:
+                    writer.write(record)
+                else:
+                    print('{}\t{}\t{}'.format(record['index'], record['label'], outcome_line(
+                        record['outcome'], record.get('exceeded'), record['statistics'])))
+        except BrokenPipeError:
+            # the reader of the output (e.g. head) has gone: stop quietly
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+        finally:
+            if pool is not None:
+                pool.terminate()
+    return 0
+
+
+def validate_command(arguments):
+    from geopar.tf_corpus_reader import TF_CorpusReader
+
+    with TF_CorpusReader(arguments.file) as reader:
+        labels = [label_of(reader.text(k)) for k in range(len(reader))]
+        if arguments.numpy:
+            from geopar.tf_batch_validator import TF_BatchValidator
+            valid = TF_BatchValidator.run_all_rules(list(reader))[0].tolist()
+        else:
+            from geopar.tf_validator import TF_Validator
+            valid = [TF_Validator.run_all_rules(tf) for tf in reader]
+
+    for k, (label, is_valid) in enumerate(zip(labels, valid)):
+        print('{}\t{}\t{}'.format(k, label, 'valid' if is_valid else 'invalid'))
+    return 0 if all(valid) else 1
+
+
+def bench_command(arguments, options):
+    from geopar import benchmark
+
+    return benchmark.main(options)
+
+
+def add_budget_options(a_parser):
+    a_parser.add_argument('--max-seconds', type=float, help='stop a solver run after this many seconds')
+    a_parser.add_argument('--max-iterations', type=int, help='stop a solver run after this many fixpoint iterations')
+    a_parser.add_argument('--max-deduced', type=int, help='stop a solver run after deducing this many angles')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m geopar', description='GEOPAR: reasoning on triangulated figures.')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    command = subcommands.add_parser('solve', help='solve one configuration, as run.py does')
+    command.add_argument('file')
+    command.add_argument('--index', type=int, default=0, help='which configuration of the file (from 0)')
+    command.add_argument('--no-pairing', action='store_true', help='stop before angle pairing')
+    command.add_argument('--processes', type=int, default=1, help='processes for the 180 and 360 rules')
+    command.add_argument('--profile', help='write a Chrome trace of the rules applied to this file')
+    command.add_argument('--proof', action='store_true', help='print how every deduced angle was derived')
+    command.add_argument('--changes', action='store_true', help='print only the angles deduced, not the whole figure')
+    command.add_argument('--integer', action='store_true',
+                         help='apply the rules in integers, the figure scaled by the LCM of its denominators')
+    command.add_argument('--parametrise', action='store_true',
+                         help='if inconclusive, print each unknown angle in terms of the fewest free ones')
+    add_budget_options(command)
+    command.set_defaults(function=solve_command)
+
+    command = subcommands.add_parser('batch', help='solve every configuration of a file')
+    command.add_argument('file')
+    command.add_argument('--workers', type=int, default=1)
+    command.add_argument('--no-pairing', action='store_true')
+    command.add_argument('--jsonl', action='store_true', help='write a JSON Lines record per configuration (see tf_results)')
+    add_budget_options(command)
+    command.set_defaults(function=batch_command)
+
+    command = subcommands.add_parser('validate', help='check the rules on every configuration of a file')
+    command.add_argument('file')
+    command.add_argument('--numpy', action='store_true', help='use the vectorised TF_BatchValidator')
+    command.set_defaults(function=validate_command)
+
+    # The options of bench are those of geopar/benchmark.py, which parses them itself
+    command = subcommands.add_parser('bench', help='run the benchmarks (see geopar/benchmark.py)', add_help=False)
+
+    arguments, options = parser.parse_known_args(argv)
+    if arguments.command == 'bench':
+        return bench_command(arguments, options)
+    if options:
+        parser.error('unrecognized arguments: ' + ' '.join(options))
+    return arguments.function(arguments)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
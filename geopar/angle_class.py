@@ -1,13 +1,44 @@
+import threading
 from decimal import Decimal
 from fractions import Fraction
+from math import gcd
 from operator import add, sub
-import copy
 
 from geopar.utilities import to_fraction, GREEK_LETTERS
 
 __author__ = 'satbek'  # modified by Eric Braude starting 03/15/17
 
 
+class AnglesCreated(threading.local):
+    # created: the number of Angles created in the current thread while counting (see start_counting())
+
+    created = 0
+
+
+angles_created = AnglesCreated()
+
+# The number of measurements (see TF_Profiler.measure()) under way in any thread:
+# Angle() counts into angles_created only when it is not 0, so that it costs one test otherwise
+counting = 0
+counting_lock = threading.Lock()
+
+
+def start_counting():
+    # Postcondition: Angle() counts into angles_created until the matching stop_counting()
+
+    global counting
+    with counting_lock:
+        counting += 1
+
+
+def stop_counting():
+    # Postcondition: the measurement of the matching start_counting() is over
+
+    global counting
+    with counting_lock:
+        counting -= 1
+
+
 class Angle:
     """
     A (geometric) angle as linear combination of GREEK_LETTERS with Fraction coefficients.
@@ -30,6 +61,8 @@ class Angle:
         # (Converted): self.coefficients[i] is the Fraction equivalent of
         # some_coefficients[i] for all i in [0, len(some_coefficients))
 
+        if counting:
+            angles_created.created += 1
         self.coefficients = []
         for coefficient in some_coefficients:
             if isinstance(coefficient, (int, float)):
@@ -63,13 +96,16 @@ class Angle:
         3. (Sum returned): Angle with coefficients returned_coefficients is returned
         """
 
+        # --(Scalar): a number changes only the constant term
+        if isinstance(an_angle, (int, float)):
+            if not self.coefficients:
+                return Angle([])
+            return Angle(self.coefficients[:-1] + [self.coefficients[-1] + to_fraction(an_angle)])
+
         # --(Coefficients Obtained)
         given_coefficients = []
         if isinstance(an_angle, Angle):
             given_coefficients = an_angle.get_coefficients()
-        elif isinstance(an_angle, (int, float)):
-            given_coefficients = \
-                [Fraction(0)] * (self.get_dimension() - 1) + [to_fraction(an_angle)]
 
         # --(Coefficients added)
         returned_coefficients = list(map(add, self.coefficients, given_coefficients))
@@ -90,18 +126,22 @@ class Angle:
 
         Returns: whether or not self has the same values as an_angle
         """
-        # --(Converted): as_angle is an Angle with the same value as an_angle
+        # --(Scalar): a number is equal when self is a constant of its value
+        #   (an unknown self is taken as equal to anything, as below)
 
-        as_angle = copy.deepcopy(an_angle)  # to avoid changing the parameter
-        if isinstance(as_angle, (int, float)):
-            as_angle = Angle([to_fraction(0)] * (self.get_dimension() - 1)
-                             + [to_fraction(as_angle)])
+        if isinstance(an_angle, (int, float)):
+            if not self.coefficients:
+                return True
+            for coefficient in self.coefficients[:-1]:
+                if coefficient != 0:
+                    return False
+            return self.coefficients[-1] == to_fraction(an_angle)
 
         # --(Compared):
-        # EITHER self.coefficients same as as_angle.coefficients AND True returned
+        # EITHER self.coefficients same as an_angle.coefficients AND True returned
         # OR False returned
 
-        an_angle_coefficients = as_angle.get_coefficients()
+        an_angle_coefficients = an_angle.get_coefficients()
         for i in range(len(self.coefficients)):
             if self.coefficients[i] != an_angle_coefficients[i]:
                 return False
@@ -138,7 +178,8 @@ class Angle:
         2. (Product returned): Angle with coefficients returned_coefficients is returned
         """
 
-        result_coefs = list(map(lambda x: x * to_fraction(a_number), self.coefficients))
+        factor = to_fraction(a_number)  # converted once, not per coefficient
+        result_coefs = [x * factor for x in self.coefficients]
         return Angle(result_coefs)
 
     def __ne__(self, other):
@@ -171,9 +212,10 @@ class Angle:
         Specifications as for __sub__ except self is second term as in
         int - Angle or float - Angle
         """
-        # an_angle - self = an_angle + negated_self
-        negated_self = Angle(list(map(lambda x: -x, self.coefficients)))
-        return negated_self + an_angle
+        # an_angle - self = an_angle + negated_self, built at once
+        if not self.coefficients:
+            return Angle([])
+        return Angle([-x for x in self.coefficients[:-1]] + [to_fraction(an_angle) - self.coefficients[-1]])
 
     def __str__(self):
         """
@@ -185,29 +227,26 @@ class Angle:
         if not self.is_known():
             return 'x'
 
-        # First n-1 coefficients
-        result = ''
-        for i in range(len(self.coefficients) - 1):
-            a = self.coefficients[i]
-            if a > 0:
-                result += (' + ' + str(a) if a != 1 else ' + ') + GREEK_LETTERS[i]
-            elif a < 0:
-                result += (' - ' + str(abs(a)) if abs(a) != 1 else ' - ') + GREEK_LETTERS[i]
-
-        # Last coefficient
-        a = self.coefficients[-1]
-        if a > 0:
-            result += ' + ' + str(a)
-        elif a < 0:
-            result += ' - ' + str(abs(a))
+        # --(Terms): parts holds ' + ' or ' - ', then the magnitude and the letter,
+        #   of each nonzero term (the magnitude of a variable's term is left out if 1)
+        parts = []
+        last = len(self.coefficients) - 1
+        for i, coefficient in enumerate(self.coefficients):
+            numerator, denominator = coefficient.numerator, coefficient.denominator
+            if numerator == 0:
+                continue
+            parts.append(' + ' if numerator > 0 else ' - ')
+            magnitude = -numerator if numerator < 0 else numerator
+            if i == last or magnitude != 1 or denominator != 1:
+                parts.append(str(magnitude) if denominator == 1 else '{}/{}'.format(magnitude, denominator))
+            if i != last:
+                parts.append(GREEK_LETTERS[i])
+        if not parts:
+            return '0'
 
         # Restore sign before the first coefficient
-        if result[1] == '-':
-            result = '-' + result[3:]
-        elif result[1] == '+':
-            result = result[3:]
-
-        return result
+        parts[0] = '-' if parts[0] == ' - ' else ''
+        return ''.join(parts)
 
     def __sub__(self, an_angle):
         """
@@ -235,15 +274,18 @@ class Angle:
         3. (Sum returned): Angle with coefficients returned_coefficients is returned
         """
 
+        # --(Scalar): a number changes only the constant term
+        if isinstance(an_angle, (int, float)):
+            if not self.coefficients:
+                return Angle([])
+            return Angle(self.coefficients[:-1] + [self.coefficients[-1] - to_fraction(an_angle)])
+
         # --(Coefficients Obtained)
         given_coefficients = []
         if isinstance(an_angle, Angle):
             given_coefficients = an_angle.get_coefficients()
-        elif isinstance(an_angle, (int, float)):
-            given_coefficients = \
-                [Fraction(0)] * (self.get_dimension() - 1) + [to_fraction(an_angle)]
 
-        # --(Coefficients added)
+        # --(Coefficients subtracted)
         returned_coefficients = list(map(sub, self.coefficients, given_coefficients))
 
         # --(Sum returned)
@@ -269,8 +311,8 @@ class Angle:
 
         2. (Quotient returned): Angle with coefficients returned_coefficients is returned
         """
-        returned_coefficients = \
-            list(map(lambda x: x / to_fraction(a_number), self.coefficients))
+        divisor = to_fraction(a_number)  # converted once, not per coefficient
+        returned_coefficients = [x / divisor for x in self.coefficients]
         return Angle(returned_coefficients)
 
     @classmethod
@@ -302,6 +344,52 @@ class Angle:
 
         return Angle(fraction_coefficients)
 
+    @staticmethod
+    def sum(angles):
+        """
+        Intent: The sum of angles, accumulated in one buffer of integer numerators over a common
+        denominator, so that only the returned Angle (and its Fractions) is allocated
+
+        Precondition: every element of angles is an Angle, int or float
+        Returns: EITHER 0 if angles is empty, as sum() does
+                 OR Angle([]) if any of angles is unknown, as with +
+                 OR Angle([their sum]) if angles are all numbers
+                 OR the Angle that adding angles one by one with + would return
+        """
+
+        numerators, denominator, length = None, 1, None
+        constant = 0  # the sum of the numbers among angles
+        for angle in angles:
+            if not isinstance(angle, Angle):
+                constant += to_fraction(angle)
+                continue
+            coefficients = angle.coefficients
+            if not coefficients:
+                return Angle([])
+
+            # --(Sized): numerators has the length of the shortest angle so far, as map(add, ...) does
+            if numerators is None:
+                numerators, length = [0] * len(coefficients), len(coefficients)
+            elif len(coefficients) < length:
+                length = len(coefficients)
+                del numerators[length:]
+
+            # --(Added): numerators[i] / denominator is the sum so far of the coefficients i
+            for i in range(length):
+                coefficient = coefficients[i]
+                if denominator % coefficient.denominator:
+                    scale = coefficient.denominator // gcd(denominator, coefficient.denominator)
+                    denominator *= scale
+                    for j in range(length):
+                        numerators[j] *= scale
+                numerators[i] += coefficient.numerator * (denominator // coefficient.denominator)
+
+        if numerators is None:
+            return Angle([constant]) if constant else 0
+        coefficients = [Fraction(numerator, denominator) for numerator in numerators]
+        coefficients[-1] += constant
+        return Angle(coefficients)
+
     def get_coefficients(self):
         return self.coefficients
 
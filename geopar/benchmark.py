@@ -0,0 +1,224 @@
+"""
+Benchmarks of the stages of GEOPAR: parsing, the 180, 360 and pairing rules,
+validation and get_id(), on the configurations in inputs/input.txt and on synthetic figures
+of increasing size, and the throughput of Parser on a large generated file.
+
+Usage: python -m geopar.benchmark [--sizes 10 100 1000 10000] [--parse-triangles 100000] [--output new.json]
+                                  [--compare old.json] [--threshold 0.25]
+With --compare, every stage that got slower than old.json by more than the threshold
+is reported and the exit status is 1.
+"""
+
+import argparse
+import copy
+import io
+import json
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+
+from geopar.angle_class import Angle
+from geopar.run import Parser
+from geopar.tf_elaborations_class import TF_Elaborations
+from geopar.tf_generator import TF_Generator
+from geopar.tf_validator import TF_Validator
+
+__author__ = 'ebraude'
+
+INPUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'inputs', 'input.txt')
+SIZES = [10, 100, 1000, 10000]
+STAGES = ['parse', 'rule_180', 'rule_360', 'pairing', 'validation', 'get_id']
+
+
+def read_shapes(a_path=INPUT_PATH):
+    """
+    Returns: a list of (label, text) for every configuration in the file at a_path,
+    where text is the configuration in the input.txt format and label is the line after it
+    """
+
+    with open(a_path, encoding='utf-8') as file:
+        lines = file.read().split('\n')
+
+    shapes, i = [], 0
+    while i < len(lines):
+        header = re.match(r'^\s*(\d+)\s+(\d+)\s*$', lines[i])
+        if not header:
+            i += 1
+            continue
+        end = i + 1 + int(header.group(1))
+        label = lines[end].strip() if end < len(lines) else ''
+        shapes.append((label or 'configuration {}'.format(len(shapes) + 1),
+                       '\n'.join(lines[i:end]) + '\n'))
+        i = end
+    return shapes
+
+
+def synthetic_shapes(sizes=SIZES, seed=0, dimension=4):
+    """
+    Returns: a list of (label, text) of a complete TF_Generator figure for each size in sizes
+    """
+
+    shapes = []
+    for size in sizes:
+        figure = TF_Generator(seed=seed, dimension=dimension).generate(size)
+        shapes.append(('synthetic {}'.format(size), TF_Generator.format_configuration(figure, dimension)))
+    return shapes
+
+
+def hide_angles(a_tf, a_ratio, a_seed=0):
+    """
+    Returns: a copy of a_tf in which a_ratio of the known angles are unknown
+    """
+
+    result = copy.deepcopy(a_tf)
+    corners = [(triangle, i) for triangle in result.get_triangles()
+               for i in range(3) if triangle.get_angles()[i].is_known()]
+    for triangle, i in random.Random(a_seed).sample(corners, round(a_ratio * len(corners))):
+        triangle.set_angle_by_index(i, Angle([]))
+    return result
+
+
+def best_time(a_function, a_setup, a_repeat):
+    """
+    Returns: the least time in seconds of a_repeat calls a_function(a_setup()),
+    a_setup() not being timed
+    """
+
+    best = None
+    for _ in range(a_repeat):
+        argument = a_setup()
+        start = time.perf_counter()
+        a_function(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark_shape(a_text, a_repeat=3, an_unknown_ratio=0.3):
+    """
+    Returns: {stage: seconds} for every stage in STAGES, for the configuration a_text.
+    The rules run once each on a copy of the figure with an_unknown_ratio of its angles hidden
+    """
+
+    def parse(text):
+        return Parser('').read_configuration_from(io.StringIO(text))
+
+    figure = parse(a_text)
+    hidden = hide_angles(figure, an_unknown_ratio)
+
+    return {
+        'parse': best_time(parse, lambda: a_text, a_repeat),
+        'rule_180': best_time(TF_Elaborations.apply_180_rule_to, lambda: copy.deepcopy(hidden), a_repeat),
+        'rule_360': best_time(TF_Elaborations.apply_360_rule_to, lambda: copy.deepcopy(hidden), a_repeat),
+        'pairing': best_time(TF_Elaborations.apply_pairing_to, lambda: copy.deepcopy(hidden), a_repeat),
+        'validation': best_time(TF_Validator.run_all_rules, lambda: figure, a_repeat),
+        'get_id': best_time(lambda tf: tf.get_id(), lambda: figure, a_repeat),
+    }
+
+
+def benchmark_parse_throughput(number_of_triangles=100000, a_repeat=3, a_figure_size=1000):
+    """
+    Intent: Time Parser on a large input file of generated configurations
+
+    Returns: {'parse_file': seconds, 'triangles_per_second': ..., 'megabytes_per_second': ...}
+    for reading all configurations of a file with number_of_triangles triangles in all,
+    a_figure_size per configuration, about 20% of the angles unknown
+    """
+
+    generator = TF_Generator(seed=0, dimension=4)
+    triangles = max(1, number_of_triangles // a_figure_size) * a_figure_size
+
+    def parse_all(a_path):
+        with open(a_path, encoding='utf-8') as file:
+            for _ in Parser('').read_configurations_from(file):
+                pass
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'input.txt')
+        with open(path, 'w', encoding='utf-8') as file:
+            for i in range(max(1, number_of_triangles // a_figure_size)):
+                figure = generator.generate(a_figure_size, unknown_ratio=0.2, flips=0)
+                file.write(TF_Generator.format_configuration(figure, 4, 'generated {}'.format(i)))
+        megabytes = os.path.getsize(path) / 1e6
+        seconds = best_time(parse_all, lambda: path, a_repeat)
+    return {'parse_file': seconds, 'triangles_per_second': triangles / seconds,
+            'megabytes_per_second': megabytes / seconds}
+
+
+def run_benchmarks(shapes, a_repeat=3, a_log=None, parse_triangles=0):
+    """
+    Returns: the results for shapes, a list of (label, text), as a JSON-ready dict,
+    with the parse throughput for parse_triangles triangles unless that is 0
+    """
+
+    results = {}
+    for label, text in shapes:
+        results[label] = benchmark_shape(text, a_repeat)
+        if a_log:
+            a_log.write('{:<28}'.format(label) + ' '.join(
+                '{}={:.6f}'.format(stage, results[label][stage]) for stage in STAGES) + '\n')
+
+    if parse_triangles:
+        label = 'parse throughput {}'.format(parse_triangles)
+        results[label] = benchmark_parse_throughput(parse_triangles, a_repeat)
+        if a_log:
+            a_log.write('{:<28}parse_file={parse_file:.6f} ({triangles_per_second:.0f} triangles/s, '
+                        '{megabytes_per_second:.2f} MB/s)\n'.format(label, **results[label]))
+
+    return {'meta': {'python': platform.python_version(), 'repeat': a_repeat,
+                     'time': time.strftime('%Y-%m-%dT%H:%M:%S')},
+            'results': results}
+
+
+def compare(old, new, a_threshold):
+    """
+    PRE: old and new are results of run_benchmarks()
+    Returns: a list of (label, stage, old seconds, new seconds) for every stage that is
+    in both and took more than (1 + a_threshold) times as long in new as in old
+    """
+
+    regressions = []
+    for label, stages in new['results'].items():
+        for stage, seconds in stages.items():
+            if stage.endswith('_per_second'):
+                continue  # rates, not times
+            before = old['results'].get(label, {}).get(stage)
+            if before is not None and seconds > before * (1 + a_threshold):
+                regressions.append((label, stage, before, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m geopar.benchmark', description=__doc__.split('\n')[1])
+    parser.add_argument('--input', default=INPUT_PATH, help='configurations to benchmark')
+    parser.add_argument('--sizes', type=int, nargs='*', default=SIZES, help='synthetic figure sizes')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--parse-triangles', type=int, default=100000,
+                        help='triangles in the generated file for parse throughput (0: skip)')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown, e.g. 0.25 = 25%%')
+    arguments = parser.parse_args(argv)
+
+    results = run_benchmarks(read_shapes(arguments.input) + synthetic_shapes(arguments.sizes),
+                             arguments.repeat, sys.stdout, arguments.parse_triangles)
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            regressions = compare(json.load(file), results, arguments.threshold)
+        for label, stage, before, after in regressions:
+            print('REGRESSION {} {}: {:.6f}s -> {:.6f}s'.format(label, stage, before, after))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,15 @@
 from geopar.triangulated_figure_class import TriangulatedFigure
 from geopar.triangle_class import Triangle
 from geopar.tf_validator import TF_Validator
+from geopar.tf_topology_validator import TF_TopologyValidator
 from geopar.tf_elaborations_class import TF_Elaborations
+from geopar.tf_budget import TF_BudgetExceeded
 from geopar.angle_class import Angle
 from fractions import Fraction
+from functools import partial
 from itertools import islice
-from geopar.utilities import find_str_occurrences
+import os
+import re
 
 """
 note: check input for correctness
@@ -19,6 +23,29 @@ greek_names = ['alpha', 'beta', 'gamma', 'delta', 'epsilon']
 greek_symbols = ['α', 'β', 'γ', 'δ', 'ε']
 latin_symbols = ['a', 'b', 'c', 'd', 'e']
 
+# VARIABLE_INDEX[v] is the index of variable v in the coefficients of an Angle (0 for alpha, 1 for beta, etc.)
+VARIABLE_INDEX = {}
+for names in (['\\' + name for name in greek_names], greek_symbols, latin_symbols):
+    VARIABLE_INDEX.update((name, index) for index, name in enumerate(names))
+
+# Fractions of the integers most common as coefficients, shared rather than created for each term
+INTEGER_FRACTIONS = {n: Fraction(n) for n in range(-360, 361)}
+
+# The first line of a configuration: number of triangles, dimension of angles
+HEADER_PATTERN = re.compile(r'^\s*\d+\s+\d+\s*$')
+
+# The outcomes of solve(), as run() reports them
+UNIQUE = '1B. UNIQUE ALL-ANGLE CONSEQUENCE OF THE PREMISES.'
+INCONCLUSIVE_1 = 'INCONCLUSIVE (1)'
+INCONCLUSIVE_1A = '1A. INCONCLUSIVE'
+CONSEQUENCE = '2. A CONSEQUENCE OF THE PREMISES.'
+INCONCLUSIVE_2 = 'INCONCLUSIVE (2)'
+BUDGET_EXCEEDED = 'BUDGET EXCEEDED'
+
+# A term of an angle: [sign] [coefficient] [variable], with spaces allowed around each part.
+# The coefficient is an integer, decimal or fraction (2, 2.5, .5, 1/2); without a variable it is the constant
+TERM_PATTERN = re.compile(r'\s*([+-])?\s*(?:(\d+(?:\.\d*)?|\.\d+)(?:/(\d+))?)?\s*(\\[a-z]+|[^\W\d_])?\s*')
+
 
 class Parser(object):
     """
@@ -36,23 +63,48 @@ class Parser(object):
         with a bunch of configurations
         """
 
-        file = open('../inputs/' + self.__path_to_file, encoding='utf-8')
-        settings = file.readline()
+        with open(self.__path_to_file, encoding='utf-8') as file:
+            return self.read_configuration_from(file)
+
+    def read_configuration_from(self, a_file):
+        """
+        reads the __configuration that starts at the current line
+        of a_file (a text file or file-like object)
+        """
+
+        return self.__read_configuration(a_file.readline(), a_file)
+
+    def read_configurations_from(self, a_file):
+        """
+        yields, in order, every __configuration in a_file from its current line on;
+        lines outside configurations (e.g., labels) are skipped
+        """
+
+        for line in a_file:
+            if HEADER_PATTERN.match(line):
+                yield self.__read_configuration(line, a_file)
+
+    def __read_configuration(self, settings, a_file):
+        """
+        reads the __configuration whose first line, settings, was just read from a_file
+        """
+
         self.__num_lines, self.__num_vars = map(int, settings.split())
-        self.__configuration = list(islice(file, self.__num_lines))
+        self.__configuration = list(islice(a_file, self.__num_lines))
 
         return self.__process_configuration()
 
     def __process_configuration(self):
         """
         processes all lines in a __configuration
-        and returns a triangulated figure
+        and returns a triangulated figure, once TF_TopologyValidator finds nothing wrong with it
         """
 
         figure = TriangulatedFigure()
         for line in self.__configuration:
             figure.add(self.__process_triangle(line))
 
+        TF_TopologyValidator.check(figure)
         return figure
 
     def __process_triangle(self, a_triangle):
@@ -67,19 +119,7 @@ class Parser(object):
         points, angles = a_triangle.split(';')
 
         # processing angles
-        angles = angles.split(',')
-
-        for i in range(len(angles)):
-            angles[i] = angles[i].strip()
-
-            if angles[i] == 'x':
-                pass  # do nothing
-            elif angles[i][0] != '-':
-                angles[i] = '+' + angles[i]
-
-        processed_angles = list()
-        for i in range(len(angles)):
-            processed_angles.append(self.__process_angle(angles[i]))
+        processed_angles = [self.__process_angle(angle) for angle in angles.split(',')]
 
         # processing points
         points = list(map(int, points.split(',')))
@@ -88,124 +128,194 @@ class Parser(object):
 
     def __process_angle(self, an_angle):
         """
-        processes an_angle
+        processes an_angle in a single pass over its terms
+        (see TERM_PATTERN), e.g.
 
-        +\alpha + \beta - 90
+        \alpha + \beta - 90, -1/3α + 2.5b - 45, x
         """
 
+        an_angle = an_angle.strip()
+
         # processing unknown angle
         if an_angle == 'x':
             return Angle([])
 
-        # signs_at contains indices of + and -
-        signs_at = find_str_occurrences(an_angle, '+')
-        signs_at.extend(find_str_occurrences(an_angle, '-'))
-        signs_at = sorted(signs_at)
-
-        # stops_at
-        stops_at = signs_at.copy()
-        stops_at.append(len(an_angle))
-
-        # contains signs in order
-        # ['-', '+', '+', '-', '-', '+'] for -a+b+c-d-e+1
-        signs = list()
-
-        # contains terms in order
-        # ['a', 'b', 'c', 'd', 'e', '1'] for -a+b+c-d-e+1
-        terms = list()
-
-        for i in range(len(stops_at) - 1):
-            signs.append(an_angle[signs_at[i]])
-            terms.append(an_angle[ (stops_at[i] + 1) : stops_at[i + 1 ]].strip())
+        constant_index = self.__num_vars - 1
+        numerators, divisors = [0] * self.__num_vars, [1] * self.__num_vars
+        position, end = 0, len(an_angle)
 
-        # print('an angle is {}'.format(an_angle))
+        while position < end:
+            term = TERM_PATTERN.match(an_angle, position)
+            sign, number, denominator, variable = term.groups()
 
-        coefs = list()
-        term_inds = list()
+            # making sure that the term is legal: something was read, and terms after the first are signed
+            if term.end() == position or (number is None and variable is None) \
+                    or (sign is None and position > 0):
+                raise Exception('wrong input: ' + an_angle[position:])
+            position = term.end()
 
-        for i in range(len(terms)):
-            c, t = self.__process_term(terms[i])
-            coefs.append(c)
-            term_inds.append(t)
-            # print('\t sign = {}, term = {} ==> coef: {}, term: {}'.format(signs[i], terms[i], c, t))
-
-        angle_coefs = [Fraction(0)] * self.__num_vars
-        for i in range(len(term_inds)):
-            angle_coefs[term_inds[i]] += Fraction(signs[i] + coefs[i])
-
-        return Angle(angle_coefs)
+            # coefficient as numerator / divisor, 1 when only a variable is given
+            if number is None:
+                numerator, divisor = 1, 1
+            else:
+                integer, point, decimals = number.partition('.')
+                numerator, divisor = int(integer + decimals), 10 ** len(decimals)
+            if denominator is not None:
+                divisor *= int(denominator)
+            if sign == '-':
+                numerator = -numerator
+
+            # converting the variable to its integer alternative: 0 for alpha, 1 for beta, etc
+            if variable is None:
+                index = constant_index
+            else:
+                index = VARIABLE_INDEX.get(variable)
+                if index is None:
+                    raise Exception('wrong input: ' + variable)
 
-    def __process_term(self, a_term):
-        """process
+                # confirming that user does not provide too many variables
+                if index >= constant_index:
+                    raise Exception('Too many variables provided!')
 
-        ['\alpha', '\beta', '\gamma', '\delta', '\epsilon']
-        ['α', 'β', 'γ', 'δ', 'ε']
-        ['a', 'b', 'g', 'd', 'e']
+            # adding numerator / divisor to the coefficient, kept as numerators[index] / divisors[index]
+            if divisors[index] == divisor:
+                numerators[index] += numerator
+            else:
+                numerators[index] = numerators[index] * divisor + numerator * divisors[index]
+                divisors[index] *= divisor
 
-        together with a_term's coefficient
+        coefficients = []
+        for n, d in zip(numerators, divisors):
+            coefficient = INTEGER_FRACTIONS.get(n) if d == 1 else None
+            coefficients.append(Fraction(n, d) if coefficient is None else coefficient)
+        return Angle(coefficients)
 
-        POST: (coef, term) pair returned
-        where coef is str and term is int
-        """
-        if '\\' in a_term:
-            # \alpha style
 
-            # forcing 1 as a coefficient
-            if a_term.startswith('\\'):
-                a_term = '1' + a_term
+def elaborate(a_tf, rule_names, a_phase='', profiler=None, processes=1, budget=None, derivation=None, integer=False):
+    """
+    Intent: Apply the TF_Elaborations rules named in rule_names, in turn,
+    until they produce no further angles on a_tf
+
+    PRE: profiler is None or a TF_Profiler, which then records every rule applied
+    When rule_names are the 180 and 360 rules only, processes > 1 (and no profiler or budget)
+    computes the same fixpoint with TF_ParallelElaborations
+    budget is None or a TF_Budget, charged with every iteration and passed to the rules;
+    TF_BudgetExceeded is raised when it runs out, leaving a_tf with the angles deduced so far.
+    With a budget, a_tf is given a TF_Topology (in O(n)) while the rules run if it has none,
+    so that no step between two checks of the budget takes more than linear time
+    derivation is None or a TF_Derivation of a_tf, in which every angle deduced is recorded
+    integer (and no profiler, budget or derivation) computes the same fixpoint in integers,
+    with TF_IntegerElaborations, unless the parallel rules apply
+    """
 
-            coef, term = a_term.split('\\')
+    if processes > 1 and profiler is None and budget is None and derivation is None and \
+            set(rule_names) == {'apply_180_rule_to', 'apply_360_rule_to'}:
+        from geopar.tf_parallel_elaborations import TF_ParallelElaborations
+        TF_ParallelElaborations.apply_180_360_rules_to(a_tf, processes)
+        return
 
-            # making sure that a_term is legal
-            if term not in greek_names:
-                raise Exception('wrong input: ' + term)
+    if integer and profiler is None and budget is None and derivation is None:
+        from geopar.tf_integer_elaborations import TF_IntegerElaborations
+        TF_IntegerElaborations.apply_rules_to(a_tf, rule_names)
+        return
 
-            # converting a_term to its integer alternative
-            # 0 for alpha, 1 for beta, etc
-            term = greek_names.index(term)
+    examined = {}
+    if profiler is not None:
+        examined['apply_180_rule_to'] = len(a_tf.get_triangles())
+        examined['apply_360_rule_to'] = examined['apply_pairing_to'] = len(a_tf.get_interior_points())
+
+    attached = False
+    if budget is not None:
+        budget.check()
+        if a_tf.get_topology() is None:
+            from geopar.tf_topology import TF_Topology
+            a_tf.set_topology(TF_Topology(a_tf))
+            attached = True
+        budget.check()
+
+    rules = [getattr(TF_Elaborations, name) for name in rule_names]
+    if budget is not None or derivation is not None:
+        rules = [partial(rule, budget=budget, derivation=derivation) for rule in rules]
+    try:
+        old_a_tf_state, new_a_tf_state = 0, a_tf.get_id()  # before/after computing present state
+        while old_a_tf_state != new_a_tf_state:
+            old_a_tf_state = new_a_tf_state
+            if budget is not None:
+                budget.begin_iteration()
+            if profiler is None:
+                for rule in rules:
+                    rule(a_tf)
+            else:
+                profiler.begin_iteration(a_phase)
+                for name, rule in zip(rule_names, rules):
+                    profiler.measure(name, rule, a_tf, examined[name])
+            if budget is not None:
+                budget.check()
+            new_a_tf_state = a_tf.get_id()
+    finally:
+        if attached:
+            a_tf.set_topology(None)
+
+def validate(a_tf, profiler=None):
+    """
+    Returns: TF_Validator.run_all_rules(a_tf)
 
-            # confirming that user does not provide too many variables
-            if term >= self.__num_vars:
-                raise Exception('Too many variables provided!')
+    PRE: profiler is None or a TF_Profiler, which then records every validation rule applied
+    """
 
-            # print('\t\t', a_term, coef, term)
+    if profiler is None:
+        return TF_Validator.run_all_rules(a_tf)
 
-            return coef, term
-        else:
-            # α and a style
-            # a, α, 2a, 10a, 2, 10, 100/3, 10.5, 100/3a, 10.5a
+    profiler.phase, profiler.iteration = 'validation', 0
+    interior_points = len(a_tf.get_interior_points())
+    return profiler.measure('check_180_rule', TF_Validator.check_180_rule, a_tf, len(a_tf.get_triangles())) \
+        and profiler.measure('check_360_rule', TF_Validator.check_360_rule, a_tf, interior_points) \
+        and profiler.measure('check_pairing', TF_Validator.check_pairing, a_tf, interior_points)
 
-            # forcing 1 as a coefficient
-            if len(a_term) == 1 and a_term.isalpha():
-                a_term = '1' + a_term
 
-            if a_term[-1].isalpha():
-                coef, term = a_term[:-1], a_term[-1]
+def solve(a_tf, pairing=True, profiler=None, processes=1, budget=None, derivation=None, integer=False):
+    """
+    Intent: run() without the console: deduce what a_tf's premises imply
 
-                # making sure that a_term is legal
-                if term not in greek_symbols + latin_symbols:
-                    raise Exception('wrong input:', term)
+    PRE: profiler and processes are as in run(); budget, derivation and integer are as in elaborate()
+    Returns: UNIQUE or INCONCLUSIVE_1 if the 180 and 360 rules make all angles known,
+    otherwise INCONCLUSIVE_1A if not pairing, otherwise solve_by_pairing(a_tf, profiler, budget);
+    BUDGET_EXCEEDED if budget ran out first (budget.exceeded and budget.statistics() tell how)
+    POST: a_tf holds the angles deduced
+    """
 
-                # converting a_term to its integer alternative
-                # 0 for alpha, 1 for beta, etc
-                if term in greek_symbols:
-                    term = greek_symbols.index(term)
-                elif term in latin_symbols:
-                    term = latin_symbols.index(term)
+    try:
+        elaborate(a_tf, ['apply_180_rule_to', 'apply_360_rule_to'], 'before pairing', profiler, processes, budget,
+                  derivation, integer)
+    except TF_BudgetExceeded:
+        return BUDGET_EXCEEDED
+    if a_tf.all_angles_are_known():
+        return UNIQUE if validate(a_tf, profiler) else INCONCLUSIVE_1
+    if not pairing:
+        return INCONCLUSIVE_1A
+    return solve_by_pairing(a_tf, profiler, budget, derivation, integer)
 
-                # confirming that user does not provide too many variables
-                if term >= self.__num_vars:
-                    raise Exception('Too many variables provided!')
-            else:
-                coef, term = a_term, self.__num_vars - 1
 
-            # print('\t\t a_term = {}, coef = {}, term = {}'.format(a_term, coef, term))
+def solve_by_pairing(a_tf, profiler=None, budget=None, derivation=None, integer=False):
+    """
+    Intent: Apply pairing, 180, and 360 rules until no new angles are deduced
+    Returns: CONSEQUENCE if then all angles are known and valid, INCONCLUSIVE_2 otherwise;
+    BUDGET_EXCEEDED if budget ran out first
+    """
 
-            return coef, term
+    try:
+        elaborate(a_tf, ['apply_pairing_to', 'apply_180_rule_to', 'apply_360_rule_to'], 'pairing', profiler,
+                  budget=budget, derivation=derivation, integer=integer)
+    except TF_BudgetExceeded:
+        return BUDGET_EXCEEDED
+    return CONSEQUENCE if a_tf.all_angles_are_known() and validate(a_tf, profiler) else INCONCLUSIVE_2
 
 
-def run(a_tf):
+def run(a_tf, profiler=None, processes=1):
     '''
+    PRE: profiler is None or a TF_Profiler, which then records every rule applied (see elaborate())
+    processes > 1 runs step 1 in parallel (see elaborate())
+
     Postconditions:
     1. (Completed before pairing): 180 and 360 rules produce no further angles on given a_tf
     2. (All known?): EITHER NOT a_tf.all_angles_are_known() AND this did not return
@@ -217,33 +327,22 @@ def run(a_tf):
     6. Validity of a_tf is on the console
     '''
 
-    # --1. (Completed before pairing)
-
-    old_a_tf_state, new_a_tf_state = 0, a_tf.get_id()  # before/after computing present state
-    preprocessor = TF_Elaborations()
-    while old_a_tf_state != new_a_tf_state:
-        old_a_tf_state = a_tf.get_id()
-        preprocessor.apply_180_rule_to(a_tf)
-        preprocessor.apply_360_rule_to(a_tf)
-        new_a_tf_state = a_tf.get_id()
+    # --1. (Completed before pairing) AND 2. (All angles?)
 
-    # --2. (All angles?)
-
-    validator = TF_Validator()
-    if a_tf.all_angles_are_known():
-        # 180, 360, and pairing valid?
-        if validator.run_all_rules(a_tf):
-            print('-------------------------')
-            print("Pre-process complete.")
-            print('-------------------------')
-            print("Here is your triangulated figure:")
-            print(a_tf)
-            print("1B. UNIQUE ALL-ANGLE CONSEQUENCE OF THE PREMISES.")
-        else:
-            print('-------------------------')
-            print("Pre-process complete.")
-            print('-------------------------')
-            print('INCONCLUSIVE (1)')
+    outcome = solve(a_tf, False, profiler, processes)
+    if outcome == UNIQUE:
+        print('-------------------------')
+        print("Pre-process complete.")
+        print('-------------------------')
+        print("Here is your triangulated figure:")
+        print(a_tf)
+        print(UNIQUE)
+        return
+    if outcome == INCONCLUSIVE_1:
+        print('-------------------------')
+        print("Pre-process complete.")
+        print('-------------------------')
+        print(INCONCLUSIVE_1)
         return
 
     # --3. (Queried)
@@ -261,52 +360,43 @@ def run(a_tf):
         print('-------------------------')
         print("Pre-process complete.")
         print('-------------------------')
-        print('1A. INCONCLUSIVE')
+        print(INCONCLUSIVE_1A)
         print("Here is your triangulated figure:")
         print(a_tf)
         return
 
     # --5. (Yes)
 
-    # Apply pairing, 180, and 360 rules until no new angles deduced
-    old_a_tf_state, new_a_tf_state = 0, a_tf.get_id()  # before/after computing present state
-    preprocessor = TF_Elaborations()
-    while old_a_tf_state != new_a_tf_state:
-        old_a_tf_state = a_tf.get_id()
-        preprocessor.apply_pairing_to(a_tf)
-        preprocessor.apply_180_rule_to(a_tf)
-        preprocessor.apply_360_rule_to(a_tf)
-        new_a_tf_state = a_tf.get_id()
-
     # All angles known; 180, 360, and pairing valid?
-    if a_tf.all_angles_are_known() and validator.run_all_rules(a_tf):
+    if solve_by_pairing(a_tf, profiler) == CONSEQUENCE:
         print('-------------------------')
         print("Pre-process complete.")
         print('-------------------------')
-        print("2. A CONSEQUENCE OF THE PREMISES.")
+        print(CONSEQUENCE)
         print("Here is your triangulated figure:")
         print(a_tf)
     else:
         print('-------------------------')
         print("Pre-process complete.")
         print('-------------------------')
-        print("INCONCLUSIVE (2)")
+        print(INCONCLUSIVE_2)
         print("Here is your triangulated figure:")
         print(a_tf)
 
 
-# "Pre-processing" stage
-p = Parser('input.txt')
-triangulated_figure = p.read_first_configuration()
+if __name__ == '__main__':
+    # "Pre-processing" stage
+    p = Parser(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'inputs', 'input.txt'))
+    triangulated_figure = p.read_first_configuration()
 
-print('-------------------------')
-print('Before pre-processing:')
-print('-------------------------')
-print("Here is your triangulated figure:")
-print(triangulated_figure)
+    print('-------------------------')
+    print('Before pre-processing:')
+    print('-------------------------')
+    print("Here is your triangulated figure:")
+    print(triangulated_figure)
 
-print('-------------------------')
-print('Pre-process is running...')
-print('-------------------------')
+    print('-------------------------')
+    print('Pre-process is running...')
+    print('-------------------------')
 
-run(triangulated_figure)
+    run(triangulated_figure)
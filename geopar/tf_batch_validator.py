@@ -0,0 +1,215 @@
+from math import gcd
+
+import numpy as np
+
+__author__ = 'ebraude'
+
+
+class TF_Stack(object):
+    """
+    Intent: Many TriangulatedFigures stacked into padded integer coefficient arrays
+
+    Class Invariants:
+    1. self.coefficients is an int64 array of shape (number of corners, self.dimension);
+       row 3*t + s holds the angle of slot s of the t-th stacked triangle, multiplied
+       by the scale of its figure so that every entry is an integer.
+       The last column holds the constant term; unused variable columns are 0.
+    2. self.known[r] is whether corner r is known (unknown rows are all 0)
+    3. self.triangle_starts[f] is the index of the first triangle of figure f
+    4. self.fan_corners lists, fan by fan, the corner rows subtended at interior points;
+       self.fan_starts[k] is where fan k begins in it and self.fan_figures[k] its figure
+    5. self.following / self.preceding list, fan by fan, the rows of the corners that
+       follow / precede the interior point of the fan (segments as in self.fan_starts)
+    6. self.straight[f] = 180 * scale of figure f
+    """
+
+    def __init__(self, figures):
+        """
+        PRE: every element of figures is a non-empty TriangulatedFigure
+
+        POST: the class invariants hold for figures, in their given order
+        """
+
+        figures = list(figures)
+        self.number_of_figures = len(figures)
+
+        # --(Dimension): self.dimension is the largest dimension of any known angle
+        self.dimension = 1
+        for figure in figures:
+            if figure.is_empty():
+                raise Exception('A triangulated figure is empty! See precondition in TF_Stack().')
+            for triangle in figure.get_triangles():
+                for angle in triangle.get_angles():
+                    self.dimension = max(self.dimension, angle.get_dimension())
+
+        rows, known, straight, triangle_starts = [], [], [], []
+        fan_corners, fan_starts, fan_figures = [], [], []
+        following, preceding = [], []
+
+        for figure_index, figure in enumerate(figures):
+
+            # --(Scaled): scale is the lcm of all denominators in figure
+            scale = 1
+            for triangle in figure.get_triangles():
+                for angle in triangle.get_angles():
+                    for coefficient in angle.get_coefficients():
+                        denominator = coefficient.denominator
+                        scale = scale * denominator // gcd(scale, denominator)
+            straight.append(180 * scale)
+
+            # --(Corners): one padded row per corner; row_of maps (id(triangle), point) to its row
+            first_row = len(rows)
+            triangle_starts.append(first_row // 3)
+            row_of = {}
+            for triangle in figure.get_triangles():
+                for point, angle in zip(triangle.get_points(), triangle.get_angles()):
+                    row_of[(id(triangle), point)] = len(rows)
+                    rows.append(self.__padded(angle, scale))
+                    known.append(angle.is_known())
+
+            # --(Fans): corners at, following and preceding every interior point
+            for point in figure.get_interior_points():
+                fan_starts.append(len(fan_corners))
+                fan_figures.append(figure_index)
+                for triangle in figure.triangles_at(point):
+                    fan_corners.append(row_of[(id(triangle), point)])
+                    following.append(row_of[(id(triangle), triangle.point_following(point))])
+                    preceding.append(row_of[(id(triangle), triangle.point_preceding(point))])
+
+        # int64 sums must not overflow: a fan never has more corners than the whole stack
+        largest = max((abs(c) for row in rows for c in row), default=0)
+        if largest * max(len(rows), 1) >= 2 ** 62:
+            raise Exception('Coefficients too large for TF_Stack; use TF_Validator instead.')
+
+        self.coefficients = np.array(rows, dtype=np.int64).reshape(len(rows), self.dimension)
+        self.known = np.array(known, dtype=bool)
+        self.straight = np.array(straight, dtype=np.int64)
+        self.triangle_starts = np.array(triangle_starts, dtype=np.intp)
+        self.fan_corners = np.array(fan_corners, dtype=np.intp)
+        self.fan_starts = np.array(fan_starts, dtype=np.intp)
+        self.fan_figures = np.array(fan_figures, dtype=np.intp)
+        self.following = np.array(following, dtype=np.intp)
+        self.preceding = np.array(preceding, dtype=np.intp)
+
+    def __padded(self, an_angle, a_scale):
+        # Returns: an_angle's coefficients times a_scale as ints, padded to self.dimension
+        # with the constant term last; [0, ..., 0] if an_angle is unknown
+
+        row = [0] * self.dimension
+        coefficients = an_angle.get_coefficients()
+        if coefficients:
+            for i, coefficient in enumerate(coefficients[:-1]):
+                row[i] = int(coefficient * a_scale)
+            row[-1] = int(coefficients[-1] * a_scale)
+        return row
+
+
+class TF_BatchValidator(object):
+    """
+    The validation rules of TF_Validator, evaluated for many TriangulatedFigures at once
+    with vectorised reductions over a TF_Stack.
+
+    The verdicts are those of TF_Validator: an unknown angle compares equal to anything, so a
+    triangle or interior point with an unknown angle passes the 180 or 360 rule, and pairing holds at
+    an interior point when the known "following" angles there are the same multiset as the known
+    "preceding" angles (as in TF_Validator.check_pairing).
+    """
+
+    PASSED, RULE_180, RULE_360, RULE_PAIRING = -1, 0, 1, 2
+
+    @staticmethod
+    def run_all_rules(figures):
+        """
+        Precondition: every element of figures is a non-empty TriangulatedFigure
+
+        Returns: (valid, first_failing_rule), two arrays with one entry per figure:
+        valid[f] is whether figure f passes all rules, and first_failing_rule[f] is
+        the first of RULE_180, RULE_360, RULE_PAIRING that figure f fails, or PASSED
+        """
+
+        stack = figures if isinstance(figures, TF_Stack) else TF_Stack(figures)
+
+        first_failing_rule = np.full(stack.number_of_figures, TF_BatchValidator.PASSED, dtype=np.int8)
+        for rule, check in ((TF_BatchValidator.RULE_PAIRING, TF_BatchValidator.check_pairing),
+                            (TF_BatchValidator.RULE_360, TF_BatchValidator.check_360_rule),
+                            (TF_BatchValidator.RULE_180, TF_BatchValidator.check_180_rule)):
+            first_failing_rule[~check(stack)] = rule
+
+        return first_failing_rule == TF_BatchValidator.PASSED, first_failing_rule
+
+    @staticmethod
+    def check_180_rule(a_stack):
+        """
+        Precondition: isinstance(a_stack, TF_Stack)
+        Returns: boolean array; element f is whether every triangle of figure f
+        has an unknown angle or angles that sum to 180
+        """
+
+        triangle_rows = np.arange(0, len(a_stack.known), 3)
+        sums = np.add.reduceat(a_stack.coefficients, triangle_rows, axis=0)
+        known = np.logical_and.reduceat(a_stack.known, triangle_rows)
+
+        figure_of_triangle = np.repeat(np.arange(a_stack.number_of_figures),
+                                       np.diff(np.append(a_stack.triangle_starts, len(triangle_rows))))
+        good = ~known | TF_BatchValidator.__equals_constant(
+            sums, a_stack.straight[figure_of_triangle])
+
+        return TF_BatchValidator.__all_per_figure(good, figure_of_triangle, a_stack.number_of_figures)
+
+    @staticmethod
+    def check_360_rule(a_stack):
+        """
+        Precondition: isinstance(a_stack, TF_Stack)
+        Returns: boolean array; element f is whether the angles at every interior
+        point of figure f include an unknown one or sum to 360
+        """
+
+        if not len(a_stack.fan_starts):
+            return np.ones(a_stack.number_of_figures, dtype=bool)
+
+        sums = np.add.reduceat(a_stack.coefficients[a_stack.fan_corners], a_stack.fan_starts, axis=0)
+        known = np.logical_and.reduceat(a_stack.known[a_stack.fan_corners], a_stack.fan_starts)
+        good = ~known | TF_BatchValidator.__equals_constant(
+            sums, 2 * a_stack.straight[a_stack.fan_figures])
+
+        return TF_BatchValidator.__all_per_figure(good, a_stack.fan_figures, a_stack.number_of_figures)
+
+    @staticmethod
+    def check_pairing(a_stack):
+        """
+        Precondition: isinstance(a_stack, TF_Stack)
+        Returns: boolean array; element f is whether, at every interior point of
+        figure f, the known "following" angles are the same multiset as the known "preceding" angles
+        """
+
+        if not len(a_stack.fan_starts):
+            return np.ones(a_stack.number_of_figures, dtype=bool)
+
+        # --fan_of[i] is the fan of the i-th following (and preceding) corner
+        fan_lengths = np.diff(np.append(a_stack.fan_starts, len(a_stack.following)))
+        fan_of = np.repeat(np.arange(len(a_stack.fan_starts)), fan_lengths)
+
+        # --Rows sorted within each fan, known rows first: equal multisets of known angles
+        #   give equal sorted rows, unknown rows (all 0) matching only unknown rows after them
+        def sorted_rows(corner_rows):
+            values = np.column_stack((a_stack.coefficients[corner_rows], a_stack.known[corner_rows]))
+            order = np.lexsort(tuple(values[:, -2::-1].T) + (~a_stack.known[corner_rows], fan_of))
+            return values[order]
+
+        same_row = np.all(sorted_rows(a_stack.following) == sorted_rows(a_stack.preceding), axis=1)
+        good = np.logical_and.reduceat(same_row, a_stack.fan_starts)
+
+        return TF_BatchValidator.__all_per_figure(good, a_stack.fan_figures, a_stack.number_of_figures)
+
+    @staticmethod
+    def __equals_constant(sums, constants):
+        # Returns: whether each row of sums is [0, ..., 0, constants[row]]
+
+        return np.all(sums[:, :-1] == 0, axis=1) & (sums[:, -1] == constants)
+
+    @staticmethod
+    def __all_per_figure(good, figure_of, number_of_figures):
+        # Returns: boolean array; element f is whether good[i] for every i with figure_of[i] = f
+
+        failures = np.bincount(figure_of[~good], minlength=number_of_figures)
+        return failures == 0
@@ -0,0 +1,169 @@
+import mmap
+import struct
+import sys
+from array import array
+from fractions import Fraction
+
+from geopar.angle_class import Angle
+from geopar.triangle_class import Triangle
+
+__author__ = 'ebraude'
+
+
+class TF_BinaryFormatOverflow(OverflowError):
+    """
+    Raised by TF_BinaryFormat.to_bytes() for a figure with a number too large for the format:
+    a point or a numerator or denominator beyond int64, or a dimension of 256 or more
+    """
+
+
+class TF_BinaryFormat(object):
+    """
+    Intent: A compact, versioned binary form of a TriangulatedFigure
+
+    Layout (all integers little-endian; every section starts at a multiple of 8 bytes):
+    1. header: MAGIC, VERSION (uint16), 6 reserved bytes, then as int64:
+       V = number of vertices, T = number of triangles, D = largest dimension of an angle
+    2. vertex ids: V int64, ascending
+    3. triangles: 3T int64; triangle t has the vertices whose ids are at positions 3t, 3t+1, 3t+2
+       of the vertex ids, in the order of its points
+    4. numerators: 3T x D int64; row 3t+s has the coefficients of the angle in slot s of triangle t
+    5. denominators: 3T x D int64 (1 where there is no coefficient)
+    6. dimensions: 3T uint8, the dimension of each angle; 0 marks an unknown angle (the known-mask)
+    Numerators of angles of dimension d < D are in columns 0 .. d-1; the other columns are 0.
+    """
+
+    MAGIC = b'GEOPARTF'
+    VERSION = 1
+    HEADER = struct.Struct('<8sH6xqqq')
+
+    @staticmethod
+    def to_bytes(a_tf):
+        """
+        Returns: a_tf in the binary format
+
+        PRE: every coefficient of every angle of a_tf has a numerator and denominator
+        that fit in int64, and every angle has a dimension below 256 (TF_BinaryFormatOverflow otherwise)
+        """
+
+        triangles = a_tf.get_triangles()
+        vertex_ids = sorted({point for triangle in triangles for point in triangle.get_points()})
+        position_of = {vertex_id: position for position, vertex_id in enumerate(vertex_ids)}
+        dimension = max((angle.get_dimension() for triangle in triangles for angle in triangle.get_angles()),
+                        default=0)
+
+        corners, numerators, denominators, dimensions = [], [], [], []
+        for triangle in triangles:
+            corners.extend(position_of[point] for point in triangle.get_points())
+            for angle in triangle.get_angles():
+                coefficients = angle.get_coefficients()
+                padding = dimension - len(coefficients)
+                numerators.extend([c.numerator for c in coefficients] + [0] * padding)
+                denominators.extend([c.denominator for c in coefficients] + [1] * padding)
+                dimensions.append(len(coefficients))
+
+        try:
+            sections = [array('q', vertex_ids), array('q', corners),
+                        array('q', numerators), array('q', denominators), array('B', dimensions)]
+        except OverflowError:
+            raise TF_BinaryFormatOverflow('A number in the triangulated figure is too large for TF_BinaryFormat.')
+        if sys.byteorder == 'big':
+            for section in sections:
+                section.byteswap()
+
+        data = [TF_BinaryFormat.HEADER.pack(TF_BinaryFormat.MAGIC, TF_BinaryFormat.VERSION,
+                                            len(vertex_ids), len(triangles), dimension)]
+        data.extend(section.tobytes() for section in sections)
+        return b''.join(data)
+
+    @staticmethod
+    def from_bytes(data):
+        """
+        PRE: data (bytes or any buffer) is the result of to_bytes()
+        Returns: the TriangulatedFigure data encodes
+        """
+
+        from geopar.triangulated_figure_class import TriangulatedFigure
+
+        def read(kind, raw):
+            section = array(kind)
+            section.frombytes(raw)
+            if sys.byteorder == 'big':
+                section.byteswap()
+            return section.tolist()
+
+        vertex_ids, corners, numerators, denominators, dimensions = TF_BinaryFormat.__sections(data, read)
+        dimension = TF_BinaryFormat.__layout(data)[2]
+
+        triangles = []
+        for t in range(len(corners) // 3):
+            angles = []
+            for row in range(3 * t, 3 * t + 3):
+                first = row * dimension
+                angles.append(Angle([Fraction(n, d) for n, d in zip(numerators[first:first + dimensions[row]],
+                                                                    denominators[first:first + dimensions[row]])]))
+            triangles.append(Triangle([vertex_ids[c] for c in corners[3 * t:3 * t + 3]], angles))
+        return TriangulatedFigure(triangles)
+
+    @staticmethod
+    def arrays(data):
+        """
+        PRE: data (bytes, bytearray, mmap, ...) is the result of to_bytes()
+        Returns: {'vertex_ids' (V,), 'triangles' (T, 3), 'numerators' (3T, D), 'denominators' (3T, D),
+        'dimensions' (3T,), 'known' (3T,)}, NumPy arrays that are views of data without copying
+        (except 'known', computed from 'dimensions')
+        """
+
+        import numpy as np
+
+        def view(kind, raw):
+            return np.frombuffer(raw, dtype='<i8' if kind == 'q' else np.uint8)
+
+        vertex_ids, corners, numerators, denominators, dimensions = TF_BinaryFormat.__sections(data, view)
+        dimension = TF_BinaryFormat.__layout(data)[2]
+        return {'vertex_ids': vertex_ids, 'triangles': corners.reshape(len(corners) // 3, 3),
+                'numerators': numerators.reshape(len(dimensions), dimension),
+                'denominators': denominators.reshape(len(dimensions), dimension),
+                'dimensions': dimensions, 'known': dimensions > 0}
+
+    @staticmethod
+    def map_arrays(a_path):
+        """
+        PRE: the file at a_path holds the result of to_bytes()
+        Returns: arrays() of the file's contents, memory-mapped read-only rather than read
+        """
+
+        with open(a_path, 'rb') as file:
+            return TF_BinaryFormat.arrays(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def __layout(data):
+        # Returns: (V, T, D) from the header of data, checking the magic and version
+
+        if len(data) < TF_BinaryFormat.HEADER.size:
+            raise Exception('Not a triangulated figure in TF_BinaryFormat.')
+        magic, version, vertices, triangles, dimension = TF_BinaryFormat.HEADER.unpack_from(data)
+        if magic != TF_BinaryFormat.MAGIC:
+            raise Exception('Not a triangulated figure in TF_BinaryFormat.')
+        if version != TF_BinaryFormat.VERSION:
+            raise Exception('Unsupported TF_BinaryFormat version: {}'.format(version))
+        return vertices, triangles, dimension
+
+    @staticmethod
+    def __sections(data, a_reader):
+        # Returns: the five sections of data, each as a_reader(typecode, memoryview of its bytes)
+
+        vertices, triangles, dimension = TF_BinaryFormat.__layout(data)
+        view = memoryview(data).cast('B')
+        sizes = [('q', vertices), ('q', 3 * triangles), ('q', 3 * triangles * dimension),
+                 ('q', 3 * triangles * dimension), ('B', 3 * triangles)]
+
+        sections, offset = [], TF_BinaryFormat.HEADER.size
+        for kind, count in sizes:
+            length = count * (8 if kind == 'q' else 1)
+            raw = view[offset:offset + length]
+            if len(raw) != length:
+                raise Exception('Truncated triangulated figure in TF_BinaryFormat.')
+            sections.append(a_reader(kind, raw))
+            offset += length
+        return sections
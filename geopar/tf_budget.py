@@ -0,0 +1,81 @@
+import time
+
+__author__ = 'ebraude'
+
+
+class TF_BudgetExceeded(Exception):
+    """
+    Raised by the rules of TF_Elaborations, and by run.elaborate(), when a TF_Budget runs out.
+    The figure being elaborated keeps the angles deduced so far.
+
+    Attributes:
+    reason: 'seconds', 'iterations' or 'deduced', whichever ran out
+    statistics: the budget's statistics() when it ran out
+    """
+
+    def __init__(self, reason, statistics):
+        super().__init__('Budget exceeded ({}): {}'.format(reason, statistics))
+        self.reason, self.statistics = reason, statistics
+
+
+class TF_Budget(object):
+    """
+    Intent: Limits on one solver run: wall-clock seconds, fixpoint iterations,
+    and number of angles deduced. A limit of None is no limit.
+
+    The rules check the budget cooperatively (see TF_Elaborations), so a run stops
+    within one triangle or point of running out of time.
+
+    Class Invariants:
+    1. self.seconds, self.iterations, self.deduced are the limits
+    2. self.used_iterations / self.used_deduced are the iterations begun / angles deduced so far
+    3. self.exceeded is None, or the reason of the TF_BudgetExceeded raised
+    """
+
+    def __init__(self, seconds=None, iterations=None, deduced=None):
+        self.seconds, self.iterations, self.deduced = seconds, iterations, deduced
+        self.used_iterations, self.used_deduced = 0, 0
+        self.exceeded = None
+        self.__start = time.perf_counter()
+        self.__deadline = None if seconds is None else self.__start + seconds
+
+    def restart(self):
+        # Postcondition: the clock starts now, and nothing has been used
+
+        self.__init__(self.seconds, self.iterations, self.deduced)
+
+    def elapsed(self):
+        # Returns: seconds since the budget was created or restarted
+
+        return time.perf_counter() - self.__start
+
+    def statistics(self):
+        # Returns: {'seconds', 'iterations', 'deduced'} used so far
+
+        return {'seconds': self.elapsed(), 'iterations': self.used_iterations, 'deduced': self.used_deduced}
+
+    def check(self):
+        # Postcondition: TF_BudgetExceeded is raised if the time is up
+
+        if self.__deadline is not None and time.perf_counter() > self.__deadline:
+            self.__exceed('seconds')
+
+    def begin_iteration(self):
+        # Postcondition: another fixpoint iteration is charged; TF_BudgetExceeded is raised if there are too many
+
+        self.check()
+        if self.iterations is not None and self.used_iterations >= self.iterations:
+            self.__exceed('iterations')
+        self.used_iterations += 1
+
+    def deduce(self, number_of_angles):
+        # Postcondition: number_of_angles angles about to be deduced are charged;
+        # TF_BudgetExceeded is raised instead if that would make more than self.deduced
+
+        if self.deduced is not None and self.used_deduced + number_of_angles > self.deduced:
+            self.__exceed('deduced')
+        self.used_deduced += number_of_angles
+
+    def __exceed(self, a_reason):
+        self.exceeded = a_reason
+        raise TF_BudgetExceeded(a_reason, self.statistics())
@@ -0,0 +1,114 @@
+"""
+A client of the GEOPAR solver service (see tf_service.py).
+
+Usage: python -m geopar.tf_client (--socket PATH | --port PORT) [--no-pairing] [--timeout SECONDS] FILE
+solves every configuration in FILE (in the input.txt format), pipelined on one connection,
+and prints the outcome of each.
+"""
+
+import argparse
+import json
+import socket
+import sys
+
+from geopar.benchmark import read_shapes
+
+__author__ = 'ebraude'
+
+
+class TF_Client(object):
+    """
+    Intent: A blocking connection to the solver service
+
+    Class Invariants:
+    1. self.socket is connected to the service
+    2. self.next_id is the id of the next request sent
+    """
+
+    def __init__(self, path=None, host='127.0.0.1', port=None):
+        """
+        PRE: path is the service's Unix socket XOR port its localhost TCP port
+        """
+
+        if path is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(path)
+        else:
+            self.socket = socket.create_connection((host, port))
+        self.file = self.socket.makefile('rwb')
+        self.next_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception_info):
+        self.close()
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    def send(self, a_figure, pairing=True, timeout=None):
+        """
+        Intent: Send one request without waiting for its reply (see receive())
+
+        PRE: a_figure is a configuration in the input.txt format or a figure in the JSON format of tf_service
+        Returns: the id of the request
+        """
+
+        request = {'id': self.next_id, 'figure': a_figure, 'pairing': pairing}
+        if timeout is not None:
+            request['timeout'] = timeout
+        self.file.write(json.dumps(request).encode('utf-8') + b'\n')
+        self.file.flush()
+        self.next_id += 1
+        return request['id']
+
+    def receive(self):
+        # Returns: the next reply from the service, as a dict
+
+        line = self.file.readline()
+        if not line:
+            raise Exception('The service closed the connection.')
+        return json.loads(line)
+
+    def solve(self, a_figure, pairing=True, timeout=None):
+        # Returns: the reply to the request for a_figure (see send())
+
+        self.send(a_figure, pairing, timeout)
+        return self.receive()
+
+    def solve_all(self, figures, pairing=True, timeout=None):
+        """
+        Intent: Pipeline the requests for figures on this connection
+        Returns: the replies, in the order of figures
+        """
+
+        ids = [self.send(figure, pairing, timeout) for figure in figures]
+        replies = {}
+        while len(replies) < len(ids):
+            reply = self.receive()
+            replies[reply['id']] = reply
+        return [replies[request_id] for request_id in ids]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m geopar.tf_client', description=__doc__.split('\n')[1])
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument('--socket', help="path of the service's Unix socket")
+    address.add_argument('--port', type=int, help="the service's localhost TCP port")
+    parser.add_argument('--no-pairing', action='store_true')
+    parser.add_argument('--timeout', type=float)
+    parser.add_argument('file', help='configurations in the input.txt format')
+    arguments = parser.parse_args(argv)
+
+    shapes = read_shapes(arguments.file)
+    with TF_Client(arguments.socket, port=arguments.port) as client:
+        replies = client.solve_all([text for label, text in shapes], not arguments.no_pairing, arguments.timeout)
+    for (label, text), reply in zip(shapes, replies):
+        print('{:<28}{}'.format(label, reply.get('outcome') or reply['status'] + ' ' + reply.get('error', '')))
+    return 0 if all(reply['status'] == 'ok' for reply in replies) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
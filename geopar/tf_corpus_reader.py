@@ -0,0 +1,123 @@
+import io
+import mmap
+import os
+import re
+
+from geopar.run import Parser
+
+__author__ = 'ebraude'
+
+# The first line of a configuration, as bytes (see HEADER_PATTERN in run.py)
+HEADER_PATTERN = re.compile(rb'(?m)^[ \t]*\d+[ \t]+\d+[ \t]*\r?$')
+
+
+class TF_CorpusReader(object):
+    """
+    Intent: Random and lazy access to the configurations of a file in the input.txt format
+    that may be far larger than memory. The file is memory-mapped, never read as a whole.
+
+    Every line consisting of two integers starts a configuration (so labels must not look like that).
+
+    Class Invariants:
+    1. self.path is the file read
+    2. self.__offsets[k] is the byte offset of the first line of the k-th configuration,
+       and self.__offsets[-1] is the size of the file
+    3. self.__map is None or a read-only memory map of the file at self.path
+
+    A TF_CorpusReader pickles as its path and offsets, so that worker processes
+    can each map the same file and parse their own range of configurations.
+    """
+
+    def __init__(self, a_path):
+        """
+        Postcondition: the configurations in the file at a_path are indexed, in one pass
+        """
+
+        self.path = os.path.abspath(a_path)
+        self.__map = self.__open_map()
+        offsets = [] if self.__map is None else [match.start() for match in HEADER_PATTERN.finditer(self.__map)]
+        offsets.append(os.path.getsize(self.path))
+        self.__offsets = offsets
+
+    def __open_map(self):
+        # Returns: a read-only memory map of the file at self.path, None if it is empty
+
+        with open(self.path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        # Returns: number of configurations in the file
+
+        return len(self.__offsets) - 1
+
+    def __getitem__(self, k):
+        return self.read(k)
+
+    def __iter__(self):
+        return self.iter_range()
+
+    def __getstate__(self):
+        return {'path': self.path, 'offsets': self.__offsets}
+
+    def __setstate__(self, state):
+        self.path, self.__offsets = state['path'], state['offsets']
+        self.__map = None if len(self.__offsets) == 1 else self.__open_map()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception_info):
+        self.close()
+
+    def close(self):
+        # Postcondition: the memory map is released; self cannot be read anymore
+
+        if self.__map is not None:
+            self.__map.close()
+
+    def text(self, k):
+        """
+        PRE: -len(self) <= k < len(self)
+        Returns: the k-th configuration, including the lines after it up to the next one, as a str
+        """
+
+        if not -len(self) <= k < len(self):
+            raise IndexError('There is no configuration {} in {}.'.format(k, self.path))
+        k %= len(self)
+        return self.__map[self.__offsets[k]:self.__offsets[k + 1]].decode('utf-8')
+
+    def read(self, k):
+        """
+        PRE: -len(self) <= k < len(self)
+        Returns: the k-th configuration as a TriangulatedFigure
+        """
+
+        return Parser(self.path).read_configuration_from(io.StringIO(self.text(k)))
+
+    def iter_range(self, start=0, stop=None):
+        """
+        Returns: a generator of the configurations start, start + 1, ..., stop - 1
+        (stop defaults to len(self)) as TriangulatedFigures, parsed one at a time
+        """
+
+        stop = len(self) if stop is None else min(stop, len(self))
+        for k in range(start, stop):
+            yield self.read(k)
+
+    def partition(self, number_of_parts):
+        """
+        Returns: number_of_parts (start, stop) ranges for iter_range() that cover all
+        configurations, for parallel workers; they are balanced by bytes, not by count
+        """
+
+        size, ranges, start = self.__offsets[-1] - self.__offsets[0], [], 0
+        for part in range(1, number_of_parts + 1):
+            goal = self.__offsets[0] + size * part // number_of_parts
+            stop = start
+            while stop < len(self) and self.__offsets[stop] < goal:
+                stop += 1
+            ranges.append((start, stop if part < number_of_parts else len(self)))
+            start = ranges[-1][1]
+        return ranges
@@ -0,0 +1,158 @@
+from array import array
+
+__author__ = 'ebraude'
+
+
+class TF_Derivation(object):
+    """
+    Intent: The derivation of the angles that the rules deduce on a TriangulatedFigure:
+    a DAG whose nodes are corners and whose edges lead from the corners each deduction used
+    to the corner it deduced. Pass it to run.solve() or run.elaborate() to have it recorded.
+
+    Corner 3t + s is the angle in slot s of triangle t of the figure. Recording appends three
+    integers per deduced corner; which corners it came from follows from the rule and the figure,
+    and is worked out only when asked for (sources(), arrays(), proof()).
+
+    Class Invariants:
+    1. self.premises[c] is 1 if corner c was known when self was created, 0 otherwise
+    2. record k deduced corner self.corners[k] by rule self.rules[k] (RULE_180, RULE_360 or RULE_PAIRING)
+       at self.sites[k]: the point for RULE_360 and RULE_PAIRING, the triangle for RULE_180;
+       records are in the order of deduction, and pairing records come in pairs
+    """
+
+    RULE_180, RULE_360, RULE_PAIRING = 0, 1, 2
+    RULE_NAMES = ['the 180 rule', 'the 360 rule', 'pairing']
+
+    def __init__(self, a_tf):
+        """
+        PRE: the triangles of a_tf stay the same (their angles may become known)
+        """
+
+        self.tf = a_tf
+        self.premises = bytearray(angle.is_known() for triangle in a_tf.get_triangles()
+                                  for angle in triangle.get_angles())
+        self.rules, self.corners, self.sites = array('b'), array('q'), array('q')
+        self.__triangle_index = None  # id of a triangle: its index, once needed
+        self.__corner_at = None  # (point, point following it): the corner at point, once needed
+        self.__topology, self.__edges, self.__pairings_before = None, None, [0]
+
+    def __len__(self):
+        # Returns: the number of corners deduced
+
+        return len(self.corners)
+
+    def deduced_in(self, a_triangle, a_slot):
+        # Postcondition: the angle in a_slot of a_triangle is recorded as deduced by the 180 rule
+
+        if self.__triangle_index is None:
+            self.__triangle_index = {id(triangle): t for t, triangle in enumerate(self.tf.get_triangles())}
+        t = self.__triangle_index[id(a_triangle)]
+        self.rules.append(TF_Derivation.RULE_180)
+        self.corners.append(3 * t + a_slot)
+        self.sites.append(t)
+
+    def deduced_at(self, a_rule, a_point, angle_points):
+        # Postcondition: the angle at angle_points is recorded as deduced by a_rule at a_point
+
+        if self.__corner_at is None:
+            self.__corner_at = {}
+            for t, triangle in enumerate(self.tf.get_triangles()):
+                points = triangle.get_points()
+                for s in range(3):
+                    self.__corner_at[(points[s], points[(s + 1) % 3])] = 3 * t + s
+        self.rules.append(a_rule)
+        self.corners.append(self.__corner_at[(angle_points[1], angle_points[2])])
+        self.sites.append(a_point)
+
+    def sources(self, k):
+        """
+        Returns: the corners that record k was deduced from
+        """
+
+        rule, corner, site = self.rules[k], self.corners[k], self.sites[k]
+        t, s = divmod(corner, 3)
+        if rule == TF_Derivation.RULE_180:
+            return [3 * t + (s + 1) % 3, 3 * t + (s + 2) % 3]
+
+        topology = self.__get_topology()
+        corners = topology.triangles
+        position = topology.position_of(site)
+        result = []
+        for u in topology.fan_of(site):
+            slot = corners.index(position, 3 * u, 3 * u + 3) - 3 * u
+            if rule == TF_Derivation.RULE_360:
+                result.append(3 * u + slot)
+            else:
+                result.extend((3 * u + (slot + 1) % 3, 3 * u + (slot + 2) % 3))
+
+        if rule == TF_Derivation.RULE_360:
+            deduced_together = {corner}
+        else:
+            deduced_together = {corner, self.corners[self.__pairing_partner(k)]}
+        return [c for c in result if c not in deduced_together]
+
+    def __pairing_partner(self, k):
+        # Returns: the index of the record deduced with pairing record k
+
+        # pairings_before[j] is the number of pairing records before record j
+        pairings_before = self.__pairings_before
+        while len(pairings_before) <= k:
+            j = len(pairings_before)
+            pairings_before.append(pairings_before[-1] + (self.rules[j - 1] == TF_Derivation.RULE_PAIRING))
+        return k + 1 if pairings_before[k] % 2 == 0 else k - 1
+
+    def __get_topology(self):
+        if self.__topology is None:
+            from geopar.tf_topology import TF_Topology
+            self.__topology = TF_Topology(self.tf)
+        return self.__topology
+
+    def arrays(self):
+        """
+        Returns: the DAG as {'rules', 'corners', 'sites', 'source_starts', 'sources'}, where
+        sources[source_starts[k]:source_starts[k + 1]] are the corners record k was deduced from;
+        the edges of a record are worked out the first time they are asked for
+        """
+
+        if self.__edges is None:
+            self.__edges = array('q', [0]), array('q')
+        source_starts, sources = self.__edges
+        for k in range(len(source_starts) - 1, len(self)):
+            sources.extend(self.sources(k))
+            source_starts.append(len(sources))
+        return {'rules': self.rules, 'corners': self.corners, 'sites': self.sites,
+                'source_starts': source_starts, 'sources': sources}
+
+    def name_of(self, a_corner):
+        # Returns: a_corner as its angle points, e.g. '∠(3,1,2)'
+
+        triangle = self.tf.get_triangles()[a_corner // 3]
+        return '∠({},{},{})'.format(*triangle.get_angle_points_by_point(triangle.get_points()[a_corner % 3]))
+
+    def value_of(self, a_corner):
+        # Returns: the angle at a_corner as text
+
+        angle = self.tf.get_triangles()[a_corner // 3].get_angles()[a_corner % 3]
+        return str(angle) if any(angle.get_coefficients()) else '0'
+
+    def proof(self):
+        """
+        Returns: the derivation as text: the premises used, then one line per deduced corner
+        with its value, the rule and site, and the corners it was deduced from
+        """
+
+        dag = self.arrays()
+        sources, source_starts = dag['sources'], dag['source_starts']
+        used = sorted({c for c in sources if self.premises[c]})
+        lines = ['Premises:']
+        lines.extend('   {} = {}'.format(self.name_of(c), self.value_of(c)) for c in used)
+
+        triangles = self.tf.get_triangles()
+        for k in range(len(self)):
+            rule, corner, site = self.rules[k], self.corners[k], self.sites[k]
+            where = 'in triangle ({}, {}, {})'.format(*triangles[site].get_points()) \
+                if rule == TF_Derivation.RULE_180 else 'at point {}'.format(site)
+            lines.append('{}. {} = {}  by {} {}, from {}'.format(
+                k + 1, self.name_of(corner), self.value_of(corner), TF_Derivation.RULE_NAMES[rule], where,
+                ', '.join(self.name_of(c) for c in sources[source_starts[k]:source_starts[k + 1]])))
+        return '\n'.join(lines) + '\n'
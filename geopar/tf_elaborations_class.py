@@ -1,5 +1,7 @@
 from collections import Counter
 
+from geopar.angle_class import Angle
+
 __author__ = 'satbek'  # edited by Eric Braude
 
 
@@ -9,92 +11,124 @@ class TF_Elaborations(object):
 
     The deductions are the 180-degree rule and the 360-degree rule;
     The inferral is the Pairing rule. For more on these refer to the paper by Braude and Abdyldayev
+
+    Each rule takes an optional TF_Budget, which it checks at every triangle or point
+    and charges with the angles it deduces before setting them; it then stops by raising TF_BudgetExceeded.
+    Each rule also takes an optional TF_Derivation, in which it records every angle it deduces.
     """
 
     @staticmethod
-    def apply_180_rule_to(a_tf):
+    def apply_180_rule_to(a_tf, budget=None, derivation=None):
         """
         Intent: Include unknown angles trianle-by-triangle in a_tf where possible
         Precondition: isinstance(a_tf, TriangulatedFigure)
         Postcondition: For every triangle t in a_tf.get_triangles(), at most one angle in t is known
         """
         for triangle in a_tf.get_triangles():
+            if budget is not None:
+                budget.check()
             if triangle.number_of_known() == 2:
+                if budget is not None:
+                    budget.deduce(1)
+                if derivation is not None:
+                    derivation.deduced_in(triangle, [angle.is_known() for angle in triangle.get_angles()].index(False))
                 triangle.complete_unknown_angle()
 
     @staticmethod
-    def apply_360_rule_to(a_tf):
+    def apply_360_rule_to(a_tf, budget=None, derivation=None):
         """
         Intent: Add unknown angles interior-point-by-point in a_tf where possible
         Precondition: isinstance(a_tf, TriangulatedFigure)
         Postcondition: At every interior point in a_tf, either all angles are known
         or at least two are not known
         """
-        for point in a_tf.get_interior_points():
-            a_tf.make_angles_known_at(point)
+        for point, fan in a_tf.fans().items():
+            if budget is not None:
+                budget.check()
+                unknown = [triangle for triangle, following, preceding in fan
+                           if not triangle.angles[3 - following - preceding].is_known()]
+                if len(unknown) == 1:
+                    budget.deduce(1)
+            angle_points = a_tf.make_angles_known_at(point)
+            if angle_points and derivation is not None:
+                derivation.deduced_at(derivation.RULE_360, point, angle_points)
 
     @staticmethod
-    def apply_pairing_at(a_tf, a_point):
+    def apply_pairing_at(a_tf, a_point, budget=None):
         """
         Intent: Add unknown angles at a_point where possible
 
         Preconditions:
         1. isinstance(a_tf, TriangulatedFigure)
         2. a_point is an interior vertex of a_tf
+        3. budget is None or a TF_Budget, charged with the two angles before they are set
 
         Postcondition: Either (1) all angles that a_point subtends in a_tf are known and they pair
         or (2) more than two are unknown or (3) exactly two are unknown but the rest do not pair
+        Returns: the angle points of the two angles set, [] if none were
         """
 
-        # --triangles_at_point defined
+        # --(Screened) in O(1): nothing is set unless exactly one angle on each side is unknown
+        #   and the signatures of the known ones match (see TF_PairingSignatures)
+
+        signatures = a_tf.pairing_signatures()
+        if signatures.unknowns(a_point) != (1, 1) or not signatures.pairs(a_point):
+            return []
 
-        triangles_at_point = a_tf.triangles_at(a_point)
+        # --fan defined: (triangle, slot following a_point, slot preceding a_point), clockwise
+
+        fan = a_tf.fans()[a_point]
 
         # --known_angles_following / ..._preceding = the known alternating angles subtended by a_point
-        #   AND unknown_following_count / ..._preceding_... = the sum of above that are unknown
-        #   AND known_angle_count is the count of the known angles subtended by a_point
-        #   AND points_of_unknown_angles is the list of unknown angles as point triplets
+        #   AND unknown_following / ..._preceding = the (triangle, slot) of those that are unknown
 
         known_angles_following, known_angles_preceding = [], []
-        unknown_following_count, unknown_preceding_count, known_angle_count = 0, 0, 0
-        points_of_unknown_angles = []
-
-        for t in triangles_at_point:
+        unknown_following, unknown_preceding = [], []
 
-            point_following = t.point_following(a_point)
-            point_preceding = t.point_preceding(a_point)
-            angle_following = t.angle_of_point(point_following)
-            angle_preceding = t.angle_of_point(point_preceding)
+        for triangle, following, preceding in fan:
+            angles = triangle.angles
+            angle_following, angle_preceding = angles[following], angles[preceding]
 
             if angle_following.is_known():
                 known_angles_following.append(angle_following)
-                known_angle_count += angle_following
             else:
-                unknown_following_count += 1
-                points_of_unknown_angles.append(t.get_angle_points_by_point(point_following))
+                unknown_following.append((triangle, following))
             if angle_preceding.is_known():
                 known_angles_preceding.append(angle_preceding)
-                known_angle_count += angle_preceding
             else:
-                unknown_preceding_count += 1
-                points_of_unknown_angles.append(t.get_angle_points_by_point(point_preceding))
+                unknown_preceding.append((triangle, preceding))
 
         # --Postcondition
 
-        # Set the 2 unknown angles when case (2) applies only
-        if unknown_following_count == 1 and unknown_following_count == 1 and \
-                set(known_angles_following) == set(known_angles_preceding):
-            angle_to_set = ((len(triangles_at_point) - 2) * 180 - known_angle_count) / 2
-            a_tf.set_angle_by_angle_points(*points_of_unknown_angles[0], angle_to_set)
-            a_tf.set_angle_by_angle_points(*points_of_unknown_angles[1], angle_to_set)
+        # Set the 2 unknown angles when case (2) applies only:
+        # one unknown on each side, and the known angles on the two sides pair one to one
+        # (confirmed exactly, since matching signatures only make it all but certain)
+        if len(unknown_following) == 1 and len(unknown_preceding) == 1 and \
+                Counter(known_angles_following) == Counter(known_angles_preceding):
+            known_angle_count = Angle.sum(known_angles_following + known_angles_preceding)
+            angle_to_set = ((len(fan) - 2) * 180 - known_angle_count) / 2
+            if budget is not None:
+                budget.deduce(2)
+            points_of_angles_set = []
+            for triangle, slot in unknown_following + unknown_preceding:
+                triangle.set_angle_by_index(slot, angle_to_set)
+                points = triangle.points
+                points_of_angles_set.append([points[(slot + 2) % 3], points[slot], points[(slot + 1) % 3]])
+            return points_of_angles_set
+        return []
 
     @staticmethod
-    def apply_pairing_to(a_tf):
+    def apply_pairing_to(a_tf, budget=None, derivation=None):
         """
         Intent: Add unknown angles at every interior point of a_tf where possible
         Precondition: isinstance(a_tf, TriangulatedFigure)
         Postcondition:
         For every interior point in a_tf, the postconditions of apply_pairing_at() are true
         """
-        for interior_point in a_tf.get_interior_points():
-            TF_Elaborations.apply_pairing_at(a_tf, interior_point)
+        for interior_point in a_tf.fans():
+            if budget is not None:
+                budget.check()
+            points_of_angles_set = TF_Elaborations.apply_pairing_at(a_tf, interior_point, budget)
+            if points_of_angles_set and derivation is not None:
+                for angle_points in points_of_angles_set:
+                    derivation.deduced_at(derivation.RULE_PAIRING, interior_point, angle_points)
@@ -0,0 +1,270 @@
+import random
+from fractions import Fraction
+
+from geopar.angle_class import Angle
+from geopar.triangle_class import Triangle
+from geopar.triangulated_figure_class import TriangulatedFigure
+
+__author__ = 'ebraude'
+
+
+class TF_Generator(object):
+    """
+    Intent: Synthetic triangulated figures of any size, e.g., for scaling workloads
+
+    A figure grows from one triangle by
+    - inserting a point into a triangle (a new interior point; 1 triangle becomes 3)
+    - inserting a point into a boundary edge (a new boundary point; 1 triangle becomes 2)
+    and is then shuffled by edge flips. Every step keeps the triangles clockwise and
+    keeps the angles consistent: the angles of every triangle sum to 180, those at every
+    interior point sum to 360, and those at a point inserted into an edge sum to 180.
+    All angles are linear combinations of the first (dimension - 1) GREEK_LETTERS, and
+    every angle is positive when the letters take their nominal values.
+    The pairing rule is not guaranteed to hold.
+
+    Class Invariants:
+    1. self.random is the only source of randomness (so a seed fixes every figure)
+    2. self.dimension is the dimension of every generated angle
+    """
+
+    MAX_DENOMINATOR = 64  # larger denominators are avoided when splitting angles
+
+    def __init__(self, seed=0, dimension=3):
+        """
+        PRE: 1 <= dimension; dimension <= 6 for figures that Parser reads back
+        """
+
+        if dimension < 1:
+            raise Exception('Bad dimension.')
+
+        self.random = random.Random(seed)
+        self.dimension = dimension
+
+        # --(Nominal): self.nominal[i] is the value of the i-th letter, the last entry being 1;
+        # the letters are split between the first two angles of the first triangle, 60 each
+        letters = dimension - 1
+        self.nominal = [0] * letters + [1]
+        for i in range(letters):
+            share = (letters - i % 2 + 1) // 2  # letters in the same angle as letter i
+            self.nominal[i] = Fraction(60, share)
+
+    def generate(self, number_of_triangles, interior_ratio=0.5, unknown_ratio=0.0, flips=None):
+        """
+        Intent: A random figure
+
+        PRE1: number_of_triangles >= 1
+        PRE2: 0 <= interior_ratio < 1 and 0 <= unknown_ratio <= 1
+
+        Returns: a TriangulatedFigure with number_of_triangles triangles, in which about
+        interior_ratio of the points are interior, about unknown_ratio of the angles are
+        unknown ('x'), and flips edge flips were attempted (default: number_of_triangles)
+        """
+
+        if number_of_triangles < 1:
+            raise Exception('A figure needs at least one triangle.')
+
+        # --(Seeded): the first triangle, with its angles made from the letters
+        self.__points, self.__angles, self.__edges = [], [], {}
+        self.__boundary, self.__boundary_at = [], {}
+        self.__number_of_points, self.__number_of_interior = 3, 0
+        self.__add_triangle([1, 2, 3], self.__first_angles())
+
+        # --(Grown): enough points inserted into triangles and edges
+        while len(self.__points) < number_of_triangles:
+            interior_now = self.__number_of_interior / (self.__number_of_points + 1)
+            if len(self.__points) + 2 <= number_of_triangles and interior_now < interior_ratio:
+                self.__insert_into_triangle(self.random.randrange(len(self.__points)))
+            else:
+                self.__insert_into_edge(self.random.choice(self.__boundary))
+
+        # --(Flipped)
+        for _ in range(number_of_triangles if flips is None else flips):
+            triangle_index = self.random.randrange(len(self.__points))
+            slot = self.random.randrange(3)
+            self.__flip(self.__points[triangle_index][slot], self.__points[triangle_index][(slot + 1) % 3])
+
+        # --(Hidden): unknown_ratio of all angles made unknown
+        corners = [(t, s) for t in range(len(self.__points)) for s in range(3)]
+        for t, s in self.random.sample(corners, round(unknown_ratio * len(corners))):
+            self.__angles[t][s] = Angle([])
+
+        # --(Shuffled): triangles in random order, each starting at a random point
+        triangles = []
+        for points, angles in zip(self.__points, self.__angles):
+            shift = self.random.randrange(3)
+            triangles.append(Triangle(points[shift:] + points[:shift], angles[shift:] + angles[:shift]))
+        self.random.shuffle(triangles)
+
+        return TriangulatedFigure(triangles)
+
+    @staticmethod
+    def format_configuration(a_tf, a_dimension, a_label=''):
+        """
+        Returns: a_tf as a configuration in the format of input.txt (see README),
+        with a_label on the line after the triangles, followed by an empty line
+
+        PRE: every known angle in a_tf has dimension a_dimension
+        """
+
+        lines = ['{} {}'.format(len(a_tf.get_triangles()), a_dimension)]
+        for triangle in a_tf.get_triangles():
+            lines.append('{}, {}, {}; {}, {}, {}'.format(*triangle.get_points(), *triangle.get_angles()))
+        lines.append(a_label)
+        lines.append('')
+        return '\n'.join(lines) + '\n'
+
+    def __add_triangle(self, three_points, three_angles):
+        # Appends a triangle, recording its directed edges and the boundary
+
+        index = len(self.__points)
+        self.__points.append(three_points)
+        self.__angles.append(three_angles)
+        for i in range(3):
+            self.__set_edge((three_points[i], three_points[(i + 1) % 3]), index)
+
+    def __set_edge(self, an_edge, a_triangle_index):
+        # Records that directed an_edge belongs to the triangle at a_triangle_index
+        # and keeps self.__boundary = the directed edges whose reverse is not an edge
+
+        self.__edges[an_edge] = a_triangle_index
+        reverse = (an_edge[1], an_edge[0])
+        if reverse in self.__edges:
+            self.__remove_boundary(reverse)
+        elif an_edge not in self.__boundary_at:
+            self.__boundary_at[an_edge] = len(self.__boundary)
+            self.__boundary.append(an_edge)
+
+    def __remove_edge(self, an_edge):
+        # Forgets directed an_edge; its reverse, if any, is then on the boundary
+
+        del self.__edges[an_edge]
+        self.__remove_boundary(an_edge)
+        reverse = (an_edge[1], an_edge[0])
+        if reverse in self.__edges:
+            self.__boundary_at[reverse] = len(self.__boundary)
+            self.__boundary.append(reverse)
+
+    def __remove_boundary(self, an_edge):
+        # O(1) removal: the last boundary edge takes the place of an_edge
+
+        position = self.__boundary_at.pop(an_edge, None)
+        if position is not None:
+            last = self.__boundary.pop()
+            if last != an_edge:
+                self.__boundary[position] = last
+                self.__boundary_at[last] = position
+
+    def __replace_triangles(self, *replacements):
+        # For every (index, three_points, three_angles) in replacements,
+        # the triangle at index becomes three_points, three_angles
+
+        for index, _, _ in replacements:
+            old_points = self.__points[index]
+            for i in range(3):
+                self.__remove_edge((old_points[i], old_points[(i + 1) % 3]))
+        for index, three_points, three_angles in replacements:
+            self.__points[index] = three_points
+            self.__angles[index] = three_angles
+            for i in range(3):
+                self.__set_edge((three_points[i], three_points[(i + 1) % 3]), index)
+
+    def __first_angles(self):
+        # Returns: three angles of the first triangle, the letters split between the first two
+
+        letters = self.dimension - 1
+        first = [0] * self.dimension
+        second = [0] * self.dimension
+        for i in range(letters):
+            (first if i % 2 == 0 else second)[i] = 1
+        if letters < 2:
+            second[-1] = 60
+        if letters < 1:
+            first[-1] = 60
+        first, second = Angle(first), Angle(second)
+        return [first, second, 180 - first - second]
+
+    def __value(self, an_angle):
+        # Returns: an_angle when the letters take their nominal values
+
+        return sum(c * v for c, v in zip(an_angle.get_coefficients(), self.nominal))
+
+    def __between(self, lower, upper):
+        """
+        PRE: lower < upper at the nominal values (lower may be the int 0)
+        Returns: an angle strictly between lower and upper at the nominal values:
+        their midpoint, unless that makes a denominator exceed MAX_DENOMINATOR,
+        in which case lower plus a whole number of degrees when there is room
+        """
+
+        if not isinstance(lower, Angle):
+            lower = Angle([0] * (self.dimension - 1) + [lower])
+        middle = (lower + upper) / 2
+        if max(c.denominator for c in middle.get_coefficients()) <= TF_Generator.MAX_DENOMINATOR:
+            return middle
+        gap = self.__value(upper) - self.__value(lower)
+        return lower + int(gap / 2) if gap >= 2 else middle
+
+    def __insert_into_triangle(self, an_index):
+        # The triangle (a, b, c) at an_index becomes (a, b, p), (b, c, p), (c, a, p) for a new
+        # interior point p; every old angle is split between the two triangles sharing it
+
+        (a, b, c), (a_, b_, c_) = self.__points[an_index], self.__angles[an_index]
+        self.__number_of_points += 1
+        self.__number_of_interior += 1
+        p = self.__number_of_points
+
+        a1, b1, c1 = self.__between(0, a_), self.__between(0, b_), self.__between(0, c_)
+        a2, b2, c2 = a_ - a1, b_ - b1, c_ - c1
+        self.__replace_triangles((an_index, [a, b, p], [a1, b2, 180 - a1 - b2]))
+        self.__add_triangle([b, c, p], [b1, c2, 180 - b1 - c2])
+        self.__add_triangle([c, a, p], [c1, a2, 180 - c1 - a2])
+
+    def __insert_into_edge(self, an_edge):
+        # The triangle (a, b, c) containing boundary an_edge = (a, b) becomes (a, m, c), (m, b, c)
+        # for a new boundary point m on an_edge, the angle at c being split
+
+        index = self.__edges[an_edge]
+        points, angles = self.__points[index], self.__angles[index]
+        shift = points.index(an_edge[0])
+        (a, b, c), (a_, b_, c_) = points[shift:] + points[:shift], angles[shift:] + angles[:shift]
+        self.__number_of_points += 1
+        m = self.__number_of_points
+
+        # the angles at c are positive when b_ < m_ < 180 - a_
+        m_ = self.__between(b_, 180 - a_)
+        c1 = 180 - a_ - m_
+        self.__replace_triangles((index, [a, m, c], [a_, m_, c1]))
+        self.__add_triangle([m, b, c], [180 - m_, b_, c_ - c1])
+
+    def __flip(self, a, c):
+        # Replaces the diagonal (a, c) of the quadrilateral made by (a, c, b) and (c, a, d)
+        # with (b, d), provided the quadrilateral is convex and (b, d) is not an edge yet
+
+        if (c, a) not in self.__edges:
+            return  # (a, c) is on the boundary
+
+        first, second = self.__edges[(a, c)], self.__edges[(c, a)]
+        first_points, first_angles = self.__points[first], self.__angles[first]
+        second_points, second_angles = self.__points[second], self.__angles[second]
+        shift = first_points.index(a)
+        b = first_points[(shift + 2) % 3]
+        a1, c1, b_ = [first_angles[(shift + i) % 3] for i in range(3)]
+        shift = second_points.index(c)
+        d = second_points[(shift + 2) % 3]
+        c2, a2, d_ = [second_angles[(shift + i) % 3] for i in range(3)]
+
+        if b == d or (b, d) in self.__edges or (d, b) in self.__edges:
+            return
+
+        # --(Convex): the new angle d1 at d lies strictly between lower and upper,
+        # so that all six new angles are positive
+        a_, c_ = a1 + a2, c1 + c2
+        lower = 180 - a_ - b_ if self.__value(180 - a_ - b_) > 0 else 0
+        upper = d_ if self.__value(d_) < self.__value(180 - a_) else 180 - a_
+        if self.__value(upper) <= (self.__value(lower) if isinstance(lower, Angle) else 0):
+            return
+        d1 = self.__between(lower, upper)
+
+        b1 = 180 - a_ - d1
+        self.__replace_triangles((first, [a, d, b], [a_, d1, b1]),
+                                 (second, [d, c, b], [d_ - d1, c_, b_ - b1]))
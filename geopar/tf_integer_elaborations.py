@@ -0,0 +1,153 @@
+from collections import Counter
+from fractions import Fraction
+from math import gcd
+
+from geopar.angle_class import Angle
+
+__author__ = 'ebraude'
+
+# The total, in degrees, that each rule subtracts the known angles from (pairing: per triangle beyond two)
+RULE_TOTALS = {'apply_180_rule_to': 180, 'apply_360_rule_to': 360, 'apply_pairing_to': 90}
+
+
+class TF_IntegerElaborations(object):
+    """
+    The rules of TF_Elaborations applied to a whole TriangulatedFigure in integer arithmetic.
+
+    Every known angle is multiplied by the scale of the figure: the LCM of the denominators of
+    the coefficients of its known angles. Its coefficients are then ints, and so are those of every
+    angle the rules deduce, since each is an integer combination of known angles and of 180 or 360:
+    in particular pairing, whose known angles on the two sides are the same, sets
+    ((n - 2) * 180 - 2 * S) / 2 = (n - 2) * 90 - S for the sum S of one side, with no division left.
+    The rules run to their fixpoint on tuples of ints, and only the angles deduced are converted
+    back to Fractions, once, into the figure.
+
+    For consistent premises this deduces the same angles as run.elaborate() with the same rules.
+    """
+
+    @staticmethod
+    def scale_of(a_tf):
+        # Returns: the LCM of the denominators of the coefficients of the known angles of a_tf
+
+        result = 1
+        for triangle in a_tf.get_triangles():
+            for angle in triangle.get_angles():
+                for coefficient in angle.get_coefficients():
+                    denominator = coefficient.denominator
+                    if result % denominator:
+                        result = result * denominator // gcd(result, denominator)
+        return result
+
+    @staticmethod
+    def apply_rules_to(a_tf, rule_names):
+        """
+        Intent: The fixpoint of the TF_Elaborations rules named in rule_names on a_tf, in integers
+
+        PRE: rule_names are among 'apply_180_rule_to', 'apply_360_rule_to' and 'apply_pairing_to';
+        the known angles of a_tf have the same dimension
+        POST: as for run.elaborate(a_tf, rule_names)
+        Returns: the number of angles deduced
+        """
+
+        triangles = a_tf.get_triangles()
+        dimension = next((len(angle.get_coefficients()) for triangle in triangles
+                          for angle in triangle.get_angles() if angle.is_known()), None)
+        if dimension is None:
+            return 0
+
+        # --(Scaled): values[3t + s] is the angle in slot s of triangle t times scale, as ints; None if unknown
+        scale = TF_IntegerElaborations.scale_of(a_tf)
+        values = [tuple([c.numerator * (scale // c.denominator) for c in angle.get_coefficients()])
+                  if angle.is_known() else None
+                  for triangle in triangles for angle in triangle.get_angles()]
+        premises = list(values)
+
+        # --(Fans): the corners at, following and preceding each interior point
+        index_of = {id(triangle): t for t, triangle in enumerate(triangles)}
+        fans = []
+        for fan in a_tf.fans().values():
+            at, following, preceding = [], [], []
+            for triangle, f, p in fan:
+                t = 3 * index_of[id(triangle)]
+                at.append(t + 3 - f - p)
+                following.append(t + f)
+                preceding.append(t + p)
+            fans.append((at, following, preceding))
+
+        zero = (0,) * (dimension - 1)
+        rules = {'apply_180_rule_to': TF_IntegerElaborations.__rule_180,
+                 'apply_360_rule_to': TF_IntegerElaborations.__rule_360,
+                 'apply_pairing_to': TF_IntegerElaborations.__rule_pairing}
+        rules = [(rules[name], zero + (RULE_TOTALS[name] * scale,)) for name in rule_names]
+
+        changed = True
+        while changed:
+            changed = False
+            for rule, total in rules:
+                if rule(values, fans, total):
+                    changed = True
+
+        # --(Converted back): the angles deduced, into a_tf
+        deduced = 0
+        for corner, value in enumerate(values):
+            if value is not None and premises[corner] is None:
+                triangles[corner // 3].set_angle_by_index(corner % 3, Angle([Fraction(c, scale) for c in value]))
+                deduced += 1
+        return deduced
+
+    @staticmethod
+    def __rest(a_total, some_values):
+        # Returns: a_total minus the sum of some_values
+
+        return tuple([total - sum(coefficients) for total, coefficients in zip(a_total, zip(*some_values))]) \
+            if some_values else a_total
+
+    @staticmethod
+    def __rule_180(values, fans, a_total):
+        # Postcondition: every triangle with two known angles has all three (a_total being 180 scaled)
+        # Returns: whether any angle was set
+
+        changed = False
+        for corner in range(0, len(values), 3):
+            three = values[corner:corner + 3]
+            if three.count(None) == 1:
+                s = three.index(None)
+                values[corner + s] = TF_IntegerElaborations.__rest(a_total, three[:s] + three[s + 1:])
+                changed = True
+        return changed
+
+    @staticmethod
+    def __rule_360(values, fans, a_total):
+        # Postcondition: at every interior point, all angles are known or at least two are not
+        # (a_total being 360 scaled)
+        # Returns: whether any angle was set
+
+        changed = False
+        for at, following, preceding in fans:
+            unknown = [corner for corner in at if values[corner] is None]
+            if len(unknown) == 1:
+                values[unknown[0]] = TF_IntegerElaborations.__rest(
+                    a_total, [values[corner] for corner in at if corner != unknown[0]])
+                changed = True
+        return changed
+
+    @staticmethod
+    def __rule_pairing(values, fans, a_total):
+        # Postcondition: as for TF_Elaborations.apply_pairing_at() at every interior point
+        # (a_total being 90 scaled)
+        # Returns: whether any angle was set
+
+        changed = False
+        for at, following, preceding in fans:
+            unknown_following = [corner for corner in following if values[corner] is None]
+            unknown_preceding = [corner for corner in preceding if values[corner] is None]
+            if len(unknown_following) != 1 or len(unknown_preceding) != 1:
+                continue
+            known_following = [values[corner] for corner in following if values[corner] is not None]
+            if Counter(known_following) != Counter(values[corner] for corner in preceding
+                                                   if values[corner] is not None):
+                continue
+            value = TF_IntegerElaborations.__rest(tuple([(len(at) - 2) * c for c in a_total]), known_following)
+            values[unknown_following[0]] = values[unknown_preceding[0]] = value
+            changed = True
+        return changed
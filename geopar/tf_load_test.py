@@ -0,0 +1,115 @@
+"""
+A load test of the GEOPAR solver service (see tf_service.py): several connections, each
+pipelining its share of requests for generated figures, with the throughput and latencies reported.
+
+Usage: python -m geopar.tf_load_test [--socket PATH | --port PORT] [--requests 400] [--connections 8]
+                                     [--depth 16] [--triangles 100] [--workers N]
+Without --socket or --port, a service is started for the test (with --workers workers) and stopped after.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from geopar.tf_client import TF_Client
+from geopar.tf_generator import TF_Generator
+
+__author__ = 'ebraude'
+
+
+def generated_figures(number_of_figures, number_of_triangles, dimension=3):
+    # Returns: number_of_figures configurations in the input.txt format, with 20% of the angles unknown
+
+    generator = TF_Generator(seed=0, dimension=dimension)
+    return [TF_Generator.format_configuration(generator.generate(number_of_triangles, unknown_ratio=0.2), dimension)
+            for _ in range(number_of_figures)]
+
+
+def load(an_address, figures, connections, depth):
+    """
+    Intent: Send figures to the service at an_address = (path, port), split among connections,
+    each keeping up to depth requests in flight
+
+    Returns: {'seconds', 'requests_per_second', 'latency_p50', 'latency_p95', 'latency_max', 'failed'}
+    """
+
+    latencies, failed, lock = [], [0], threading.Lock()
+
+    def connection(some_figures):
+        with TF_Client(an_address[0], port=an_address[1]) as client:
+            sent = {}  # request id: time sent
+
+            def receive():
+                reply = client.receive()
+                with lock:
+                    latencies.append(time.perf_counter() - sent.pop(reply['id']))
+                    failed[0] += reply['status'] != 'ok'
+
+            for figure in some_figures:
+                if len(sent) == depth:
+                    receive()
+                sent[client.send(figure)] = time.perf_counter()
+            while sent:
+                receive()
+
+    threads = [threading.Thread(target=connection, args=(figures[c::connections],)) for c in range(connections)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {'seconds': seconds, 'requests_per_second': len(latencies) / seconds,
+            'latency_p50': latencies[len(latencies) // 2],
+            'latency_p95': latencies[min(len(latencies) - 1, len(latencies) * 95 // 100)],
+            'latency_max': latencies[-1], 'failed': failed[0]}
+
+
+def start_service(a_path, workers=None):
+    # Returns: a process running the service on the Unix socket at a_path, once it is ready
+
+    command = [sys.executable, '-m', 'geopar.tf_service', '--socket', a_path]
+    if workers:
+        command += ['--workers', str(workers)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, cwd=os.path.join(os.path.dirname(__file__), '..'))
+    process.stdout.readline()  # the "ready" line
+    return process
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m geopar.tf_load_test', description=__doc__.split('\n')[1])
+    parser.add_argument('--socket')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--depth', type=int, default=16, help='requests in flight per connection')
+    parser.add_argument('--triangles', type=int, default=100, help='triangles per figure')
+    parser.add_argument('--workers', type=int, help='workers of the service started for the test')
+    arguments = parser.parse_args(argv)
+
+    figures = generated_figures(arguments.requests, arguments.triangles)
+    process = None
+    if arguments.socket is None and arguments.port is None:
+        arguments.socket = os.path.join(tempfile.mkdtemp(), 'geopar.sock')
+        process = start_service(arguments.socket, arguments.workers)
+    try:
+        results = load((arguments.socket, arguments.port), figures, arguments.connections, arguments.depth)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print('{} requests of {} triangles in {seconds:.2f}s: {requests_per_second:.1f} requests/s, '
+          'latency p50 {latency_p50:.4f}s p95 {latency_p95:.4f}s max {latency_max:.4f}s, {failed} failed'
+          .format(arguments.requests, arguments.triangles, **results))
+    return 1 if results['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import weakref
+
+__author__ = 'ebraude'
+
+MASK = 2 ** 64 - 1
+
+
+def mixed_hash(an_angle):
+    """
+    Returns: a 64-bit hash of the known an_angle, equal for equal angles of the same dimension.
+    The hash of the coefficients is put through the splitmix64 finaliser, to spread it over 64 bits.
+    Python hashes a Fraction modulo 2 ** 61 - 1, so angles whose coefficients are congruent modulo it
+    (e.g. 30 and 30 + 2 ** 61 - 1) have the same hash: this screens, it does not decide.
+    """
+
+    h = hash(tuple(an_angle.get_coefficients())) & MASK
+    h = (h ^ (h >> 30)) * 0xbf58476d1ce4e5b9 & MASK
+    h = (h ^ (h >> 27)) * 0x94d049bb133111eb & MASK
+    return h ^ (h >> 31)
+
+
+class TF_PairingSignatures(object):
+    """
+    Intent: Running multiset signatures of the known angles following and of those preceding
+    every interior point of a TriangulatedFigure, so that whether they pair is decided in O(1).
+
+    The signature of a multiset of known angles is its size and the sum, mod 2 ** 64, of the
+    mixed_hash() of its elements. Equal multisets have equal signatures; different ones have
+    different signatures unless their hashes collide (see mixed_hash()), so a match must be
+    confirmed exactly, as TF_Elaborations.apply_pairing_at() does. changed() is added, weakly, to the
+    listeners of every triangle, and updates the (at most two) signatures an angle belongs to in O(1);
+    signatures no longer referenced (e.g. those of a discarded copy sharing the triangles) remove
+    themselves from the listeners at the next change.
+
+    Class Invariants (v is the index of an interior point, side is 0 for following, 1 for preceding):
+    1. self.points[v] is an interior point, self.index_of[self.points[v]] = v
+    2. self.fan_sizes[v] is the number of triangles at self.points[v]
+    3. self.sums[2v + side] / self.counts[2v + side] are the sum of hashes / number of
+       the known angles on that side of self.points[v]
+    4. self.sides[id(t)][s] lists the 2v + side that the angle in slot s of triangle t is on
+    """
+
+    def __init__(self, a_tf):
+        """
+        PRE: the angles of a_tf change only through the methods of Triangle
+        POST: the class invariants hold, and every triangle of a_tf has self.__listener, which calls
+        changed() while self is referenced, among its listeners
+        """
+
+        fans = a_tf.fans()
+        self.points = list(fans)
+        self.index_of = {point: v for v, point in enumerate(self.points)}
+        self.fan_sizes = [len(fans[point]) for point in self.points]
+        self.sums, self.counts = [0] * (2 * len(self.points)), [0] * (2 * len(self.points))
+        self.sides = {id(triangle): ([], [], []) for triangle in a_tf.get_triangles()}
+        self.__triangles = a_tf.get_triangles()
+        self.__listener = weak_listener(self.changed)
+
+        for v, point in enumerate(self.points):
+            for triangle, following, preceding in fans[point]:
+                sides = self.sides[id(triangle)]
+                sides[following].append(2 * v)
+                sides[preceding].append(2 * v + 1)
+
+        for triangle in self.__triangles:
+            for slot, angle in enumerate(triangle.get_angles()):
+                if angle.is_known():
+                    self.__count(triangle, slot, mixed_hash(angle), 1)
+            triangle.add_listener(self.__listener)
+
+    def __count(self, a_triangle, a_slot, a_hash, a_sign):
+        # Postcondition: a_hash is added (a_sign = 1) to / removed (a_sign = -1) from the sides of the slot
+
+        for side in self.sides[id(a_triangle)][a_slot]:
+            self.sums[side] = (self.sums[side] + a_sign * a_hash) & MASK
+            self.counts[side] += a_sign
+
+    def changed(self, a_triangle, a_slot, a_replaced_angle):
+        # Postcondition: the class invariants hold again after the angle in a_slot of a_triangle replaced a_replaced_angle
+
+        if a_replaced_angle.is_known():
+            self.__count(a_triangle, a_slot, mixed_hash(a_replaced_angle), -1)
+        angle = a_triangle.get_angles()[a_slot]
+        if angle.is_known():
+            self.__count(a_triangle, a_slot, mixed_hash(angle), 1)
+
+    def detach(self):
+        # Postcondition: the triangles no longer update self
+
+        for triangle in self.__triangles:
+            triangle.remove_listener(self.__listener)
+
+    def unknowns(self, a_point):
+        # Returns: (number of unknown angles following, number preceding) the interior point a_point
+
+        v = self.index_of[a_point]
+        return self.fan_sizes[v] - self.counts[2 * v], self.fan_sizes[v] - self.counts[2 * v + 1]
+
+    def pairs(self, a_point):
+        # Returns: whether the known angles following and preceding the interior point a_point are the same multiset
+
+        v = self.index_of[a_point]
+        return self.counts[2 * v] == self.counts[2 * v + 1] and self.sums[2 * v] == self.sums[2 * v + 1]
+
+
+def weak_listener(a_method):
+    # Returns: a Triangle listener that calls a_method while its object is referenced elsewhere,
+    # and removes itself from the listeners of the triangle that calls it once it is not
+
+    reference = weakref.WeakMethod(a_method)
+
+    def listener(a_triangle, a_slot, a_replaced_angle):
+        method = reference()
+        if method is None:
+            a_triangle.remove_listener(listener)
+        else:
+            method(a_triangle, a_slot, a_replaced_angle)
+
+    return listener
@@ -0,0 +1,208 @@
+import multiprocessing
+from collections import deque
+
+from geopar.tf_topology import TF_Topology
+from geopar.tf_validator import TF_Validator
+from geopar.triangulated_figure_class import TriangulatedFigure
+
+__author__ = 'ebraude'
+
+
+class TF_ParallelElaborations(object):
+    """
+    The 180 and 360 rules of TF_Elaborations applied to a large TriangulatedFigure
+    by several processes, each owning one region of it.
+
+    A region is a set of triangles that are close in the vertex-fan adjacency (see partition()).
+    It owns the interior points whose fans begin in it, and holds as its "halo" the other
+    triangles of their fans. Each round, every process applies the 180 rule to its own triangles
+    and the 360 rule at its own points until they produce nothing further; the corners that became
+    known in triangles held by other regions are then sent to them. Rounds end when none are sent.
+
+    Whether a rule applies depends only on which corners are known, so this determines the same
+    corners as the sequential fixpoint (run.elaborate()). It also gives them the same angles if, at the end,
+    every triangle and interior point whose angles are all known satisfies its rule: the corner that
+    the sequential fixpoint sets with a rule is then, by induction, the same as here. Otherwise the
+    premises are inconsistent, and the order in which the rules were applied matters, so the premises
+    are restored and the sequential fixpoint is computed instead.
+    """
+
+    @staticmethod
+    def apply_180_360_rules_to(a_tf, number_of_processes=None):
+        """
+        Intent: The fixpoint of the 180 and 360 rules on a_tf, computed in parallel
+
+        PRE: a_tf is a non-empty, consistently oriented TriangulatedFigure
+        POST: as for run.elaborate(a_tf, ['apply_180_rule_to', 'apply_360_rule_to'])
+        """
+
+        number_of_processes = number_of_processes or multiprocessing.cpu_count()
+        topology = TF_Topology(a_tf)
+        regions = TF_ParallelElaborations.partition(topology, number_of_processes)
+        triangles = a_tf.get_triangles()
+        premises = [list(triangle.get_angles()) for triangle in triangles]
+
+        # --(Regions): locals_[r] lists the triangles held by region r, its own first
+        #   AND holders[t] lists the (region, local index) pairs that hold triangle t
+        locals_, holders = [], [[] for _ in triangles]
+        for r, (owned, halo, points) in enumerate(regions):
+            locals_.append(owned + halo)
+            for local, t in enumerate(locals_[r]):
+                holders[t].append((r, local))
+
+        # --(Started): one process per region, with a copy of its triangles
+        connections, processes = [], []
+        for r, (owned, halo, points) in enumerate(regions):
+            shared = {local for local, t in enumerate(locals_[r]) if len(holders[t]) > 1}
+            ours, theirs = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=region_worker, daemon=True, args=(
+                theirs, TriangulatedFigure([triangles[t] for t in locals_[r]]), len(owned), points, shared))
+            process.start()
+            theirs.close()
+            connections.append(ours)
+            processes.append(process)
+
+        try:
+            # --(Exchanged): until a round produces no corner that another region holds
+            inboxes = [[] for _ in regions]
+            while True:
+                for connection, inbox in zip(connections, inboxes):
+                    connection.send(inbox)
+                inboxes = [[] for _ in regions]
+                for r, connection in enumerate(connections):
+                    for local, slot, angle in connection.recv():
+                        for other, other_local in holders[locals_[r][local]]:
+                            if other != r:
+                                inboxes[other].append((other_local, slot, angle))
+                if not any(inboxes):
+                    break
+
+            # --(Collected): a_tf has the angles of every region's own triangles
+            for r, connection in enumerate(connections):
+                connection.send(None)
+                for t, angles in zip(regions[r][0], connection.recv()):
+                    for slot, angle in enumerate(angles):
+                        triangles[t].set_angle_by_index(slot, angle)
+        finally:
+            for connection, process in zip(connections, processes):
+                connection.close()
+                process.join()
+
+        # --(Checked): the same angles as the sequential fixpoint, or the premises restored and that computed
+        if not TF_ParallelElaborations.satisfies_rules(a_tf, topology):
+            from geopar.run import elaborate
+            for triangle, angles in zip(triangles, premises):
+                for slot, angle in enumerate(angles):
+                    if angle is not triangle.get_angles()[slot]:
+                        triangle.set_angle_by_index(slot, angle)
+            elaborate(a_tf, ['apply_180_rule_to', 'apply_360_rule_to'])
+
+    @staticmethod
+    def satisfies_rules(a_tf, a_topology):
+        """
+        Returns: whether the angles of every triangle of a_tf add up to 180, and those at every
+        interior point to 360, where they are all known (as TF_Validator checks, with a_topology
+        answering its topological queries)
+
+        PRE: a_topology is a TF_Topology of a_tf
+        """
+
+        topology = a_tf.get_topology()
+        a_tf.set_topology(a_topology)
+        try:
+            return TF_Validator.check_180_rule(a_tf) and TF_Validator.check_360_rule(a_tf)
+        finally:
+            a_tf.set_topology(topology)
+
+    @staticmethod
+    def partition(a_topology, number_of_regions):
+        """
+        Returns: number_of_regions triples (owned, halo, points), one per region, where
+        owned lists the triangles of the region: a contiguous part of a breadth-first order of the
+        triangles, in which the triangles at a point follow each other;
+        points lists the interior points whose fan begins with one of owned;
+        halo lists the triangles of the fans at points that are not in owned
+        """
+
+        fan_starts, fan_triangles, corners = a_topology.fan_starts, a_topology.fan_triangles, a_topology.triangles
+        number_of_triangles = a_topology.number_of_triangles
+
+        # --(Ordered): breadth-first over the fans, starting again at each component
+        order, seen = [], bytearray(number_of_triangles)
+        for first in range(number_of_triangles):
+            if seen[first]:
+                continue
+            seen[first] = 1
+            queue = deque([first])
+            while queue:
+                t = queue.popleft()
+                order.append(t)
+                for p in corners[3 * t:3 * t + 3]:
+                    for neighbour in fan_triangles[fan_starts[p]:fan_starts[p + 1]]:
+                        if not seen[neighbour]:
+                            seen[neighbour] = 1
+                            queue.append(neighbour)
+
+        region_of = [0] * number_of_triangles
+        regions = []
+        for r in range(number_of_regions):
+            owned = order[r * number_of_triangles // number_of_regions:
+                          (r + 1) * number_of_triangles // number_of_regions]
+            for t in owned:
+                region_of[t] = r
+            regions.append((owned, [], []))
+
+        for p in a_topology.interior:
+            owned, halo, points = regions[region_of[fan_triangles[fan_starts[p]]]]
+            points.append(a_topology.vertex_ids[p])
+            for t in fan_triangles[fan_starts[p]:fan_starts[p + 1]]:
+                if region_of[t] != region_of[fan_triangles[fan_starts[p]]]:
+                    halo.append(t)
+
+        return [(owned, sorted(set(halo)), points) for owned, halo, points in regions]
+
+
+def region_worker(a_connection, a_tf, number_owned, interior_points, shared):
+    """
+    Intent: The process of one region (see TF_ParallelElaborations)
+
+    PRE: the first number_owned triangles of a_tf are the region's own, interior_points its points,
+    and a_tf holds every triangle at each of interior_points; shared has the indices of the
+    triangles that other regions hold as well
+    Each message received is a list of (triangle index, slot, angle) corners that became known
+    elsewhere, to which a list of the corners of shared triangles that became known here is replied;
+    the message None is replied with the angles of the region's own triangles, and ends the process.
+    """
+
+    a_tf.set_topology(TF_Topology(a_tf))
+    triangles = a_tf.get_triangles()
+    own = triangles[:number_owned]
+
+    while True:
+        message = a_connection.recv()
+        if message is None:
+            a_connection.send([triangle.get_angles() for triangle in own])
+            a_connection.close()
+            return
+
+        for t, slot, angle in message:
+            if not triangles[t].get_angles()[slot].is_known():
+                triangles[t].set_angle_by_index(slot, angle)
+
+        # --(Fixpoint): the 180 rule on own triangles and the 360 rule at interior_points
+        known_before = [[angle.is_known() for angle in triangle.get_angles()] for triangle in triangles]
+        changed = True
+        while changed:
+            changed = False
+            for triangle in own:
+                if triangle.number_of_known() == 2:
+                    triangle.complete_unknown_angle()
+                    changed = True
+            for point in interior_points:
+                if a_tf.number_of_unknown_angles_at(point) == 1:
+                    a_tf.make_angles_known_at(point)
+                    changed = True
+
+        a_connection.send([(t, slot, angle) for t in shared
+                           for slot, angle in enumerate(triangles[t].get_angles())
+                           if angle.is_known() and not known_before[t][slot]])
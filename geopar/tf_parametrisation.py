@@ -0,0 +1,224 @@
+from fractions import Fraction
+
+from geopar.angle_class import Angle
+
+__author__ = 'ebraude'
+
+
+class TF_Parametrisation(object):
+    """
+    Intent: The unknown angles of a TriangulatedFigure, each as an affine combination of a
+    minimal set of "free" unknowns, from the 180 rule of every triangle and the 360 rule of
+    every interior point taken as linear equations (pairing is not linear, and is not used).
+
+    The equations are reduced one by one, by sparse row reduction over Fractions: each row
+    expresses a "pivot" unknown in terms of free unknowns only, so a value for each free unknown
+    is a substitution away from a value for every unknown (see substitute()).
+    Corner 3t + s is slot s of triangle t, as in TF_Writer.premises().
+
+    Class Invariants:
+    1. self.unknowns lists the corners of self.tf that were unknown, ascending
+    2. self.dimension is the number of coefficients of the angles of self.tf
+    3. self.consistent is whether the equations have a solution
+    4. self.__rows[p] = (terms, constant) for each pivot p, where the angle at p is
+       sum(terms[c] * the angle at c for c in terms) + the angle with coefficients constant,
+       every c in terms being free and every terms[c] nonzero
+    5. self.__uses[c] is the set of pivots whose terms have the free corner c
+    """
+
+    def __init__(self, a_tf):
+        """
+        PRE: the known angles of a_tf have the same dimension
+        POST: the class invariants hold, a_tf being self.tf
+        """
+
+        self.tf = a_tf
+        triangles = a_tf.get_triangles()
+        self.unknowns = [3 * t + s for t, triangle in enumerate(triangles)
+                         for s, angle in enumerate(triangle.get_angles()) if not angle.is_known()]
+        self.dimension = next((len(angle.get_coefficients()) for triangle in triangles
+                               for angle in triangle.get_angles() if angle.is_known()), 1)
+        self.consistent = True
+        self.__rows, self.__uses = {}, {}
+
+        # --(180): one equation per triangle with an unknown angle
+        for t, triangle in enumerate(triangles):
+            if triangle.has_unknown_angle():
+                self.__add_equation([(3 * t + s, angle) for s, angle in enumerate(triangle.get_angles())], 180)
+
+        # --(360): one equation per interior point with an unknown angle
+        index_of = {id(triangle): t for t, triangle in enumerate(triangles)}
+        for point, fan in a_tf.fans().items():
+            corners = []
+            for triangle, following, preceding in fan:
+                s = 3 - following - preceding
+                corners.append((3 * index_of[id(triangle)] + s, triangle.get_angles()[s]))
+            if any(not angle.is_known() for corner, angle in corners):
+                self.__add_equation(corners, 360)
+
+    def __add_equation(self, some_corners, a_total):
+        # Postcondition: the class invariants hold with the equation that the angles of some_corners,
+        # (corner, angle) pairs, add up to a_total
+
+        terms, constant = {}, [Fraction(0)] * (self.dimension - 1) + [Fraction(a_total)]
+        for corner, angle in some_corners:
+            if angle.is_known():
+                constant = [a - b for a, b in zip(constant, angle.get_coefficients())]
+            else:
+                terms[corner] = terms.get(corner, 0) + 1
+
+        # --(Reduced): terms has free corners only
+        for pivot in [corner for corner in terms if corner in self.__rows]:
+            factor = terms.pop(pivot)
+            row_terms, row_constant = self.__rows[pivot]
+            for corner, coefficient in row_terms.items():
+                value = terms.get(corner, 0) + factor * coefficient
+                if value:
+                    terms[corner] = value
+                else:
+                    terms.pop(corner, None)
+            constant = [a - factor * b for a, b in zip(constant, row_constant)]
+
+        if not terms:
+            if any(constant):
+                self.consistent = False
+            return
+
+        # --(Pivoted): on the free corner in the fewest rows, to keep the rows sparse
+        pivot = min(terms, key=lambda corner: (len(self.__uses.get(corner, ())), corner))
+        factor = terms.pop(pivot)
+        row_terms = {corner: -coefficient / factor for corner, coefficient in terms.items()}
+        row_constant = [a / factor for a in constant]
+
+        # --(Substituted): pivot is no longer free, so the rows that used it use row instead
+        for other in self.__uses.pop(pivot, ()):
+            other_terms, other_constant = self.__rows[other]
+            factor = other_terms.pop(pivot)
+            for corner, coefficient in row_terms.items():
+                value = other_terms.get(corner, 0) + factor * coefficient
+                if value:
+                    other_terms[corner] = value
+                    self.__uses.setdefault(corner, set()).add(other)
+                else:
+                    other_terms.pop(corner, None)
+                    self.__uses[corner].discard(other)
+            self.__rows[other] = (other_terms, [a + factor * b for a, b in zip(other_constant, row_constant)])
+
+        self.__rows[pivot] = (row_terms, row_constant)
+        for corner in row_terms:
+            self.__uses.setdefault(corner, set()).add(pivot)
+
+    def free(self):
+        # Returns: the free unknown corners, ascending
+
+        return [corner for corner in self.unknowns if corner not in self.__rows]
+
+    def expression(self, a_corner):
+        """
+        Returns: (terms, constant) such that the angle at a_corner is
+        sum(terms[c] * the angle at c for c in terms) + constant, where every c is free and constant an Angle
+        """
+
+        if a_corner in self.__rows:
+            terms, constant = self.__rows[a_corner]
+            return dict(terms), Angle(constant)
+        angle = self.tf.get_triangles()[a_corner // 3].get_angles()[a_corner % 3]
+        if angle.is_known():
+            return {}, angle
+        return {a_corner: Fraction(1)}, Angle([0] * self.dimension)
+
+    def determined(self):
+        # Returns: {corner: its Angle} for the unknown corners that the equations determine
+
+        return {corner: Angle(constant) for corner, (terms, constant) in sorted(self.__rows.items()) if not terms}
+
+    def apply_determined(self):
+        # Postcondition: the corners of determined() have their angles in self.tf
+        # Returns: the number of angles set
+
+        triangles, determined = self.tf.get_triangles(), self.determined()
+        for corner, angle in determined.items():
+            triangles[corner // 3].set_angle_by_index(corner % 3, angle)
+        return len(determined)
+
+    def substitute(self, some_values):
+        """
+        Returns: {corner: its Angle} for every unknown corner, given the Angle (or int|float) of each free corner
+
+        PRE: some_values maps every corner of free() to its value
+        """
+
+        values = {corner: value if isinstance(value, Angle) else Angle([0] * (self.dimension - 1) + [value])
+                  for corner, value in some_values.items()}
+        result = {}
+        for corner in self.unknowns:
+            if corner not in self.__rows:
+                result[corner] = values[corner]
+                continue
+            terms, constant = self.__rows[corner]
+            result[corner] = Angle.sum([Angle(constant)] + [Angle([c * coefficient for c in values[free].get_coefficients()])
+                                                            for free, coefficient in terms.items()])
+        return result
+
+    def settling_corners(self):
+        """
+        Returns: the unknown corners any one of which, as an extra premise, would determine every unknown:
+        if exactly one unknown is free, those whose expression involves it; otherwise none
+        """
+
+        free = self.free()
+        if len(free) != 1:
+            return []
+        return [corner for corner in self.unknowns if corner == free[0] or free[0] in self.__rows[corner][0]]
+
+    def angle_points(self, a_corner):
+        # Returns: the clockwise angle points of a_corner
+
+        triangle = self.tf.get_triangles()[a_corner // 3]
+        return triangle.get_angle_points_by_point(triangle.get_points()[a_corner % 3])
+
+    def corner_text(self, a_corner):
+        # Returns: a_corner as in its angle, e.g. '∠(3,1,2)'
+
+        return '∠({},{},{})'.format(*self.angle_points(a_corner))
+
+    def text(self):
+        """
+        Returns: one line per unknown corner that is not free, as its expression,
+        e.g. '∠(4,6,3) = -∠(1,5,4) + 1/2∠(2,6,5) + 90'
+        """
+
+        lines = []
+        for corner in self.unknowns:
+            if corner not in self.__rows:
+                continue
+            terms, constant = self.__rows[corner]
+            parts = []
+            for free, coefficient in sorted(terms.items()):
+                parts.append(' - ' if coefficient < 0 else ' + ')
+                if abs(coefficient) != 1:
+                    parts.append(str(abs(coefficient)))
+                parts.append(self.corner_text(free))
+            constant_text = str(Angle(constant))
+            if constant_text != '0' or not parts:
+                parts.extend([' - ', constant_text[1:]] if constant_text.startswith('-') else [' + ', constant_text])
+            parts[0] = '-' if parts[0] == ' - ' else ''
+            lines.append('{} = {}'.format(self.corner_text(corner), ''.join(parts)))
+        return '\n'.join(lines)
+
+    def report(self):
+        # Returns: text() with a heading, and the settling corners or why there are none
+
+        free = self.free()
+        lines = ['{} unknown angles, {} of them free:'.format(len(self.unknowns), len(free))]
+        if not self.consistent:
+            lines.append('The premises contradict the 180 and 360 rules.')
+        if self.unknowns:
+            lines.append(self.text())
+        if len(free) == 1:
+            lines.append('Any one of these as a premise would settle the figure: ' +
+                         ', '.join(self.corner_text(corner) for corner in self.settling_corners()))
+        elif free:
+            lines.append('No single premise settles the figure: {} are needed, e.g. {}.'.format(
+                len(free), ', '.join(self.corner_text(corner) for corner in free)))
+        return '\n'.join(lines)
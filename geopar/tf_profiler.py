@@ -0,0 +1,140 @@
+import json
+import time
+
+from geopar.angle_class import angles_created, start_counting, stop_counting
+
+__author__ = 'ebraude'
+
+
+class TF_RuleRecord(object):
+    """
+    Intent: What one application of one rule to a triangulated figure cost and produced
+
+    Attributes:
+    phase: name of the fixpoint loop (e.g., 'before pairing') or 'validation'
+    iteration: number of the fixpoint iteration within phase, from 1 (0 for validation)
+    rule: name of the rule, e.g., 'apply_180_rule_to'
+    start, seconds: wall time (relative to the profiler's creation) and duration
+    examined: number of triangles (180 rule) or interior points (other rules) examined
+    deduced: number of angles that became known
+    allocated: number of Angle objects created (in the thread that applied the rule)
+    """
+
+    def __init__(self, phase, iteration, rule, start, seconds, examined, deduced, allocated):
+        self.phase, self.iteration, self.rule = phase, iteration, rule
+        self.start, self.seconds = start, seconds
+        self.examined, self.deduced, self.allocated = examined, deduced, allocated
+
+    def __repr__(self):
+        return 'TF_RuleRecord({} #{} {}: {:.6f}s, examined={}, deduced={}, allocated={})'.format(
+            self.phase, self.iteration, self.rule, self.seconds, self.examined, self.deduced, self.allocated)
+
+
+class TF_Profiler(object):
+    """
+    Intent: Opt-in instrumentation of run(): one TF_RuleRecord per rule per fixpoint iteration.
+    Nothing is recorded unless a TF_Profiler is passed to run(); nothing is patched, so
+    profilers in different threads do not interfere.
+
+    Class Invariants:
+    1. self.records lists the TF_RuleRecords in the order the rules were applied
+    2. self.phase / self.iteration describe the current fixpoint iteration
+    """
+
+    def __init__(self):
+        self.records = []
+        self.phase, self.iteration = '', 0
+        self.__origin = time.perf_counter()
+
+    def begin_iteration(self, a_phase):
+        # Postcondition: later records belong to the next iteration of a_phase
+
+        if a_phase != self.phase:
+            self.phase, self.iteration = a_phase, 0
+        self.iteration += 1
+
+    def measure(self, a_rule_name, a_rule, a_tf, examined):
+        """
+        Intent: Apply a_rule to a_tf, recording its cost in self.records
+
+        PRE: a_rule(a_tf) is a rule or a validation rule; examined is as in TF_RuleRecord
+        Returns: a_rule(a_tf)
+        """
+
+        known_before = TF_Profiler.number_of_known(a_tf)
+
+        # --(Counting): by the Angles created in this thread while a_rule runs, so other threads do not count
+        start_counting()
+        try:
+            created_before = angles_created.created
+            start = time.perf_counter()
+            result = a_rule(a_tf)
+            seconds = time.perf_counter() - start
+            created = angles_created.created - created_before
+        finally:
+            stop_counting()
+
+        self.records.append(TF_RuleRecord(self.phase, self.iteration, a_rule_name,
+                                          start - self.__origin, seconds, examined,
+                                          TF_Profiler.number_of_known(a_tf) - known_before,
+                                          created))
+        return result
+
+    @staticmethod
+    def number_of_known(a_tf):
+        # Returns: the number of known angles in a_tf
+
+        return sum(triangle.number_of_known() for triangle in a_tf.get_triangles())
+
+    def totals(self):
+        """
+        Returns: {rule: {'calls', 'seconds', 'examined', 'deduced', 'allocated'}},
+        the records of each rule added up
+        """
+
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record.rule, dict.fromkeys(
+                ['calls', 'seconds', 'examined', 'deduced', 'allocated'], 0))
+            total['calls'] += 1
+            total['seconds'] += record.seconds
+            total['examined'] += record.examined
+            total['deduced'] += record.deduced
+            total['allocated'] += record.allocated
+        return totals
+
+    def iterations(self):
+        # Returns: {phase: number of fixpoint iterations}
+
+        result = {}
+        for record in self.records:
+            result[record.phase] = max(result.get(record.phase, 0), record.iteration)
+        return result
+
+    def to_chrome_trace(self):
+        """
+        Returns: self.records as a list of Chrome-trace "complete" events
+        (load into chrome://tracing or Perfetto); rules are on thread 1
+        and the fixpoint iterations that contain them on thread 0
+        """
+
+        events, spans = [], {}
+        for record in self.records:
+            events.append({'name': record.rule, 'cat': record.phase, 'ph': 'X', 'pid': 1, 'tid': 1,
+                           'ts': record.start * 1e6, 'dur': record.seconds * 1e6,
+                           'args': {'iteration': record.iteration, 'examined': record.examined,
+                                    'deduced': record.deduced, 'allocated': record.allocated}})
+            key = (record.phase, record.iteration)
+            begin, end = spans.get(key, (record.start, record.start))
+            spans[key] = (min(begin, record.start), max(end, record.start + record.seconds))
+
+        for (phase, iteration), (begin, end) in spans.items():
+            events.append({'name': '{} #{}'.format(phase, iteration), 'cat': phase, 'ph': 'X',
+                           'pid': 1, 'tid': 0, 'ts': begin * 1e6, 'dur': (end - begin) * 1e6})
+        return events
+
+    def write_chrome_trace(self, a_path):
+        # Postcondition: the file at a_path holds self.to_chrome_trace() as JSON
+
+        with open(a_path, 'w') as file:
+            json.dump({'traceEvents': self.to_chrome_trace()}, file)
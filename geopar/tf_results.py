@@ -0,0 +1,99 @@
+"""
+Machine-readable results of solver runs, in JSON Lines: one JSON object per configuration,
+written as soon as it is solved. A record is
+
+    {"index": 3, "label": "bisectors", "outcome": "1B. UNIQUE ALL-ANGLE CONSEQUENCE OF THE PREMISES.",
+     "classification": "unique", "angles": [[["0", "1", "0"], ["1/2", "0", "30"], null], ...],
+     "statistics": {"seconds": 0.004, "iterations": 3, "deduced": 12},
+     "valid": {"180": true, "360": true, "pairing": true}}
+
+"angles" lists the angles of each triangle in the order of the configuration, each as its
+coefficients (constant last, as in the requests of tf_service) or null if still unknown;
+"classification" names the outcome (see CLASSIFICATIONS); "valid" is TF_Validator's verdict on
+each rule for the figure as deduced. A run stopped by its budget has "exceeded" as well
+("seconds", "iterations" or "deduced"). A run without a budget is timed and counted without one,
+so that it takes the solver's fastest path, and its "iterations" are null.
+"""
+
+import json
+import time
+
+from geopar.run import solve, UNIQUE, INCONCLUSIVE_1, INCONCLUSIVE_1A, CONSEQUENCE, INCONCLUSIVE_2, BUDGET_EXCEEDED
+from geopar.tf_validator import TF_Validator
+
+__author__ = 'ebraude'
+
+# The "classification" of each outcome of run.solve()
+CLASSIFICATIONS = {UNIQUE: 'unique', INCONCLUSIVE_1: 'inconclusive_1', INCONCLUSIVE_1A: 'inconclusive_1a',
+                   CONSEQUENCE: 'consequence', INCONCLUSIVE_2: 'inconclusive_2', BUDGET_EXCEEDED: 'budget_exceeded'}
+
+
+def angles_to_json(a_tf):
+    # Returns: the angles of a_tf, triangle by triangle, each as its coefficients (str) or None if unknown
+
+    return [[[str(c) for c in angle.get_coefficients()] if angle.is_known() else None
+             for angle in triangle.get_angles()]
+            for triangle in a_tf.get_triangles()]
+
+
+def result_record(an_index, a_label, a_tf, an_outcome, some_statistics, an_exceeded=None):
+    """
+    Returns: the record (see above) of configuration an_index, labelled a_label,
+    which run.solve() left as a_tf with an_outcome, with some_statistics of the run;
+    an_exceeded is the reason its budget ran out, if it did
+    """
+
+    record = {'index': an_index, 'label': a_label, 'outcome': an_outcome,
+              'classification': CLASSIFICATIONS[an_outcome], 'angles': angles_to_json(a_tf),
+              'statistics': some_statistics,
+              'valid': {'180': TF_Validator.check_180_rule(a_tf), '360': TF_Validator.check_360_rule(a_tf),
+                        'pairing': TF_Validator.check_pairing(a_tf)}}
+    if an_exceeded:
+        record['exceeded'] = an_exceeded
+    return record
+
+
+def solve_to_record(an_index, a_label, a_tf, pairing=True, budget=None):
+    """
+    Intent: Solve a_tf (see run.solve()), timing and counting the run with budget,
+    or, if budget is None, with the clock and the known angles before and after
+    Returns: the record of the result (see result_record())
+    """
+
+    if budget is not None:
+        budget.restart()
+        outcome = solve(a_tf, pairing, budget=budget)
+        return result_record(an_index, a_label, a_tf, outcome, budget.statistics(), budget.exceeded)
+
+    known_before = sum(triangle.number_of_known() for triangle in a_tf.get_triangles())
+    start = time.perf_counter()
+    outcome = solve(a_tf, pairing)
+    statistics = {'seconds': time.perf_counter() - start, 'iterations': None,
+                  'deduced': sum(triangle.number_of_known() for triangle in a_tf.get_triangles()) - known_before}
+    return result_record(an_index, a_label, a_tf, outcome, statistics)
+
+
+class TF_ResultsWriter(object):
+    """
+    Intent: Writes records to a text file as JSON Lines, each as it comes,
+    so that memory does not grow with the number of records
+
+    Class Invariants:
+    1. self.file is the text file written to
+    2. self.number_written records have been written
+    """
+
+    def __init__(self, a_file):
+        self.file, self.number_written = a_file, 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception_info):
+        self.file.flush()
+
+    def write(self, a_record):
+        # Postcondition: a_record is written as one line
+
+        self.file.write(json.dumps(a_record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self.number_written += 1
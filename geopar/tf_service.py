@@ -0,0 +1,240 @@
+"""
+A long-running local GEOPAR solver: an asyncio front end on a Unix socket or localhost TCP port
+that hands figures to a pool of pre-warmed worker processes running run.solve().
+
+Usage: python -m geopar.tf_service (--socket PATH | --port PORT) [--workers N] [--timeout SECONDS]
+
+Protocol: one JSON object per line, in both directions. A request is
+    {"id": 7, "figure": ..., "pairing": true, "timeout": 10, "budget": {"iterations": 100, "deduced": 5000}}
+where "figure" is either a configuration in the input.txt format (a string)
+or {"triangles": [{"points": [1, 2, 3], "angles": [["1/3", "0", "20"], null, ...]}, ...]},
+each angle being its coefficients (constant last) or null if unknown.
+Only "figure" is required. "budget" limits the solver run (see TF_Budget); its "seconds" default to the timeout.
+Requests may be pipelined: the reply to each is written as soon as it is
+ready, so replies can come out of order; they carry the request's "id". A reply is
+    {"id": 7, "status": "ok", "outcome": "2. A CONSEQUENCE OF THE PREMISES.", "figure": ..., "seconds": 0.01,
+     "statistics": {"seconds": 0.01, "iterations": 3, "deduced": 12}}
+with the figure as deduced, in the format of the request; the outcome "BUDGET EXCEEDED" comes with the figure
+as far as it was deduced and "exceeded": "seconds", "iterations" or "deduced".
+Otherwise the reply is {"id": 7, "status": "error", "error": "..."} (a request that is not an object
+with a "figure", or whose "timeout" is not a number or null, is a "bad request"), or {"id": 7, "status": "timeout"}
+if no reply came TIMEOUT_GRACE seconds after the timeout.
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import io
+import json
+import os
+import sys
+import time
+from fractions import Fraction
+
+from geopar.angle_class import Angle
+from geopar.run import Parser, solve
+from geopar.tf_budget import TF_Budget
+from geopar.tf_generator import TF_Generator
+from geopar.tf_topology_validator import TF_TopologyValidator
+from geopar.triangle_class import Triangle
+from geopar.triangulated_figure_class import TriangulatedFigure
+
+__author__ = 'ebraude'
+
+# Longest request line accepted, in bytes
+LINE_LIMIT = 64 * 1024 * 1024
+
+# Seconds past its timeout that a request's worker has to reply with a partial result
+TIMEOUT_GRACE = 1.0
+
+
+def figure_from_json(an_object):
+    """
+    Returns: the TriangulatedFigure that an_object, in the JSON format above, describes
+    (an Exception if TF_TopologyValidator finds something wrong with it)
+    """
+
+    triangles = []
+    for triangle in an_object['triangles']:
+        angles = [Angle([]) if angle is None else Angle([Fraction(c) for c in angle]) for angle in triangle['angles']]
+        triangles.append(Triangle(list(triangle['points']), angles))
+    result = TriangulatedFigure(triangles)
+    TF_TopologyValidator.check(result)
+    return result
+
+
+def figure_to_json(a_tf):
+    # Returns: a_tf in the JSON format above
+
+    return {'triangles': [{'points': list(triangle.get_points()),
+                           'angles': [[str(c) for c in angle.get_coefficients()] if angle.is_known() else None
+                                      for angle in triangle.get_angles()]}
+                          for triangle in a_tf.get_triangles()]}
+
+
+def solve_request(a_request):
+    """
+    Intent: What a worker does with one request
+    Returns: the reply to a_request (see the protocol above), without its "id"
+    """
+
+    start = time.perf_counter()
+    try:
+        figure = a_request['figure']
+        if isinstance(figure, str):
+            tf = Parser('').read_configuration_from(io.StringIO(figure))
+        else:
+            tf = figure_from_json(figure)
+        limits = dict(a_request.get('budget') or {})
+        limits.setdefault('seconds', a_request.get('timeout'))
+        budget = TF_Budget(**limits)
+        outcome = solve(tf, a_request.get('pairing', True), budget=budget)
+        if isinstance(figure, str):
+            dimension = max(angle.get_dimension() for triangle in tf.get_triangles()
+                            for angle in triangle.get_angles())
+            figure = TF_Generator.format_configuration(tf, dimension)
+        else:
+            figure = figure_to_json(tf)
+    except Exception as exception:
+        return {'status': 'error', 'error': '{}: {}'.format(type(exception).__name__, exception)}
+    reply = {'status': 'ok', 'outcome': outcome, 'figure': figure, 'seconds': time.perf_counter() - start,
+             'statistics': budget.statistics()}
+    if budget.exceeded:
+        reply['exceeded'] = budget.exceeded
+    return reply
+
+
+def warm_up():
+    # Worker initializer: imports and exercises the solver so that the first request is not slow
+
+    figure = TF_Generator(seed=0).generate(20, unknown_ratio=0.2)
+    solve_request({'figure': TF_Generator.format_configuration(figure, 3)})
+    solve_request({'figure': figure_to_json(figure)})
+
+
+class TF_Service(object):
+    """
+    Intent: The asyncio front end of the solver service (see the protocol above)
+
+    Class Invariants:
+    1. self.executor is None (not started) or the pool of worker processes
+    2. self.timeout is the timeout, in seconds, of requests that do not give one (None: no timeout)
+    3. at most self.max_pending requests of one connection are being solved at once
+    """
+
+    def __init__(self, workers=None, timeout=None, max_pending=64):
+        self.workers = workers or os.cpu_count()
+        self.timeout, self.max_pending = timeout, max_pending
+        self.executor, self.server = None, None
+
+    async def start(self, path=None, host='127.0.0.1', port=0):
+        """
+        Intent: Start the workers (waiting until each is warm), then listen
+        on the Unix socket at path if given, on host:port otherwise
+        Returns: the asyncio server
+        """
+
+        self.executor = concurrent.futures.ProcessPoolExecutor(self.workers, initializer=warm_up)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.executor, time.sleep, 0) for _ in range(self.workers)])
+
+        if path is not None:
+            if os.path.exists(path):
+                os.remove(path)  # left by a server that did not stop cleanly
+            self.server = await asyncio.start_unix_server(self.handle, path, limit=LINE_LIMIT)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+        return self.server
+
+    async def handle(self, reader, writer):
+        # Serves one connection: every request line is solved concurrently, and replied to when done
+
+        pending, slots = set(), asyncio.Semaphore(self.max_pending)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await slots.acquire()
+                task = asyncio.ensure_future(self.reply(line, writer))
+                pending.add(task)
+                task.add_done_callback(lambda done: (pending.discard(done), slots.release()))
+            if pending:
+                await asyncio.wait(pending)
+        finally:
+            writer.close()
+
+    async def reply(self, a_line, writer):
+        # Postcondition: the reply to the request a_line is written to writer
+
+        request = None
+        try:
+            request = json.loads(a_line)
+            if not isinstance(request, dict) or 'figure' not in request:
+                raise ValueError('a request must be an object with a "figure"')
+            timeout = request.get('timeout')
+            if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float))):
+                raise ValueError('"timeout" must be a number of seconds or null')
+        except ValueError as exception:
+            response = {'id': request.get('id') if isinstance(request, dict) else None,
+                        'status': 'error', 'error': 'bad request: {}'.format(exception)}
+        else:
+            if timeout is None:
+                timeout = request['timeout'] = self.timeout
+            try:
+                future = self.executor.submit(solve_request, request)
+                response = await asyncio.wait_for(asyncio.wrap_future(future),
+                                                  None if timeout is None else timeout + TIMEOUT_GRACE)
+            except asyncio.TimeoutError:
+                future.cancel()  # only if no worker has started it
+                response = {'status': 'timeout'}
+            except Exception as exception:  # e.g. BrokenProcessPool: the request still gets its reply
+                response = {'status': 'error', 'error': '{}: {}'.format(type(exception).__name__, exception)}
+            response = dict(id=request.get('id'), **response)
+
+        writer.write(json.dumps(response).encode('utf-8') + b'\n')
+        await writer.drain()
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        # Postcondition: no more connections are accepted and the workers are stopped
+
+        if self.server is not None:
+            self.server.close()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m geopar.tf_service', description=__doc__.split('\n')[1])
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument('--socket', help='path of the Unix socket to listen on')
+    address.add_argument('--port', type=int, help='localhost TCP port to listen on')
+    parser.add_argument('--workers', type=int, help='number of worker processes (default: one per CPU)')
+    parser.add_argument('--timeout', type=float, help='default timeout of a request, in seconds')
+    arguments = parser.parse_args(argv)
+
+    async def serve():
+        service = TF_Service(arguments.workers, arguments.timeout)
+        await service.start(arguments.socket, port=arguments.port)
+        print('geopar service ready on {}'.format(arguments.socket or 'localhost:{}'.format(arguments.port)),
+              flush=True)
+        try:
+            await service.serve_forever()
+        finally:
+            service.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+from itertools import combinations
+
+from geopar.angle_class import Angle
+from geopar.tf_results import solve_to_record
+from geopar.tf_topology import TF_Topology
+
+__author__ = 'ebraude'
+
+# The TF_Topology attached by a worker of TF_Template.solve_all() (see attach_worker())
+worker_topology = None
+
+
+class TF_Template(object):
+    """
+    Intent: One triangulation solved under many premise assignments ("variants"), e.g. every way of
+    marking some of its angles as x. The topology (points, interior points, fans, edges; see TF_Topology)
+    and the fan slots of the pairing rule are computed once; each variant only builds its own angles
+    and pays for its own propagation. Variants can be solved in a pool of worker processes,
+    which share the topology through shared memory.
+
+    A premise vector lists the angles of a variant corner by corner: corner 3t + s is slot s of
+    triangle t of the template figure. Each is an Angle, an int or float, or None for unknown.
+
+    Class Invariants:
+    1. self.topology is the TF_Topology of the template figure, with its fan slots built
+    2. self.premises is the premise vector of the template figure
+    3. self.label labels the variants in the records of solve_all()
+    """
+
+    def __init__(self, a_tf, label=''):
+        """
+        PRE: a_tf is a non-empty TriangulatedFigure
+        POST: the class invariants hold for a_tf; a_tf itself is not used again
+        """
+
+        self.topology = TF_Topology(a_tf)
+        self.topology.fan_slots()
+        self.premises = TF_Topology.angles_of(a_tf)
+        self.label = label
+
+    def number_of_corners(self):
+
+        return len(self.premises)
+
+    def figure(self, a_premise_vector):
+        """
+        Returns: a new TriangulatedFigure of the template triangulation with the angles of a_premise_vector,
+        whose topological queries and fans are answered by self.topology
+
+        PRE: a_premise_vector has self.number_of_corners() elements
+        """
+
+        if len(a_premise_vector) != len(self.premises):
+            raise Exception('A premise vector needs {} angles.'.format(len(self.premises)))
+        return self.topology.figure([Angle([]) if angle is None else angle for angle in a_premise_vector])
+
+    def hiding(self, some_corners):
+        # Returns: the premise vector of the template figure, with the angles at some_corners unknown
+
+        result = list(self.premises)
+        for corner in some_corners:
+            result[corner] = None
+        return result
+
+    def hidings(self, a_number):
+        # Returns: an iterator over the premise vectors with a_number of the known angles of the template unknown,
+        # one per choice of corners (in the order of itertools.combinations)
+
+        known = [corner for corner, angle in enumerate(self.premises) if angle.is_known()]
+        return (self.hiding(corners) for corners in combinations(known, a_number))
+
+    def solve_all(self, premise_vectors, pairing=True, workers=1, budget=None):
+        """
+        Intent: Solve the variant of each premise vector (see run.solve())
+
+        PRE: premise_vectors is an iterable of premise vectors; budget is as in tf_results.solve_to_record()
+        Returns: an iterator over the records (see tf_results) of the variants, in order,
+        each indexed by its position in premise_vectors and labelled self.label;
+        with workers > 1, the variants are solved by a pool of that many processes
+        """
+
+        tasks = ((k, vector, pairing, budget) for k, vector in enumerate(premise_vectors))
+        if workers <= 1:
+            for k, vector, pairing, budget in tasks:
+                yield solve_to_record(k, self.label, self.figure(vector), pairing, budget)
+            return
+
+        import multiprocessing
+        with self.topology.share() as shared, \
+                multiprocessing.Pool(workers, initializer=attach_worker, initargs=(shared.handle,)) as pool:
+            for record in pool.imap(solve_variant, ((self.label,) + task for task in tasks), chunksize=4):
+                yield record
+
+
+def attach_worker(a_handle):
+    # Worker initializer: attaches to the topology shared by TF_Template.solve_all(), building its fan slots once
+
+    global worker_topology
+    worker_topology = TF_Topology.attach(a_handle)
+    worker_topology.fan_slots()
+
+
+def solve_variant(a_task):
+    # Returns: the record of the variant of a_task = (label, k, premise vector, pairing, budget), on worker_topology
+
+    label, k, vector, pairing, budget = a_task
+    tf = worker_topology.figure([Angle([]) if angle is None else angle for angle in vector])
+    return solve_to_record(k, label, tf, pairing, budget)
@@ -0,0 +1,264 @@
+import sys
+from array import array
+from bisect import bisect_left
+from multiprocessing import shared_memory
+
+from geopar.angle_class import Angle
+from geopar.triangle_class import Triangle
+
+__author__ = 'ebraude'
+
+# The sections of a TF_Topology, in the order they are laid out in shared memory
+SECTIONS = ['vertex_ids', 'triangles', 'fan_starts', 'fan_triangles', 'interior', 'edges']
+
+
+class TF_TopologyHandle(object):
+    """
+    Intent: What a worker process needs in order to attach to a shared TF_Topology:
+    the name of the shared memory block and the length of each section (in int64s).
+    It is small and picklable.
+    """
+
+    def __init__(self, name, lengths):
+        self.name, self.lengths = name, lengths
+
+    def __repr__(self):
+        return 'TF_TopologyHandle({!r}, {})'.format(self.name, self.lengths)
+
+
+class TF_Topology(object):
+    """
+    Intent: The topology of a TriangulatedFigure as flat int64 arrays, computed once.
+    Angles are not part of it, so workers that explore different angle assignments
+    of the same figure can share one TF_Topology (see share() and attach()).
+
+    Class Invariants (positions are indices into self.vertex_ids):
+    1. self.vertex_ids lists the points of the figure, ascending
+    2. self.triangles[3t:3t+3] are the positions of the points of triangle t, in order
+    3. self.fan_triangles[self.fan_starts[p]:self.fan_starts[p+1]] are the triangles at the point
+       at position p, in clockwise order (as in TriangulatedFigure.triangles_at())
+    4. self.interior lists the positions of the interior points, ascending
+    5. self.edges[2e:2e+2] are the positions of the end points of edge e; every edge appears once
+    6. self.number_of_triangles = len(self.triangles) // 3
+    """
+
+    def __init__(self, a_tf):
+        """
+        PRE: a_tf is a non-empty TriangulatedFigure, consistently oriented
+        POST: the class invariants hold for a_tf, computed in time linear in its size
+        (apart from sorting the point ids)
+        """
+
+        triangles = a_tf.get_triangles()
+        vertex_ids = sorted({point for triangle in triangles for point in triangle.get_points()})
+        position_of = {point: position for position, point in enumerate(vertex_ids)}
+        corners = [position_of[point] for triangle in triangles for point in triangle.get_points()]
+
+        # --(Owners): owner[(p, q)] is the triangle with the directed edge p -> q
+        owner = {}
+        for t in range(len(triangles)):
+            for s in range(3):
+                owner[(corners[3 * t + s], corners[3 * t + (s + 1) % 3])] = t
+
+        # --(Incident): incident[p] lists the (triangle, slot) corners at position p, in figure order
+        incident = [[] for _ in vertex_ids]
+        for corner, p in enumerate(corners):
+            incident[p].append(divmod(corner, 3))
+
+        # --(Fans): each fan starts at a triangle that no triangle precedes (the first if none does),
+        #   and continues with the owner of the edge from p to the preceding point
+        fan_starts, fan_triangles, interior = [0], [], []
+        for p, at_p in enumerate(incident):
+            start = 0
+            for k, (t, s) in enumerate(at_p):
+                if (corners[3 * t + (s + 1) % 3], p) not in owner:
+                    start = k
+                    break
+            else:
+                if len(at_p) > 2:
+                    interior.append(p)
+
+            fan, visited = [], set()
+            t, s = at_p[start]
+            while t not in visited:
+                fan.append(t)
+                visited.add(t)
+                t = owner.get((p, corners[3 * t + (s + 2) % 3]))
+                if t is None:
+                    break
+                s = corners.index(p, 3 * t, 3 * t + 3) - 3 * t
+            fan.extend(t for t, s in at_p if t not in visited)  # not a manifold at p
+            fan_triangles.extend(fan)
+            fan_starts.append(len(fan_triangles))
+
+        # --(Edges): each undirected edge once, from its directed edge(s)
+        edges = []
+        for p, q in owner:
+            if p < q or (q, p) not in owner:
+                edges.extend((p, q))
+
+        self.__set_sections([array('q', section) for section in
+                             [vertex_ids, corners, fan_starts, fan_triangles, interior, edges]])
+        self.__block = None
+
+    def __set_sections(self, sections):
+        # Postcondition: self's sections (in the order of SECTIONS) are sections
+
+        for name, section in zip(SECTIONS, sections):
+            setattr(self, name, section)
+        self.number_of_triangles = len(self.triangles) // 3
+        self.__fan_slots = None
+
+    @staticmethod
+    def attach(a_handle):
+        """
+        Intent: Use a TF_Topology shared by another process (see share())
+
+        PRE: a_handle is the handle of a TF_SharedTopology that has not been unlinked
+        Returns: a TF_Topology whose sections are read-only views of the shared memory;
+        call close() when done with it
+        """
+
+        options = {'track': False} if sys.version_info >= (3, 13) else {}
+        block = shared_memory.SharedMemory(name=a_handle.name, **options)
+
+        result = TF_Topology.__new__(TF_Topology)
+        result.__set_sections(TF_Topology.__views(block, a_handle.lengths))
+        result.__block = block
+        return result
+
+    @staticmethod
+    def __views(a_block, lengths):
+        # Returns: read-only int64 memoryviews of the sections of a_block, of the given lengths
+
+        cast = a_block.buf.cast('q')
+        view, sections, offset = cast.toreadonly(), [], 0
+        for length in lengths:
+            sections.append(view[offset:offset + length])
+            offset += length
+        view.release()
+        cast.release()
+        return sections
+
+    def close(self):
+        # Postcondition: an attached self no longer uses the shared memory (nor can be used)
+
+        if self.__block is not None:
+            for name in SECTIONS:
+                getattr(self, name).release()
+            self.__block.close()
+            self.__block = None
+
+    def share(self):
+        """
+        Returns: a TF_SharedTopology holding a copy of self's sections in shared memory
+        """
+
+        return TF_SharedTopology(self)
+
+    def position_of(self, a_point):
+        # Returns: the position of a_point in self.vertex_ids
+
+        position = bisect_left(self.vertex_ids, a_point)
+        if position == len(self.vertex_ids) or self.vertex_ids[position] != a_point:
+            raise Exception('There is no such point in this TF_Topology.')
+        return position
+
+    def fan_of(self, a_point):
+        # Returns: the indices of the triangles at a_point in clockwise order
+
+        position = self.position_of(a_point)
+        return self.fan_triangles[self.fan_starts[position]:self.fan_starts[position + 1]].tolist()
+
+    def fan_slots(self):
+        """
+        Returns {interior point p: [(t, following, preceding) for each triangle index t at p, clockwise]},
+        where following / preceding are the slots in t of the points following / preceding p
+        (the fan records of TriangulatedFigure.fans(), with triangle indices), built on first use
+        """
+
+        if self.__fan_slots is None:
+            ids, corners, fan_starts, fan_triangles = self.vertex_ids, self.triangles, self.fan_starts, self.fan_triangles
+            self.__fan_slots = {}
+            for position in self.interior:
+                fan = []
+                for t in fan_triangles[fan_starts[position]:fan_starts[position + 1]]:
+                    s = corners[3 * t:3 * t + 3].tolist().index(position)
+                    fan.append((t, (s + 1) % 3, (s + 2) % 3))
+                self.__fan_slots[ids[position]] = fan
+        return self.__fan_slots
+
+    def points(self):
+        # Returns: the list of all points
+
+        return list(self.vertex_ids)
+
+    def interior_points(self):
+        # Returns: the list of interior points, ascending
+
+        return [self.vertex_ids[position] for position in self.interior]
+
+    def figure(self, angles=None):
+        """
+        Intent: A TriangulatedFigure with the topology of self and its own angles
+
+        PRE: angles is None or lists 3 Angles per triangle, in the order of TF_Topology.angles_of()
+        Returns: a TriangulatedFigure with self as its topology; its angles are angles
+        (unknown if angles is None)
+        """
+
+        from geopar.triangulated_figure_class import TriangulatedFigure
+
+        ids, corners = self.vertex_ids, self.triangles
+        triangles = []
+        for t in range(self.number_of_triangles):
+            three_angles = [Angle([]), Angle([]), Angle([])] if angles is None else list(angles[3 * t:3 * t + 3])
+            triangles.append(Triangle([ids[corners[3 * t]], ids[corners[3 * t + 1]], ids[corners[3 * t + 2]]],
+                                      three_angles))
+        result = TriangulatedFigure(triangles)
+        result.set_topology(self)
+        return result
+
+    @staticmethod
+    def angles_of(a_tf):
+        # Returns: the angles of a_tf, triangle by triangle, as one list
+
+        return [angle for triangle in a_tf.get_triangles() for angle in triangle.get_angles()]
+
+
+class TF_SharedTopology(object):
+    """
+    Intent: The owner of a TF_Topology placed in multiprocessing.shared_memory.
+    Pass self.handle to the workers, which call TF_Topology.attach(handle);
+    close() and unlink() (or leave the with statement) once they are done.
+    """
+
+    def __init__(self, a_topology):
+        sections = [getattr(a_topology, name) for name in SECTIONS]
+        lengths = [len(section) for section in sections]
+        self.block = shared_memory.SharedMemory(create=True, size=max(8, 8 * sum(lengths)))
+
+        target, offset = self.block.buf.cast('q'), 0
+        for section in sections:
+            target[offset:offset + len(section)] = array('q', section)
+            offset += len(section)
+        target.release()
+
+        self.handle = TF_TopologyHandle(self.block.name, lengths)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception_info):
+        self.close()
+        self.unlink()
+
+    def close(self):
+        # Postcondition: this process no longer uses the shared memory
+
+        self.block.close()
+
+    def unlink(self):
+        # Postcondition: the shared memory is freed once every attached process has closed it
+
+        self.block.unlink()
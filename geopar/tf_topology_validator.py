@@ -0,0 +1,113 @@
+__author__ = 'ebraude'
+
+
+class TF_TopologyValidator(object):
+    """
+    Intent: Checks, in time linear in the number of triangles, that the triangles of a
+    TriangulatedFigure form a triangulated disk, as the rules and triangles_at() assume:
+
+    1. every triangle has three distinct points, and no two triangles have the same points
+    2. (orientation) no directed edge p->q (q following p in a triangle) is in two triangles,
+       so the triangles sharing an edge run through it in opposite directions and no edge is in more than two
+    3. (manifold) the triangles at every point form one fan: a chain, or a cycle for an interior point
+    4. (connected) every triangle can be reached from the first through shared edges
+    5. (Euler) #points - #edges + #triangles = 1, i.e. the figure has no holes
+
+    Whether the triangles are clockwise rather than all counterclockwise cannot be told without coordinates.
+    A triangle is named in the errors by its position in the figure (from 0) and its points.
+    """
+
+    @staticmethod
+    def errors(a_tf):
+        """
+        Returns: a message for every violation of 1-5 above, [] if there is none
+        (each is checked only if those before it hold)
+        """
+
+        triangles = a_tf.get_triangles()
+        result = []
+        if not triangles:
+            return result
+
+        def name(t):
+            return 'triangle {} ({}, {}, {})'.format(t, *triangles[t].get_points())
+
+        # --(Distinct): 1
+        first_with_points = {}
+        for t, triangle in enumerate(triangles):
+            points = triangle.get_points()
+            if len(set(points)) != 3:
+                result.append('{} does not have three distinct points.'.format(name(t)))
+                continue
+            other = first_with_points.setdefault(frozenset(points), t)
+            if other != t:
+                result.append('{} has the same points as {}.'.format(name(t), name(other)))
+        if result:
+            return result
+
+        # --(Oriented): 2; owner[(p, q)] is the triangle with the directed edge p->q
+        owner = {}
+        for t, triangle in enumerate(triangles):
+            p, q, r = triangle.get_points()
+            for edge in ((p, q), (q, r), (r, p)):
+                other = owner.setdefault(edge, t)
+                if other != t:
+                    result.append('{} and {} both have the edge {}->{}: one of them is not clockwise, '
+                                  'or they overlap.'.format(name(other), name(t), *edge))
+        if result:
+            return result
+
+        # --(Manifold): 3; after_at[p][q] is the triangle at p in which q precedes p,
+        #   and the triangle after it at p clockwise (if any) is after_at[p][the point following p in it]
+        after_at = {}
+        for t, triangle in enumerate(triangles):
+            p, q, r = triangle.get_points()
+            for point, preceding in ((p, r), (q, p), (r, q)):
+                after_at.setdefault(point, {})[preceding] = t
+        for point in sorted(after_at):
+            after = after_at[point]
+            following = {triangles[t].point_following(point): t for t in after.values()}
+            # a chain begins at the triangle that no other precedes; a cycle anywhere
+            starts = [t for preceding, t in after.items() if preceding not in following] or [next(iter(after.values()))]
+            t, visited = starts[0], set()
+            while t is not None and t not in visited:
+                visited.add(t)
+                t = after.get(triangles[t].point_following(point))
+            if len(starts) > 1 or len(visited) != len(after):
+                apart = sorted(t for t in after.values() if t not in visited)
+                result.append('The triangles at point {} do not form one fan: {} not joined to {}.'.format(
+                    point, ', '.join(name(t) for t in apart), name(starts[0])))
+        if result:
+            return result
+
+        # --(Connected): 4, by a search through shared edges
+        reached, stack = {0}, [0]
+        while stack:
+            p, q, r = triangles[stack.pop()].get_points()
+            for edge in ((q, p), (r, q), (p, r)):
+                t = owner.get(edge)
+                if t is not None and t not in reached:
+                    reached.add(t)
+                    stack.append(t)
+        if len(reached) != len(triangles):
+            apart = [t for t in range(len(triangles)) if t not in reached]
+            result.append('The figure is not connected: {} cannot be reached from {}.'.format(
+                ', '.join(name(t) for t in apart[:5]) + (', ...' if len(apart) > 5 else ''), name(0)))
+            return result
+
+        # --(Euler): 5; every undirected edge is one or two directed ones
+        number_of_edges = len(owner) - sum(1 for p, q in owner if p < q and (q, p) in owner)
+        euler = len(after_at) - number_of_edges + len(triangles)
+        if euler != 1:
+            result.append('The figure has {} points, {} edges and {} triangles, so its Euler characteristic is {}, '
+                          'not 1: it has {}.'.format(len(after_at), number_of_edges, len(triangles), euler,
+                                                     'holes' if euler < 1 else 'no boundary'))
+        return result
+
+    @staticmethod
+    def check(a_tf):
+        # Postcondition: an Exception listing TF_TopologyValidator.errors(a_tf) is raised if there are any
+
+        errors = TF_TopologyValidator.errors(a_tf)
+        if errors:
+            raise Exception('Not a triangulated disk:\n' + '\n'.join(errors))
@@ -1,5 +1,7 @@
 from collections import Counter
 
+from geopar.angle_class import Angle
+
 __author__ = 'satbek'  # Edited by Eric Braude
 
 
@@ -20,7 +22,7 @@ class TF_Validator(object):
         if a_tf.is_empty():
             raise Exception('A triangulated figure is empty! See precondition in TFValidator.rule_180().')
         for triangle_ in a_tf.get_triangles():
-            if sum(triangle_.get_angles()) != 180:
+            if Angle.sum(triangle_.get_angles()) != 180:
                 return False
         return True
 
@@ -41,9 +43,7 @@ class TF_Validator(object):
         # --Postcondition
         for point in interior_points:
             triangles = a_tf.triangles_at(point)
-            sum_angles = 0
-            for triangle in triangles:
-                sum_angles += triangle.angle_of_point(point)
+            sum_angles = Angle.sum(triangle.angle_of_point(point) for triangle in triangles)
             if sum_angles != 360:
                 return False
         return True
@@ -53,19 +53,17 @@ class TF_Validator(object):
         """
         Precondition: a_tf is an instance of TriangulatedFigure containing at least one triangle
 
-        Postcondition: Whether the "before" angles = the "after" angles for every interior point
+        Postcondition: Whether the known "before" angles = the known "after" angles, as multisets,
+        for every interior point (compared exactly, without the signatures of a_tf)
         """
         # Check precondition
         if a_tf.is_empty():
             raise Exception('a_tf is empty! See precondition PRE')
 
-        following, preceding = [], []
-        for point in a_tf.get_interior_points():
-            for triangle in a_tf.triangles_at(point):
-                following.append(triangle.angle_of_point(triangle.point_following(point)))
-                preceding.append(triangle.angle_of_point(triangle.point_preceding(point)))
-
-            if set(following) != set(preceding):
+        for fan in a_tf.fans().values():
+            following = Counter(triangle.angles[f] for triangle, f, p in fan if triangle.angles[f].is_known())
+            preceding = Counter(triangle.angles[p] for triangle, f, p in fan if triangle.angles[p].is_known())
+            if following != preceding:
                 return False
 
         return True
@@ -0,0 +1,92 @@
+__author__ = 'ebraude'
+
+
+class TF_Writer(object):
+    """
+    Intent: Writes TriangulatedFigures to a text file, as str() would, triangle by triangle
+    through a buffer, formatting the text of each Angle value only once.
+    Changes mode writes only the corners whose angles changed since premises() were taken.
+
+    Class Invariants:
+    1. self.file is the text file written to
+    2. the text written but not yet in self.file is ''.join(self.__parts), of length self.__size < self.buffer_size
+    3. self.__texts[value] is the str() of the Angle with coefficients Fraction(n, d) for (n, d) in value,
+       for at most self.cache_size values
+    """
+
+    def __init__(self, a_file, buffer_size=1 << 16, cache_size=1 << 16):
+        self.file, self.buffer_size, self.cache_size = a_file, buffer_size, cache_size
+        self.__parts, self.__size = [], 0
+        self.__texts = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception_info):
+        self.flush()
+
+    def angle_text(self, an_angle):
+        # Returns: str(an_angle), formatted once per value
+
+        # (keyed by the ints of the coefficients, which hash much faster than Fractions)
+        value = tuple([(c.numerator, c.denominator) for c in an_angle.get_coefficients()])
+        text = self.__texts.get(value)
+        if text is None:
+            if len(self.__texts) >= self.cache_size:
+                self.__texts.clear()
+            text = self.__texts[value] = str(an_angle)
+        return text
+
+    def write(self, a_text):
+        # Postcondition: a_text is written, to self.file once the buffer is full
+
+        self.__parts.append(a_text)
+        self.__size += len(a_text)
+        if self.__size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        # Postcondition: all text written is in self.file
+
+        if self.__parts:
+            self.file.write(''.join(self.__parts))
+            self.__parts, self.__size = [], 0
+        self.file.flush()
+
+    def write_figure(self, a_tf):
+        # Postcondition: str(a_tf) is written
+
+        angle_text = self.angle_text
+        for triangle in a_tf.get_triangles():
+            angles = triangle.get_angles()
+            self.write('TRIANGLE -> Vertices: {}, {}, {}; Angles: {}, {}, {}\n'.format(
+                *triangle.get_points(), angle_text(angles[0]), angle_text(angles[1]), angle_text(angles[2])))
+
+    @staticmethod
+    def premises(a_tf):
+        # Returns: the angles of a_tf, corner by corner (corner 3t + s is slot s of triangle t)
+
+        return [angle for triangle in a_tf.get_triangles() for angle in triangle.get_angles()]
+
+    def write_changes(self, a_tf, premises):
+        """
+        Intent: Write the corners of a_tf whose angles are not those of premises, one per line,
+        as their angle points and value, e.g. '∠(3,1,2) = 60'
+
+        PRE: premises = TF_Writer.premises(a_tf) when the triangles of a_tf were as now
+        Returns: the number of corners written
+        """
+
+        changed = 0
+        angle_text = self.angle_text
+        for t, triangle in enumerate(a_tf.get_triangles()):
+            points, angles = triangle.get_points(), triangle.get_angles()
+            for s in range(3):
+                angle, premise = angles[s], premises[3 * t + s]
+                if angle is premise or \
+                        angle.get_coefficients() == premise.get_coefficients():
+                    continue
+                self.write('∠({},{},{}) = {}\n'.format(points[(s + 2) % 3], points[s], points[(s + 1) % 3],
+                                                      angle_text(angle)))
+                changed += 1
+        return changed
@@ -1,5 +1,7 @@
 from collections import Counter
 
+from geopar.angle_class import Angle
+
 __author__ = 'satbek'
 
 
@@ -55,48 +57,33 @@ class TFPreprocessor(object):
 
     @staticmethod
     def theorem_3(a_tf):
-        # traversing through interior points
-        for point in a_tf.get_interior_points():
-
-            # triangles around interior point
-            triangles = a_tf.triangles_at(point)
+        # traversing through the fan records of interior points (see TriangulatedFigure.fans())
+        for point, fan in a_tf.fans().items():
 
             angle_following_list = []
             angle_preceding_list = []
 
-            unknown_following_count = 0
-            unknown_preceding_count = 0
-            sum_angles = 0
-
-            points_of_unknown_angles = []
+            unknown_following = []
+            unknown_preceding = []
 
             # traverse through triangles around interior point
-            for t in triangles:
-                point_following = t.point_following(point)
-                point_preceding = t.point_preceding(point)
-
-                angle_following = t.angle_of_point(point_following)
-                angle_preceding = t.angle_of_point(point_preceding)
+            for t, following, preceding in fan:
+                angle_following = t.angles[following]
+                angle_preceding = t.angles[preceding]
 
                 if angle_following.is_known():
                     angle_following_list.append(angle_following)
-                if angle_preceding.is_known():
-                    angle_preceding_list.append(angle_preceding)
-
-                if not angle_following.is_known():
-                    unknown_following_count += 1
-                    points_of_unknown_angles.append(t.get_angle_points_by_point(point_following))
                 else:
-                    sum_angles += angle_following
+                    unknown_following.append((t, following))
 
-                if not angle_preceding.is_known():
-                    unknown_preceding_count += 1
-                    points_of_unknown_angles.append(t.get_angle_points_by_point(point_preceding))
+                if angle_preceding.is_known():
+                    angle_preceding_list.append(angle_preceding)
                 else:
-                    sum_angles += angle_preceding
+                    unknown_preceding.append((t, preceding))
 
-            if unknown_following_count == 1 and unknown_following_count == 1 and \
+            if len(unknown_following) == 1 and len(unknown_preceding) == 1 and \
                     Counter(angle_following_list) == Counter(angle_preceding_list):
-                angle_to_set = ((len(triangles) - 2) * 180 - sum_angles) / 2
-                a_tf.set_angle_by_angle_points(*points_of_unknown_angles[0], angle_to_set)
-                a_tf.set_angle_by_angle_points(*points_of_unknown_angles[1], angle_to_set)
+                sum_angles = Angle.sum(angle_following_list + angle_preceding_list)
+                angle_to_set = ((len(fan) - 2) * 180 - sum_angles) / 2
+                for t, slot in unknown_following + unknown_preceding:
+                    t.set_angle_by_index(slot, angle_to_set)
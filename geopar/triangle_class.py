@@ -2,20 +2,38 @@ from geopar.angle_class import Angle
 
 __author__ = 'satbek'  # modified by Eric Braude
 
+# FOLLOWING[i] / PRECEDING[i] is the slot of the point following / preceding the point in slot i
+FOLLOWING, PRECEDING = (1, 2, 0), (2, 0, 1)
+
+# ANGLE_POINT_SLOTS[i] are the slots of the angle points of the angle in slot i, clockwise
+ANGLE_POINT_SLOTS = ((2, 0, 1), (0, 1, 2), (1, 2, 0))
+
+# NUMBER_KNOWN[mask] is the number of bits set in the 3-bit mask;
+# UNKNOWN_SLOT[mask] is the slot of the only bit not set, for masks with two bits set
+NUMBER_KNOWN = (0, 1, 1, 2, 1, 2, 2, 3)
+UNKNOWN_SLOT = {0b110: 0, 0b101: 1, 0b011: 2}
+
 
 class Triangle:
     """
     Intent: Triangle with 3 angles and 3 vertices (also called 'points')
               points[0] *-----* points[1] angles[1]
-                         \  /
+                         \\  /
                 angles[2] * points[2]
 
     Class invariants:
-    1. self.points consists of 3 distinct non-negative int instances
+    1. self.points is a tuple of 3 distinct non-negative int instances
     2. self.points is in clockwise order geometrically
     3. self.angles[i] corresponds to self.points[i]  for i in [0, 2]
+    4. self.listeners is None (there are none), or lists the callables that every change of
+       self.angles[i] calls as listener(self, i, the angle replaced), in order
+    5. bit i of self.__known is whether self.angles[i].is_known();
+       so self.angles is changed only through set_angle_by_index() and the methods that call it
+    6. self.__hash is None, or hash(self) as of the present self.angles
     """
 
+    __slots__ = ('points', 'angles', 'listeners', '__known', '__hash')
+
     def __init__(self, three_points, three_angles):
         """
         PRE1: three_points consists of three distinct non-negative integers
@@ -34,32 +52,51 @@ class Triangle:
             if isinstance(angle, Angle):
                 temp_3_angles.append(angle)
 
-        self.points, self.angles = three_points, temp_3_angles
+        self.points, self.angles = tuple(three_points), temp_3_angles
+        self.listeners = None  # a list once there is a listener (see add_listener())
+        self.__known, self.__hash = 0, None
+        for i, angle in enumerate(self.angles):
+            if angle.is_known():
+                self.__known |= 1 << i
 
     def __hash__(self):
-        # Returns hash of self based on contents of self.angles
+        # Returns hash of self based on contents of self.angles,
+        # computed again only after an angle has been set
+
+        if self.__hash is not None:
+            return self.__hash
 
         sorted_points = sorted(self.points)
         for_hash = str(sorted_points[0]) + str(hash(self.angle_of_point(sorted_points[0])))
         for_hash += str(sorted_points[1]) + str(hash(self.angle_of_point(sorted_points[1])))
         for_hash += str(sorted_points[2]) + str(hash(self.angle_of_point(sorted_points[2])))
-        return hash(for_hash)
+        self.__hash = hash(for_hash)
+        return self.__hash
+
+    def __reduce__(self):
+        # Pickles self as its points and angles: the hash (of str, which differs between processes)
+        # and the listeners are not part of its value
+
+        return Triangle, (self.points, self.angles)
 
     def __str__(self):
         # Returns: string representation of self.
 
-        return_string = 'TRIANGLE -> Vertices: {}, {}, {}; Angles: {}, {}, {}'.format(
-            self.get_points()[0], self.get_points()[1], self.get_points()[2],
-            self.get_angles()[0], self.get_angles()[1], self.get_angles()[2])
-        return return_string
+        return 'TRIANGLE -> Vertices: {}, {}, {}; Angles: {}, {}, {}'.format(*self.points, *self.angles)
+
+    def add_listener(self, a_listener):
+        # Postcondition: a_listener is the last of self.listeners
+
+        if self.listeners is None:
+            self.listeners = [a_listener]
+        else:
+            self.listeners.append(a_listener)
 
     def angle_of_point(self, a_point):
         # Precondition: a_point is in self.points
         # Returns: the element of self.angles corresponding to a_point
 
-        if a_point not in self.points:
-            raise Exception('There is no such point for this Triangle.')
-        return self.angles[self.points.index(a_point)]
+        return self.angles[self.index_of_point(a_point)]
 
     def complete_unknown_angle(self):
         """
@@ -77,17 +114,13 @@ class Triangle:
         sum_ = self.sum_of_known_angles()
         third = 180 - sum_
 
-        for i in range(3):
-            if not self.angles[i].is_known():
-                self.angles[i] = third
+        self.set_angle_by_index(UNKNOWN_SLOT[self.__known], third)
 
     def get_angle_points_by_point(self, a_point):
         # Returns: the clockwise elts. of self.points for the angle at a_point
 
-        index_of_a_point = self.index_of_point(a_point)
-        shift = (index_of_a_point + 2) % 3
-        points = self.points[shift:] + self.points[:shift]
-        return points
+        points = self.points
+        return [points[i] for i in ANGLE_POINT_SLOTS[self.index_of_point(a_point)]]
 
     def get_angles(self):
 
@@ -100,7 +133,14 @@ class Triangle:
     def has_all_points(self, three_points):
         # Returns: whether or not self.points is the same set as three_points
 
-        return set(self.points) == set(three_points)
+        points = self.points
+        for point in three_points:
+            if point not in points:
+                return False
+        for point in self.points:
+            if point not in three_points:
+                return False
+        return True
 
     def has_point(self, a_point):
         # Returns: whether or not a_point is in self.points
@@ -110,51 +150,66 @@ class Triangle:
     def has_unknown_angle(self):
         # Returns: whether or not is_known() is True for any element of self.angles
 
-        return self.number_of_known() != 3
+        return self.__known != 0b111
 
     def index_of_point(self, a_point):
         """
         Precondition: a_point is in self.points
         Returns index of a_point in self.points
         """
-        if a_point not in self.points:
-            raise Exception('There is no such point for this Triangle.')
-        return self.get_points().index(a_point)
+        points = self.points
+        if a_point == points[0]:
+            return 0
+        if a_point == points[1]:
+            return 1
+        if a_point == points[2]:
+            return 2
+        raise Exception('There is no such point for this Triangle.')
 
     def number_of_known(self):
         # Returns: the number of angles in self satisfying is_known()
 
-        count = 0
-        for angle in self.angles:
-            if angle.is_known():
-                count += 1
-        return count
+        return NUMBER_KNOWN[self.__known]
 
     def point_following(self, a_point):
         # Precondition: a_point is in self.points
         # Returns: the element of self.points that follows a_point clockwise
 
-        if a_point not in self.points:
-            raise Exception('There is no such point for this Triangle.')
-        index_of_a_point = self.points.index(a_point)
-        return self.points[(index_of_a_point + 1) % 3]
+        return self.points[FOLLOWING[self.index_of_point(a_point)]]
 
     def point_preceding(self, a_point):
         # Precondition: a_point is in self.points
         # Returns: the element of self.points that precedes a_point clockwise
 
-        if a_point not in self.points:
-            raise Exception('There is no such point for this Triangle.')
-        index_of_a_point = self.points.index(a_point)
-        return self.points[(index_of_a_point - 1) % 3]
+        return self.points[PRECEDING[self.index_of_point(a_point)]]
+
+    def remove_listener(self, a_listener):
+        # Postcondition: a_listener is not among self.listeners (None if no listener is left)
+
+        if self.listeners is not None and a_listener in self.listeners:
+            self.listeners.remove(a_listener)
+            if not self.listeners:
+                self.listeners = None
 
     def set_angle_by_index(self, an_index, an_angle):
         # Precondition: an_index is either 0, 1, or 2
-        # Postcondition: self.angles[an_index] = an_angle
+        # Postcondition: self.angles[an_index] = an_angle (as an Angle, if an int|float)
 
-        if an_index not in [0, 1, 2]:
+        if an_index not in (0, 1, 2):
             raise Exception('Bad index.')
+        if isinstance(an_angle, (int, float)):
+            an_angle = Angle([an_angle])
+
+        replaced = self.angles[an_index]
         self.angles[an_index] = an_angle
+        self.__hash = None
+        if an_angle.is_known():
+            self.__known |= 1 << an_index
+        else:
+            self.__known &= ~(1 << an_index)
+        if self.listeners is not None:
+            for listener in tuple(self.listeners):  # a listener may remove itself
+                listener(self, an_index, replaced)
 
     def set_angle_by_point(self, a_point, an_angle):
         # Precondition: a_point is in self.points
@@ -162,15 +217,9 @@ class Triangle:
         # Example: set_angle_by_point(self, 44, 70) with self.points = [.., 44, ..]
         # results in self.angles = [.., 70, ..]
 
-        if a_point not in self.points:
-            raise Exception('There is no such point for this Triangle.')
-        self.angles[self.index_of_point(a_point)] = an_angle
+        self.set_angle_by_index(self.index_of_point(a_point), an_angle)
 
     def sum_of_known_angles(self):
         # Returns: sum of self.angles elements satisfying is_known()
 
-        sum_ = 0
-        for angle in self.angles:
-            if angle.is_known():
-                sum_ += angle
-        return sum_
+        return Angle.sum(angle for angle in self.angles if angle.is_known())
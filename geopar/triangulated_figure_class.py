@@ -1,3 +1,5 @@
+import copy
+
 from geopar.angle_class import Angle
 
 __author__ = 'mostly satbek'  # edits by eric braude
@@ -19,16 +21,49 @@ class TriangulatedFigure:
         else:
             self._triangles = []
 
+        # None, or a TF_Topology of self._triangles that answers the topological queries
+        self._topology = None
+
+        # None, or the fan record of every interior point (see fans())
+        self._fans = None
+
+        # None, or the TF_PairingSignatures of self (see pairing_signatures())
+        self._signatures = None
+
+    def __copy__(self):
+        # Returns: a figure of the same Triangle objects (in a list of its own), with the same topology
+
+        result = TriangulatedFigure(list(self._triangles))
+        result._topology = self._topology
+        return result
+
+    def __deepcopy__(self, memo):
+        # Returns: a figure of copies of the triangles of self, with the same (read-only) topology;
+        # its fans and signatures are built again on first use, for its own triangles
+
+        result = TriangulatedFigure([copy.deepcopy(triangle, memo) for triangle in self._triangles])
+        result._topology = self._topology
+        memo[id(self)] = result
+        return result
+
+    def __reduce__(self):
+        # Pickles self as one compact bytes object (see TF_BinaryFormat)
+        # rather than as a graph of Triangle, Angle and Fraction objects;
+        # as its triangles if a number is too large for the format
+
+        from geopar.tf_binary_format import TF_BinaryFormatOverflow
+        try:
+            return TriangulatedFigure.from_bytes, (self.to_bytes(),)
+        except TF_BinaryFormatOverflow:
+            return TriangulatedFigure, (self._triangles,)
+
     def __str__(self):
         """
-        Returns a string representation of self.
+        Returns a string representation of self: a line per triangle.
+        (TF_Writer writes the same to a file, without building the whole string.)
         """
 
-        return_str = ""
-        for current_triangle in self._triangles:
-            return_str += str(current_triangle)
-            return_str += "\n"
-        return return_str
+        return ''.join([str(triangle) + '\n' for triangle in self._triangles])
 
     def add(self, a_triangle):
         # !!!
@@ -37,9 +72,15 @@ class TriangulatedFigure:
         #   --XOR--
         #   a_triangle ... is not in self.triangles AND
         #   ... shares two vertices with a Triangle in old(self.triangles)
+        # (Not checked here; TF_TopologyValidator checks the figure as a whole once built)
         # Postcondition: a_triangle is in self.triangles
 
         self._triangles.append(a_triangle)
+        self._topology = None
+        self._fans = None
+        if self._signatures is not None:
+            self._signatures.detach()
+            self._signatures = None
 
     def all_angles_are_known(self):
         """
@@ -77,6 +118,7 @@ class TriangulatedFigure:
         PRE1: a_point is an interior point of a triangulated figure a_tf
         PRE2: there is exactly one unknown angle at a_point
         POST: unknown angle (see PRE2) is computed
+        Returns: the angle points of the angle computed, None if none was
         """
 
         # (Counted) unknowns_count contains the number of unknown angles at a_point
@@ -93,6 +135,32 @@ class TriangulatedFigure:
             # (Recorded) angle_points is a list of angle_points of unknown_angle at a_point
             angle_points = self.angle_points_of_unknown_angles_at(a_point)[-1]
             self.set_angle_by_angle_points(*angle_points, unknown_angle)
+            return angle_points
+        return None
+
+    def fans(self):
+        """
+        Returns {interior point p: the fan record of p}, in the order of get_interior_points(),
+        where the fan record of p lists (t, following, preceding) for each triangle t at p in clockwise order:
+        t.angles[following] / t.angles[preceding] is the angle at the point following / preceding p in t.
+
+        The records are built for all interior points at once, on first use, and kept until add();
+        from the fan slots of the topology, if set (see TF_Topology.fan_slots()).
+        """
+
+        if self._fans is None and self._topology is not None:
+            triangles = self._triangles
+            self._fans = {point: [(triangles[t], following, preceding) for t, following, preceding in fan]
+                          for point, fan in self._topology.fan_slots().items()}
+        if self._fans is None:
+            self._fans = {}
+            for point in self.get_interior_points():
+                fan = []
+                for triangle in self.triangles_at(point):
+                    index_of_point = triangle.index_of_point(point)
+                    fan.append((triangle, (index_of_point + 1) % 3, (index_of_point + 2) % 3))
+                self._fans[point] = fan
+        return self._fans
 
     def get_angle_by_angle_points(self, p1, p2, p3):
         """
@@ -127,6 +195,9 @@ class TriangulatedFigure:
 
         """
 
+        if self._topology is not None:
+            return self._topology.interior_points()
+
         # (Found 1a)
         all_points = self.get_points()
         point_nums = []
@@ -155,11 +226,19 @@ class TriangulatedFigure:
         Returns a set of all points that make up self.
         """
 
+        if self._topology is not None:
+            return self._topology.points()
+
         all_points = list()
         for triangle in self._triangles:
             all_points.extend(triangle.get_points())
         return list(set(all_points))
 
+    def get_topology(self):
+        # Returns: the TF_Topology set by set_topology(), None if there is none
+
+        return self._topology
+
     def get_triangles(self):
         """
         Returns a list of triangles that make up self.
@@ -174,6 +253,24 @@ class TriangulatedFigure:
 
         return not bool(self._triangles)
 
+    @staticmethod
+    def load(a_path):
+        """
+        Returns the triangulated figure saved (see save()) in the file at a_path.
+        """
+
+        with open(a_path, 'rb') as file:
+            return TriangulatedFigure.from_bytes(file.read())
+
+    @staticmethod
+    def from_bytes(data):
+        """
+        Returns the triangulated figure that data encodes (see to_bytes()).
+        """
+
+        from geopar.tf_binary_format import TF_BinaryFormat
+        return TF_BinaryFormat.from_bytes(data)
+
     def number_of_unknown_angles_at(self, a_point):
         """
         Returns the number of unknown angles at a_point.
@@ -191,6 +288,26 @@ class TriangulatedFigure:
                 count += 1
         return count
 
+    def pairing_signatures(self):
+        """
+        Returns the TF_PairingSignatures of self, which tell in O(1) whether the known angles
+        following and preceding an interior point pair. They are built on first use and kept
+        up to date as angles are set, until add().
+        """
+
+        if self._signatures is None:
+            from geopar.tf_pairing_signatures import TF_PairingSignatures
+            self._signatures = TF_PairingSignatures(self)
+        return self._signatures
+
+    def save(self, a_path):
+        """
+        Saves self in the file at a_path, in the binary format of to_bytes().
+        """
+
+        with open(a_path, 'wb') as file:
+            file.write(self.to_bytes())
+
     def set_angle_by_angle_points(self, p1, p2, p3, angle_):
         """
         Sets an angle in a triangulated figure by the angle's angle points.
@@ -223,6 +340,16 @@ class TriangulatedFigure:
             if triangle.has_all_points([p1, p2, p3]):
                 triangle.set_angle_by_point(p2, angle_)
 
+    def set_topology(self, a_topology):
+        """
+        Makes a_topology answer get_points(), get_interior_points(), triangles_at() and fans()
+        in place of searching self.triangles; add() discards it.
+
+        PRE: a_topology is None or a TF_Topology of self.triangles, in their order
+        """
+
+        self._topology = a_topology
+
     def sum_of_known_angles_at(self, a_point):
         """
         Returns the sum of known angles at a_point.
@@ -232,14 +359,18 @@ class TriangulatedFigure:
         POST: sum_angles contains the sum of known angles at a_point
         """
 
-        sum_angles = 0
-        triangles = self.triangles_at(a_point)
-        for triangle in triangles:
-            angle = triangle.angle_of_point(a_point)
-            if angle.is_known():
-                sum_angles += angle
+        angles = (triangle.angle_of_point(a_point) for triangle in self.triangles_at(a_point))
+        return Angle.sum(angle for angle in angles if angle.is_known())
+
+    def to_bytes(self):
+        """
+        Returns self in a compact, versioned binary format (see TF_BinaryFormat).
 
-        return sum_angles
+        PRE: every coefficient and point of self fits in 64 bits
+        """
+
+        from geopar.tf_binary_format import TF_BinaryFormat
+        return TF_BinaryFormat.to_bytes(self)
 
     def triangles_at(self, a_point):
         """
@@ -248,6 +379,9 @@ class TriangulatedFigure:
         PRE: At least one triangle in self.triangles contains a_point
         """
 
+        if self._topology is not None:
+            return [self._triangles[t] for t in self._topology.fan_of(a_point)]
+
         # [Collected]: triangles_with_a_point =
         # the triangles in self.triangles containing a_point
 
@@ -275,6 +409,10 @@ class TriangulatedFigure:
                     triangles_in_order.append(triangle_)
                     triangles_remaining.remove(triangle_)
                     break
+            else:
+                # No remaining triangle fits at either end, and none ever will
+                raise Exception('The triangles at point {} do not form one fan (see TF_TopologyValidator).'
+                                .format(a_point))
 
         # (Complement): len(triangles_in_order) = len(triangles_with_a_point)
         return triangles_in_order
@@ -1,16 +1,31 @@
 from fractions import Fraction
 from decimal import Decimal
+from functools import lru_cache
 
 GREEK_LETTERS = 'αβγδεηθλπρστμφω'  # For names of variables
 
+# The number of float conversions that to_fraction() remembers
+FLOAT_CACHE_SIZE = 1024
+
+
 def to_fraction(a_value):
     """
     Intent: returns a Fraction equivalent of a_value
+    (of its shortest decimal form if a float, e.g. 1/10 for 0.1)
 
     PRE: is_instance(a_value, (int, float))
     """
 
-    return Fraction(Decimal(str(a_value)))
+    if isinstance(a_value, int):
+        return Fraction(a_value)
+    return float_to_fraction(a_value)
+
+
+@lru_cache(maxsize=FLOAT_CACHE_SIZE)
+def float_to_fraction(a_float):
+    # Returns: the Fraction of the shortest decimal form of a_float; the latest conversions are remembered
+
+    return Fraction(Decimal(str(a_float)))
 
 
 def find_str_occurrences(a_str, a_substr):
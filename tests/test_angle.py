@@ -1,6 +1,6 @@
 import unittest
 from geopar.angle_class import Angle
-from geopar.utilities import GREEK_LETTERS
+from geopar.utilities import GREEK_LETTERS, to_fraction
 from fractions import Fraction
 
 __author__ = 'satbek'
@@ -146,6 +146,43 @@ class TestAngle(unittest.TestCase):
         # Angle != float
         self.assertFalse(c != 90.0)
 
+    def test_scalar_arithmetic(self):
+        b = Angle([1, 2, 3, 30])
+
+        # only the constant term changes, and stays a Fraction
+        for angle in [b + 180, b - 180, 180 - b, b + 0.1]:
+            self.assertEqual(4, angle.get_dimension())
+            for coefficient in angle.get_coefficients():
+                self.assertIsInstance(coefficient, Fraction)
+        self.assertEqual(Fraction(301, 10), (b + 0.1).get_coefficients()[-1])
+        self.assertEqual(Angle([-1, -2, -3, 150]), 180 - b)
+
+        # an unknown stays unknown
+        self.assertFalse((Angle([]) + 180).is_known())
+        self.assertFalse((180 - Angle([])).is_known())
+
+        # Angle == number only when the variable coefficients are 0
+        self.assertFalse(b == 30)
+        self.assertTrue(Angle([0, 0, 0.1]) == 0.1)
+
+    def test_sum(self):
+        angles = [Angle([1, Fraction(1, 3), 60]), Angle([Fraction(1, 2), Fraction(1, 6), 10]), Angle([0, 0.25, 0])]
+        self.assertEqual(angles[0] + angles[1] + angles[2], Angle.sum(angles))
+        self.assertEqual(Angle([Fraction(3, 2), Fraction(3, 4), 70]), Angle.sum(angles))
+        self.assertEqual(Angle([1, 120]), Angle.sum([90, Angle([1, 30])]))
+        self.assertEqual(Angle([180]), Angle.sum(iter([Angle([20]), Angle([30]), Angle([130])])))
+        for coefficient in Angle.sum(angles).get_coefficients():
+            self.assertIsInstance(coefficient, Fraction)
+
+        # as with +: 0 for nothing, unknown if any angle is
+        self.assertEqual(0, Angle.sum([]))
+        self.assertFalse(Angle.sum([Angle([10]), Angle([])]).is_known())
+
+    def test_to_fraction(self):
+        self.assertEqual(Fraction(7), to_fraction(7))
+        self.assertEqual(Fraction(1, 10), to_fraction(0.1))
+        self.assertIs(to_fraction(0.25), to_fraction(0.25))  # remembered
+
     def test_str(self):
         print(self.a_constant)
         print(self.a_constant_neg)
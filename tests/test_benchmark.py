@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+from geopar import benchmark
+
+__author__ = 'ebraude'
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_read_shapes(self):
+        shapes = benchmark.read_shapes()
+        self.assertEqual(6, len(shapes))
+        self.assertEqual('generalized morley', shapes[4][0])
+        self.assertEqual('10 5', shapes[4][1].split('\n')[0])
+
+    def test_benchmark_shape(self):
+        label, text = benchmark.synthetic_shapes([10])[0]
+        self.assertEqual('synthetic 10', label)
+        seconds = benchmark.benchmark_shape(text, 1)
+        self.assertEqual(set(benchmark.STAGES), set(seconds))
+
+    def test_parse_throughput(self):
+        # the generated file, and its directory, are removed
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(setattr, tempfile, 'tempdir', tempfile.tempdir)
+        tempfile.tempdir = directory.name
+        results = benchmark.benchmark_parse_throughput(200, 1, 100)
+        self.assertEqual({'parse_file', 'triangles_per_second', 'megabytes_per_second'}, set(results))
+        self.assertEqual([], os.listdir(directory.name))
+
+    def test_compare(self):
+        old = {'results': {'a': {'parse': 1.0, 'get_id': 1.0}}}
+        new = {'results': {'a': {'parse': 1.2, 'get_id': 1.3}, 'b': {'parse': 5.0}}}
+        self.assertEqual([('a', 'get_id', 1.0, 1.3)], benchmark.compare(old, new, 0.25))
+        self.assertEqual([], benchmark.compare(old, new, 0.5))
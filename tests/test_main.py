@@ -0,0 +1,109 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from geopar.__main__ import main, label_of, COLD_START_BUDGET
+from geopar.benchmark import read_shapes
+from geopar.run import Parser, solve, UNIQUE, CONSEQUENCE
+from geopar.tf_generator import TF_Generator
+
+__author__ = 'ebraude'
+
+INPUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'inputs', 'input.txt')
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+def output_of(argv):
+    # Returns: (exit status, standard output) of main(argv)
+
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        status = main(argv)
+    return status, out.getvalue()
+
+
+class TestMain(unittest.TestCase):
+
+    def test_label_of(self):
+        self.assertEqual('label', label_of('1 3\n1, 2, 3; 60, 60, 60\n\nlabel\n'))
+        self.assertEqual('', label_of('1 3\n1, 2, 3; 60, 60, 60\n'))
+
+    def test_solve(self):
+        status, out = output_of(['solve', INPUT_PATH, '--index', '3'])
+        self.assertEqual(0, status)
+        self.assertIn(UNIQUE, out)
+        status, out = output_of(['solve', INPUT_PATH, '--index', '9'])
+        self.assertEqual(2, status)
+
+    def test_solve_parametrise(self):
+        status, out = output_of(['solve', INPUT_PATH, '--index', '5', '--no-pairing', '--parametrise'])
+        self.assertIn('4 unknown angles, 1 of them free:', out)
+        self.assertIn('∠(3,4,2) = ∠(3,1,4) + α + 2β', out)
+        self.assertIn('would settle the figure', out)
+
+    def test_batch(self):
+        status, out = output_of(['batch', INPUT_PATH, '--workers', '2'])
+        lines = out.strip().split('\n')
+        self.assertEqual(6, len(lines))
+        self.assertEqual(['3', 'bisectors', UNIQUE], lines[3].split('\t'))
+        self.assertEqual(CONSEQUENCE, lines[4].split('\t')[2])
+
+    def test_batch_jsonl(self):
+        status, out = output_of(['batch', INPUT_PATH, '--jsonl'])
+        records = [json.loads(line) for line in out.strip().split('\n')]
+        self.assertEqual(list(range(6)), [record['index'] for record in records])
+        self.assertEqual(['bisectors', 'unique'], [records[3]['label'], records[3]['classification']])
+        self.assertEqual(CONSEQUENCE, records[4]['outcome'])
+
+    def test_validate(self):
+        # the bisectors configuration once solved (valid) and then with one angle changed (invalid)
+        tf = Parser('').read_configuration_from(io.StringIO(read_shapes(INPUT_PATH)[3][1]))
+        solve(tf)
+        text = TF_Generator.format_configuration(tf, 4, 'solved')
+        tf.get_triangles()[0].set_angle_by_index(0, tf.get_triangles()[0].get_angles()[0] + 1)
+        text += TF_Generator.format_configuration(tf, 4, 'changed')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'input.txt')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+
+        for options in [[], ['--numpy']]:
+            status, out = output_of(['validate', path] + options)
+            self.assertEqual(1, status)
+            self.assertEqual(['0\tsolved\tvalid', '1\tchanged\tinvalid'], out.strip().split('\n'))
+
+    def test_validate_numpy_agrees(self):
+        self.assertEqual(output_of(['validate', INPUT_PATH]), output_of(['validate', INPUT_PATH, '--numpy']))
+
+    def test_lazy_imports(self):
+        heavy = '{"numpy", "multiprocessing", "multiprocessing.shared_memory", "geopar.run"}'
+        code = 'import sys, geopar.__main__; print(sorted(set(sys.modules) & ' + heavy + '))'
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual('[]', result.stdout.strip())
+
+        # the solve and validate paths import geopar.run, but neither NumPy nor multiprocessing
+        heavy = '{"numpy", "multiprocessing", "multiprocessing.shared_memory"}'
+        for command in ['solve', 'validate']:
+            code = ('import contextlib, io, sys; from geopar.__main__ import main\n'
+                    'with contextlib.redirect_stdout(io.StringIO()): main([{!r}, {!r}])\n'
+                    'print(sorted(set(sys.modules) & {}))').format(command, INPUT_PATH, heavy)
+            result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+            self.assertEqual('[]', result.stdout.strip(), command + result.stderr)
+
+    def test_cold_start(self):
+        for arguments in [['--help'], ['solve', INPUT_PATH], ['validate', INPUT_PATH]]:
+            elapsed = []
+            for _ in range(3):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, '-m', 'geopar'] + arguments, cwd=ROOT, capture_output=True)
+                elapsed.append(time.perf_counter() - start)
+            self.assertLess(min(elapsed), COLD_START_BUDGET, arguments[0])
+
+if __name__ == '__main__':
+    unittest.main()
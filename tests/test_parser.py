@@ -0,0 +1,68 @@
+import io
+import unittest
+from fractions import Fraction
+from geopar.run import Parser, INTEGER_FRACTIONS
+from geopar.angle_class import Angle
+
+__author__ = 'ebraude'
+
+
+class TestParser(unittest.TestCase):
+
+    def parse(self, some_angles, a_dimension=4):
+        text = '1 {}\n1, 2, 3; {}\n'.format(a_dimension, some_angles)
+        return Parser('').read_configuration_from(io.StringIO(text)).get_triangles()[0].get_angles()
+
+    def test_variable_styles(self):
+        expected = Angle([1, -2, Fraction(1, 3), -90])
+        for angles in ['α - 2β + 1/3γ - 90, x, x',
+                       'a - 2b + 1/3c - 90, x, x',
+                       '\\alpha - 2\\beta + 1/3\\gamma - 90, x, x',
+                       '-90 + 1/3 γ -2 β+α, x, x']:
+            self.assertEqual(expected, self.parse(angles)[0])
+
+    def test_coefficients(self):
+        angles = self.parse('2.5α + 10/4β - 0.25, 100/3a - 1/3a + 60, 180 - 1.5α + 1.5α')
+        self.assertEqual(Angle([2.5, 2.5, 0, -0.25]), angles[0])
+        self.assertEqual(Angle([33, 0, 0, 60]), angles[1])
+        self.assertEqual(Angle([0, 0, 0, 180]), angles[2])
+        for angle in angles:
+            for coefficient in angle.get_coefficients():
+                self.assertTrue(isinstance(coefficient, Fraction))
+
+    def test_no_integer_part(self):
+        angles = self.parse('.5a + 1, -.25b - .5, 2.c')
+        self.assertEqual(Angle([0.5, 0, 0, 1]), angles[0])
+        self.assertEqual(Angle([0, -0.25, 0, -0.5]), angles[1])
+        self.assertEqual(Angle([0, 0, 2, 0]), angles[2])
+
+    def test_shared_integer_fractions(self):
+        angles = self.parse('α + 60, x, x')
+        self.assertIs(INTEGER_FRACTIONS[0], angles[0].get_coefficients()[1])
+        self.assertIs(INTEGER_FRACTIONS[60], angles[0].get_coefficients()[3])
+
+    def test_unknown(self):
+        angles = self.parse('x, α, x ')
+        self.assertFalse(angles[0].is_known())
+        self.assertTrue(angles[1].is_known())
+        self.assertFalse(angles[2].is_known())
+
+    def test_wrong_input(self):
+        for angles in ['2x, x, x', 'α β, x, x', '3 +, x, x', '\\zeta, x, x', '1/2/3, x, x', '., x, x', '1..5, x, x']:
+            with self.assertRaises(Exception):
+                self.parse(angles)
+
+        # δ would be the 4th variable, but the 4th coefficient is the constant
+        with self.assertRaises(Exception):
+            self.parse('δ, x, x')
+
+    def test_bad_topology(self):
+        # 1, 2, 4 has the edge 1->2 of 1, 2, 3: it is counterclockwise
+        text = '2 1\n1, 2, 3; 60, 60, 60\n1, 2, 4; 60, 60, 60\n'
+        with self.assertRaisesRegex(Exception, r'triangle 0 \(1, 2, 3\) and triangle 1 \(1, 2, 4\)'):
+            Parser('').read_configuration_from(io.StringIO(text))
+
+    def test_read_configurations_from(self):
+        text = '1 2\n1, 2, 3; α, 60, 120 - α\nfirst\n\n2 1\n1, 2, 3; 60, 60, 60\n3, 2, 4; x, 90, 30\nsecond\n'
+        figures = list(Parser('').read_configurations_from(io.StringIO(text)))
+        self.assertEqual([1, 2], [len(figure.get_triangles()) for figure in figures])
@@ -0,0 +1,116 @@
+import os
+import unittest
+from fractions import Fraction
+from geopar.tf_batch_validator import TF_BatchValidator, TF_Stack
+from geopar.tf_corpus_reader import TF_CorpusReader
+from geopar.tf_generator import TF_Generator
+from geopar.tf_validator import TF_Validator
+from geopar.triangulated_figure_class import TriangulatedFigure
+from geopar.triangle_class import Triangle
+from geopar.angle_class import Angle
+
+__author__ = 'ebraude'
+
+INPUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'inputs', 'input.txt')
+
+# URL1:
+# https://docs.google.com/presentation/d/1nddxo9JPaoxz-Colod8qd6Yuj_k7LXhBfO3JlVSYXrE/edit?usp=sharing
+
+
+class TestTFBatchValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.validator = TF_BatchValidator()
+
+        # TriangulatedFigure tf1 consists of seven Triangles
+        # Appearance: URL1 at the top
+        self.tf1 = self.make_tf1([60, 60, 60])
+
+        # tf1 with 10 degrees moved between two angles of the central triangle: 360 rule fails
+        self.tf1_bad_360 = self.make_tf1([50, 70, 60])
+
+        # tf1 whose central triangle sums to 181
+        self.tf1_bad_180 = self.make_tf1([60, 60, 61])
+
+        # One interior point (4) of three triangles: 180 and 360 hold, pairing does not
+        self.tf_bad_pairing = TriangulatedFigure([Triangle([1, 2, 4], [20, 40, 120]),
+                                                  Triangle([2, 3, 4], [30, 30, 120]),
+                                                  Triangle([3, 1, 4], [25, 35, 120])])
+
+        # Symbolic figure (URL2 of test_tfpreprocessor)
+        self.tf_symbolic = TriangulatedFigure([
+            Triangle([1, 5, 4], [Angle([-1, -1, 60]), Angle([0, 1, 60]), Angle([1, 0, 60])]),
+            Triangle([1, 3, 5], [Angle([-1, -1, 60]), Angle([0, 1, 0]), Angle([1, 0, 120])]),
+            Triangle([5, 3, 6], [Angle([-1, -1, 120]), Angle([0, 1, 0]), Angle([1, 0, 60])]),
+            Triangle([6, 3, 2], [Angle([-1, -1, 180]), Angle([0, 1, 0]), Angle([1, 0, 0])]),
+            Triangle([4, 6, 2], [Angle([-1, -1, 120]), Angle([0, 1, 60]), Angle([1, 0, 0])]),
+            Triangle([1, 4, 2], [Angle([-1, -1, 60]), Angle([0, 1, 120]), Angle([1, 0, 0])]),
+            Triangle([4, 5, 6], [Angle([0, 0, 60]), Angle([0, 0, 60]), Angle([0, 0, 60])])])
+
+        self.tf_simple = TriangulatedFigure([Triangle([1, 2, 3], [50, 70, 60])])
+
+    @staticmethod
+    def make_tf1(central_angles):
+        return TriangulatedFigure([Triangle([1, 2, 5], [20, 10, 150]),
+                                   Triangle([5, 2, 6], [80, 10, 90]),
+                                   Triangle([6, 2, 3], [140, 10, 30]),
+                                   Triangle([4, 6, 3], [80, 70, 30]),
+                                   Triangle([1, 4, 3], [20, 130, 30]),
+                                   Triangle([1, 5, 4], [20, 70, 90]),
+                                   Triangle([4, 5, 6], central_angles)])
+
+    def test_run_all_rules(self):
+        valid, first_failing_rule = self.validator.run_all_rules(
+            [self.tf1, self.tf1_bad_360, self.tf1_bad_180, self.tf_bad_pairing,
+             self.tf_symbolic, self.tf_simple])
+
+        self.assertEqual([True, False, False, False, True, True], list(valid))
+        self.assertEqual([TF_BatchValidator.PASSED, TF_BatchValidator.RULE_360,
+                          TF_BatchValidator.RULE_180, TF_BatchValidator.RULE_PAIRING,
+                          TF_BatchValidator.PASSED, TF_BatchValidator.PASSED],
+                         list(first_failing_rule))
+
+    def test_unknown_angle_passes(self):
+        # As with TF_Validator, an unknown angle compares equal to anything (the 61 of tf1_bad_180 is made unknown)
+        self.tf1.set_angle_by_angle_points(6, 4, 5, Angle([]))
+        self.tf1_bad_180.set_angle_by_angle_points(5, 6, 4, Angle([]))
+        stack = TF_Stack([self.tf1, self.tf1_bad_180])
+        self.assertEqual([True, True], self.validator.check_180_rule(stack).tolist())
+        self.assertEqual([True, True], self.validator.check_360_rule(stack).tolist())
+        self.assertTrue(TF_Validator.check_180_rule(self.tf1_bad_180) and TF_Validator.check_360_rule(self.tf1_bad_180))
+
+    def test_pairing_of_known_angles(self):
+        # The known angles pair at 4 (120 before and after); the unknown ones are not compared
+        tf = TriangulatedFigure([Triangle([1, 2, 4], [Angle([]), 30, 120]),
+                                 Triangle([2, 3, 4], [30, Angle([]), 120]),
+                                 Triangle([3, 1, 4], [30, 30, 120])])
+        self.assertTrue(self.validator.check_pairing(TF_Stack([tf]))[0])
+        self.assertTrue(TF_Validator.check_pairing(tf))
+        tf.get_triangles()[2].set_angle_by_index(0, Angle([40]))
+        self.assertFalse(self.validator.check_pairing(TF_Stack([tf]))[0])
+        self.assertFalse(TF_Validator.check_pairing(tf))
+
+    def test_parity_with_tf_validator(self):
+        figures = [self.tf1, self.tf1_bad_360, self.tf1_bad_180, self.tf_bad_pairing, self.tf_symbolic, self.tf_simple]
+        for seed in range(8):
+            tf = TF_Generator(seed=seed).generate(30, unknown_ratio=0.3)
+            if seed % 2:
+                # a known angle made wrong, so that some of the figures fail
+                triangle = next(t for t in tf.get_triangles() if t.get_angles()[0].is_known())
+                triangle.set_angle_by_index(0, triangle.get_angles()[0] + 1)
+            figures.append(tf)
+        with TF_CorpusReader(INPUT_PATH) as reader:
+            figures.extend(reader)
+
+        valid = self.validator.run_all_rules(figures)[0].tolist()
+        self.assertEqual([TF_Validator.run_all_rules(tf) for tf in figures], valid)
+        self.assertIn(False, valid)
+
+    def test_fractions(self):
+        tf = TriangulatedFigure([Triangle([1, 2, 3], [Angle([1, 2]), Angle([Fraction(1, 3), 60.5]),
+                                                      Angle([Fraction(-4, 3), 117.5])])])
+        self.assertTrue(self.validator.check_180_rule(TF_Stack([tf]))[0])
+
+    def test_empty(self):
+        with self.assertRaises(Exception):
+            self.validator.run_all_rules([TriangulatedFigure()])
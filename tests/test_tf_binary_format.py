@@ -0,0 +1,95 @@
+import copy
+import os
+import pickle
+import tempfile
+import unittest
+from fractions import Fraction
+from geopar.angle_class import Angle
+from geopar.triangle_class import Triangle
+from geopar.triangulated_figure_class import TriangulatedFigure
+from geopar.tf_binary_format import TF_BinaryFormat, TF_BinaryFormatOverflow
+from geopar.tf_generator import TF_Generator
+from geopar.tf_topology import TF_Topology
+
+__author__ = 'ebraude'
+
+
+class TestTFBinaryFormat(unittest.TestCase):
+
+    def setUp(self):
+        self.tf = TriangulatedFigure([
+            Triangle([1, 2, 3], [Angle([Fraction(1, 3), 0, 20]), Angle([]), Angle([2, 1, Fraction(-7, 2)])]),
+            Triangle([3, 2, 40], [Angle([10]), Angle([0, Fraction(5, 6), 1]), Angle([])])])
+
+    def assertSameFigure(self, expected, actual):
+        self.assertEqual(len(expected.get_triangles()), len(actual.get_triangles()))
+        for t1, t2 in zip(expected.get_triangles(), actual.get_triangles()):
+            self.assertEqual(t1.get_points(), t2.get_points())
+            for a1, a2 in zip(t1.get_angles(), t2.get_angles()):
+                self.assertEqual(a1.get_coefficients(), a2.get_coefficients())
+
+    def test_round_trip(self):
+        self.assertSameFigure(self.tf, TF_BinaryFormat.from_bytes(TF_BinaryFormat.to_bytes(self.tf)))
+        generated = TF_Generator(seed=2, dimension=4).generate(200, unknown_ratio=0.2)
+        self.assertSameFigure(generated, TriangulatedFigure.from_bytes(generated.to_bytes()))
+
+    def test_save_load(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'figure.tf')
+        self.tf.save(path)
+        self.assertSameFigure(self.tf, TriangulatedFigure.load(path))
+        os.remove(path)
+
+    def test_arrays(self):
+        arrays = TF_BinaryFormat.arrays(self.tf.to_bytes())
+        self.assertEqual([1, 2, 3, 40], arrays['vertex_ids'].tolist())
+        self.assertEqual([[0, 1, 2], [2, 1, 3]], arrays['triangles'].tolist())
+        self.assertEqual([3, 0, 3, 1, 3, 0], arrays['dimensions'].tolist())
+        self.assertEqual([True, False, True, True, True, False], arrays['known'].tolist())
+        self.assertEqual([1, 0, 20], arrays['numerators'][0].tolist())
+        self.assertEqual([3, 1, 1], arrays['denominators'][0].tolist())
+        self.assertEqual([10, 0, 0], arrays['numerators'][3].tolist())
+        self.assertFalse(arrays['numerators'].flags.owndata)
+
+    def test_map_arrays(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'figure.tf')
+        self.tf.save(path)
+        arrays = TF_BinaryFormat.map_arrays(path)
+        self.assertEqual([[0, 1, 2], [2, 1, 3]], arrays['triangles'].tolist())
+        self.assertFalse(arrays['triangles'].flags.writeable)
+
+    def test_pickle(self):
+        data = pickle.dumps(self.tf)
+        self.assertIn(TF_BinaryFormat.MAGIC, data)
+        self.assertSameFigure(self.tf, pickle.loads(data))
+        self.assertSameFigure(self.tf, copy.deepcopy(self.tf))
+
+    def test_copy_without_binary_format(self):
+        # numbers TF_BinaryFormat cannot hold are copied and pickled all the same
+        huge = TriangulatedFigure([Triangle([1, 2, 3], [Angle([Fraction(1, 3 ** 45)]), Angle([2 ** 70]), Angle([])])])
+        self.assertSameFigure(huge, copy.deepcopy(huge))
+        self.assertSameFigure(huge, pickle.loads(pickle.dumps(huge)))
+
+        self.tf.set_topology(TF_Topology(self.tf))
+        copied = copy.deepcopy(self.tf)
+        self.assertIsNotNone(copied._topology)
+        self.assertIsNot(self.tf.get_triangles()[0], copied.get_triangles()[0])
+        self.assertIs(self.tf.get_triangles()[0], copy.copy(self.tf).get_triangles()[0])
+
+    def test_empty(self):
+        self.assertEqual(0, len(TriangulatedFigure.from_bytes(TriangulatedFigure().to_bytes()).get_triangles()))
+
+    def test_bad_data(self):
+        data = self.tf.to_bytes()
+        self.assertRaises(Exception, TF_BinaryFormat.from_bytes, b'NOTATF!!' + data[8:])
+        self.assertRaises(Exception, TF_BinaryFormat.from_bytes, data[:-1])
+        self.assertRaises(Exception, TF_BinaryFormat.from_bytes, data[:4])
+        huge = TriangulatedFigure([Triangle([1, 2, 3], [Angle([2 ** 70]), Angle([]), Angle([])])])
+        self.assertRaises(TF_BinaryFormatOverflow, huge.to_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import copy
+import io
+import unittest
+import time
+from geopar.benchmark import read_shapes, hide_angles
+from geopar.run import Parser, elaborate, solve, BUDGET_EXCEEDED, CONSEQUENCE
+from geopar.tf_budget import TF_Budget, TF_BudgetExceeded
+from geopar.tf_generator import TF_Generator
+from geopar.tf_profiler import TF_Profiler
+
+__author__ = 'ebraude'
+
+RULES = ['apply_180_rule_to', 'apply_360_rule_to']
+
+
+class TestTFBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.tf = hide_angles(TF_Generator(seed=3).generate(300), 0.4)
+        self.known = self.number_of_known(self.tf)
+
+    @staticmethod
+    def number_of_known(a_tf):
+        return sum(triangle.number_of_known() for triangle in a_tf.get_triangles())
+
+    def test_no_limits(self):
+        budget, unlimited = TF_Budget(), copy.deepcopy(self.tf)
+        elaborate(self.tf, RULES, budget=budget)
+        elaborate(unlimited, RULES)
+        self.assertEqual(str(unlimited), str(self.tf))
+        self.assertIsNone(budget.exceeded)
+        self.assertEqual(self.number_of_known(self.tf) - self.known, budget.used_deduced)
+
+    def test_iterations(self):
+        budget = TF_Budget(iterations=1)
+        with self.assertRaises(TF_BudgetExceeded) as raised:
+            elaborate(self.tf, RULES, budget=budget)
+        self.assertEqual('iterations', raised.exception.reason)
+        self.assertEqual(1, raised.exception.statistics['iterations'])
+        self.assertEqual(self.number_of_known(self.tf) - self.known, budget.used_deduced)  # the partial figure
+
+    def test_deduced(self):
+        budget = TF_Budget(deduced=10)
+        self.assertRaises(TF_BudgetExceeded, elaborate, self.tf, RULES, budget=budget)
+        self.assertEqual('deduced', budget.exceeded)
+        self.assertEqual(self.known + 10, self.number_of_known(self.tf))
+        self.assertEqual(10, budget.used_deduced)
+
+    def test_seconds(self):
+        budget = TF_Budget(seconds=0)
+        self.assertEqual(BUDGET_EXCEEDED, solve(self.tf, budget=budget))
+        self.assertEqual('seconds', budget.exceeded)
+        self.assertEqual(self.known, self.number_of_known(self.tf))
+
+    def test_topology_detached(self):
+        # The TF_Topology that elaborate() gives a figure for a budget is only for the run
+        elaborate(self.tf, RULES, budget=TF_Budget())
+        self.assertIsNone(self.tf.get_topology())
+        self.assertRaises(TF_BudgetExceeded, elaborate, self.tf, RULES, budget=TF_Budget(iterations=0))
+        self.assertIsNone(self.tf.get_topology())
+
+    def test_seconds_on_a_large_figure(self):
+        # Without a topology, each pass over the interior points alone takes longer than the budget
+        tf, budget = hide_angles(TF_Generator(seed=7).generate(3000), 0.4), TF_Budget(seconds=0.1)
+        started = time.perf_counter()
+        self.assertEqual(BUDGET_EXCEEDED, solve(tf, budget=budget))
+        self.assertLess(time.perf_counter() - started, 0.4)
+
+    def test_solve(self):
+        tf = Parser('').read_configuration_from(io.StringIO(read_shapes()[0][1]))
+        budget = TF_Budget(seconds=60, iterations=100, deduced=1000)
+        self.assertEqual(CONSEQUENCE, solve(tf, budget=budget))
+        self.assertIsNone(budget.exceeded)
+        budget.restart()
+        self.assertEqual(0, budget.used_iterations)
+
+    def test_with_profiler(self):
+        profiler = TF_Profiler()
+        self.assertRaises(TF_BudgetExceeded, elaborate, self.tf, RULES, 'phase', profiler, budget=TF_Budget(iterations=2))
+        self.assertEqual({'phase': 2}, profiler.iterations())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import pickle
+import tempfile
+import unittest
+from geopar.tf_corpus_reader import TF_CorpusReader
+from geopar.tf_generator import TF_Generator
+from geopar.run import Parser
+
+__author__ = 'ebraude'
+
+INPUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'inputs', 'input.txt')
+
+
+class TestTFCorpusReader(unittest.TestCase):
+
+    def setUp(self):
+        # A corpus of 12 generated configurations of different sizes
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'corpus.txt')
+        generator = TF_Generator(seed=5)
+        with open(self.path, 'w', encoding='utf-8') as file:
+            for k in range(12):
+                figure = generator.generate(k + 1, unknown_ratio=0.3)
+                file.write(TF_Generator.format_configuration(figure, 3, 'figure {}'.format(k)))
+        with open(self.path, encoding='utf-8') as file:
+            self.ids = [figure.get_id() for figure in Parser('').read_configurations_from(file)]
+        self.reader = TF_CorpusReader(self.path)
+
+    def tearDown(self):
+        self.reader.close()
+
+    def test_len(self):
+        self.assertEqual(12, len(self.reader))
+        with TF_CorpusReader(INPUT_PATH) as reader:
+            self.assertEqual(6, len(reader))
+            self.assertEqual(9, len(reader[2].get_triangles()))
+            self.assertTrue(reader.text(-1).endswith('3-in-one triangle'))
+
+    def test_random_access(self):
+        self.assertEqual(self.ids[7], self.reader[7].get_id())
+        self.assertEqual(self.ids[0], self.reader.read(0).get_id())
+        self.assertEqual(self.ids[11], self.reader[-1].get_id())
+        with self.assertRaises(IndexError):
+            self.reader.read(12)
+
+    def test_iter_range(self):
+        self.assertEqual(self.ids[3:6], [figure.get_id() for figure in self.reader.iter_range(3, 6)])
+        self.assertEqual(self.ids, [figure.get_id() for figure in self.reader])
+
+    def test_partition(self):
+        ranges = self.reader.partition(4)
+        self.assertEqual(4, len(ranges))
+        self.assertEqual(0, ranges[0][0])
+        self.assertEqual(12, ranges[-1][1])
+        for (_, stop), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(stop, start)
+
+    def test_pickle(self):
+        copy = pickle.loads(pickle.dumps(self.reader))
+        self.assertEqual(12, len(copy))
+        self.assertEqual(self.ids[9], copy[9].get_id())
+        copy.close()
+
+    def test_empty(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'empty.txt')
+        open(path, 'w').close()
+        with TF_CorpusReader(path) as reader:
+            self.assertEqual(0, len(reader))
+            self.assertEqual([], list(reader))
@@ -0,0 +1,64 @@
+import copy
+import io
+import unittest
+from geopar.benchmark import read_shapes, hide_angles
+from geopar.run import Parser, solve
+from geopar.tf_derivation import TF_Derivation
+from geopar.tf_generator import TF_Generator
+
+__author__ = 'ebraude'
+
+
+class TestTFDerivation(unittest.TestCase):
+
+    def setUp(self):
+        self.tf = Parser('').read_configuration_from(io.StringIO(read_shapes()[4][1]))  # generalized morley
+        self.derivation = TF_Derivation(self.tf)
+        solve(self.tf, derivation=self.derivation)
+
+    def test_records(self):
+        known = sum(triangle.number_of_known() for triangle in self.tf.get_triangles())
+        self.assertEqual(known, sum(self.derivation.premises) + len(self.derivation))
+        for corner in self.derivation.corners:
+            self.assertFalse(self.derivation.premises[corner])
+        self.assertEqual(len(self.derivation), len(set(self.derivation.corners)))
+        self.assertEqual([0] * 6 + [2] * 6, list(self.derivation.rules))
+
+    def test_sources(self):
+        # Every source is a premise or deduced earlier
+        dag = self.derivation.arrays()
+        deduced = set()
+        for k in range(len(self.derivation)):
+            for c in dag['sources'][dag['source_starts'][k]:dag['source_starts'][k + 1]]:
+                self.assertTrue(self.derivation.premises[c] or c in deduced)
+            deduced.add(dag['corners'][k])
+
+        self.assertEqual(2, len(self.derivation.sources(0)))
+        self.assertEqual(8, len(self.derivation.sources(6)))  # pairing in a fan of 5: 10 corners, 2 deduced
+        self.assertNotIn(self.derivation.corners[7], self.derivation.sources(6))
+
+    def test_360_rule(self):
+        tf = hide_angles(TF_Generator(seed=2).generate(100), 0.4)
+        derivation = TF_Derivation(tf)
+        solve(tf, derivation=derivation)
+        k = list(derivation.rules).index(TF_Derivation.RULE_360)
+        point = derivation.sites[k]
+        self.assertEqual(len(tf.triangles_at(point)) - 1, len(derivation.sources(k)))
+
+    def test_proof(self):
+        lines = self.derivation.proof().split('\n')
+        self.assertEqual('Premises:', lines[0])
+        self.assertTrue(lines[19].startswith('1. '))
+        self.assertIn('by the 180 rule in triangle', lines[19])
+        self.assertIn('by pairing at point 7', lines[25])
+
+    def test_same_result(self):
+        tf = hide_angles(TF_Generator(seed=1).generate(200), 0.4)
+        recorded = copy.deepcopy(tf)
+        solve(tf)
+        solve(recorded, derivation=TF_Derivation(recorded))
+        self.assertEqual(str(tf), str(recorded))
+
+
+if __name__ == '__main__':
+    unittest.main()
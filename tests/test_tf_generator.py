@@ -0,0 +1,66 @@
+import io
+import unittest
+from geopar.tf_generator import TF_Generator
+from geopar.tf_validator import TF_Validator
+from geopar.run import Parser
+
+__author__ = 'ebraude'
+
+
+class TestTFGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.tf = TF_Generator(seed=7, dimension=4).generate(60, interior_ratio=0.4)
+
+    def test_size(self):
+        self.assertEqual(60, len(self.tf.get_triangles()))
+        self.assertEqual(1, len(TF_Generator().generate(1).get_triangles()))
+        self.assertEqual(2, len(TF_Generator().generate(2).get_triangles()))
+
+    def test_interior_ratio(self):
+        ratio = len(self.tf.get_interior_points()) / len(self.tf.get_points())
+        self.assertAlmostEqual(0.4, ratio, delta=0.05)
+
+    def test_clockwise(self):
+        # Consistently oriented: no directed edge belongs to two triangles
+        edges = set()
+        for triangle in self.tf.get_triangles():
+            points = triangle.get_points()
+            for i in range(3):
+                edge = (points[i], points[(i + 1) % 3])
+                self.assertFalse(edge in edges)
+                edges.add(edge)
+
+    def test_consistent_angles(self):
+        self.assertTrue(TF_Validator.check_180_rule(self.tf))
+        self.assertTrue(TF_Validator.check_360_rule(self.tf))
+        for triangle in self.tf.get_triangles():
+            for angle in triangle.get_angles():
+                self.assertEqual(4, angle.get_dimension())
+
+    def test_seed(self):
+        same = TF_Generator(seed=7, dimension=4).generate(60, interior_ratio=0.4)
+        other = TF_Generator(seed=8, dimension=4).generate(60, interior_ratio=0.4)
+        self.assertEqual(self.tf.get_id(), same.get_id())
+        self.assertNotEqual(self.tf.get_id(), other.get_id())
+
+    def test_unknown_ratio(self):
+        tf = TF_Generator(seed=1).generate(20, unknown_ratio=0.25)
+        unknowns = sum(3 - triangle.number_of_known() for triangle in tf.get_triangles())
+        self.assertEqual(15, unknowns)
+
+    def test_format_configuration(self):
+        tf = TF_Generator(seed=3).generate(6, unknown_ratio=0.3)
+        lines = TF_Generator.format_configuration(tf, 3, 'label').split('\n')
+        self.assertEqual('6 3', lines[0])
+        self.assertEqual('label', lines[7])
+        for line in lines[1:7]:
+            points, angles = line.split(';')
+            self.assertEqual(3, len(points.split(',')))
+            self.assertEqual(3, len(angles.split(',')))
+
+    def test_parse_back(self):
+        tf = TF_Generator(seed=3, dimension=6).generate(30, unknown_ratio=0.2)
+        text = TF_Generator.format_configuration(tf, 6)
+        parsed = Parser('').read_configuration_from(io.StringIO(text))
+        self.assertEqual(tf.get_id(), parsed.get_id())
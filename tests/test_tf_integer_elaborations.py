@@ -0,0 +1,53 @@
+import copy
+import os
+import unittest
+from fractions import Fraction
+from geopar.angle_class import Angle
+from geopar.benchmark import hide_angles
+from geopar.run import Parser, solve
+from geopar.tf_generator import TF_Generator
+from geopar.tf_integer_elaborations import TF_IntegerElaborations
+from geopar.triangle_class import Triangle
+from geopar.triangulated_figure_class import TriangulatedFigure
+
+__author__ = 'ebraude'
+
+INPUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'inputs', 'input.txt')
+
+
+def angles_of(a_tf):
+    # Returns: the coefficients of every angle of a_tf, triangle by triangle
+
+    return [angle.get_coefficients() for triangle in a_tf.get_triangles() for angle in triangle.get_angles()]
+
+
+class TestTFIntegerElaborations(unittest.TestCase):
+
+    def assert_same_as_fractions(self, a_tf, pairing=True):
+        expected, actual = copy.deepcopy(a_tf), copy.deepcopy(a_tf)
+        self.assertEqual(solve(expected, pairing), solve(actual, pairing, integer=True))
+        self.assertEqual(angles_of(expected), angles_of(actual))
+
+    def test_scale_of(self):
+        tf = TriangulatedFigure([Triangle([1, 2, 3], [Angle([Fraction(1, 2), 30]), Angle([Fraction(1, 3), 40]),
+                                                      Angle([])])])
+        self.assertEqual(6, TF_IntegerElaborations.scale_of(tf))
+        self.assertEqual(1, TF_IntegerElaborations.apply_rules_to(tf, ['apply_180_rule_to']))
+        self.assertEqual([Fraction(-5, 6), 110], tf.get_triangles()[0].get_angles()[2].get_coefficients())
+
+    def test_configurations(self):
+        # their figures need the pairing rule, in which the division by 2 cancels
+        with open(INPUT_PATH, encoding='utf-8') as file:
+            for tf in Parser(INPUT_PATH).read_configurations_from(file):
+                self.assert_same_as_fractions(tf)
+
+    def test_generated(self):
+        self.assert_same_as_fractions(hide_angles(TF_Generator(seed=7).generate(300), 0.4), pairing=False)
+
+    def test_no_known_angles(self):
+        tf = TriangulatedFigure([Triangle([1, 2, 3], [Angle([]), Angle([]), Angle([])])])
+        self.assertEqual(0, TF_IntegerElaborations.apply_rules_to(tf, ['apply_180_rule_to']))
+
+
+if __name__ == '__main__':
+    unittest.main()
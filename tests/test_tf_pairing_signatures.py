@@ -0,0 +1,115 @@
+import copy
+import gc
+import unittest
+from geopar.angle_class import Angle
+from geopar.benchmark import hide_angles
+from geopar.run import solve
+from geopar.tf_generator import TF_Generator
+from geopar.tf_pairing_signatures import TF_PairingSignatures
+from geopar.tf_validator import TF_Validator
+from geopar.triangle_class import Triangle
+from geopar.triangulated_figure_class import TriangulatedFigure
+
+__author__ = 'ebraude'
+
+
+class TestTFPairingSignatures(unittest.TestCase):
+
+    def setUp(self):
+        # As in test_triangulated_figure.py; at 4, the angles following are 60, 70, 30, 20
+        # and those preceding 60, 30, 20, 70
+        self.t4 = Triangle([4, 6, 3], [80, 70, 30])
+        self.t5 = Triangle([1, 4, 3], [20, 130, 30])
+        self.t6 = Triangle([1, 5, 4], [20, 70, 90])
+        self.tf1 = TriangulatedFigure([Triangle([1, 2, 5], [20, 10, 150]), Triangle([5, 2, 6], [80, 10, 90]),
+                                       Triangle([6, 2, 3], [140, 10, 30]), self.t4, self.t5, self.t6,
+                                       Triangle([4, 5, 6], [60, 60, 60])])
+
+    def assert_same_as_rebuilt(self, a_tf):
+        signatures, rebuilt = a_tf.pairing_signatures(), TF_PairingSignatures(a_tf)
+        rebuilt.detach()
+        self.assertEqual(rebuilt.sums, signatures.sums)
+        self.assertEqual(rebuilt.counts, signatures.counts)
+
+    def test_pairs(self):
+        signatures = self.tf1.pairing_signatures()
+        for point in [4, 5, 6]:
+            self.assertTrue(signatures.pairs(point))
+            self.assertEqual((0, 0), signatures.unknowns(point))
+        self.assertTrue(TF_Validator.check_pairing(self.tf1))
+
+    def test_updated_as_angles_are_set(self):
+        signatures = self.tf1.pairing_signatures()
+        self.tf1.set_angle_by_angle_points(4, 6, 3, Angle.from_str('x'))
+        self.assertEqual((1, 0), signatures.unknowns(4))
+        self.assertFalse(signatures.pairs(4))
+        self.tf1.set_angle_by_angle_points(1, 5, 4, Angle.from_str('x'))
+        self.assertEqual((1, 1), signatures.unknowns(4))
+        self.assertTrue(signatures.pairs(4))
+        self.assert_same_as_rebuilt(self.tf1)
+
+        # the known angles following (60, 30, 30) and preceding (60, 30, 60) are the same set only
+        self.t6.set_angle_by_index(0, Angle([30]))
+        self.t5.set_angle_by_index(0, Angle([60]))
+        self.assertFalse(signatures.pairs(4))
+        self.assert_same_as_rebuilt(self.tf1)
+
+    def test_validator_compares_multisets(self):
+        self.t6.set_angle_by_index(0, Angle([30]))
+        self.t5.set_angle_by_index(0, Angle([60]))
+        self.t4.set_angle_by_index(1, Angle([20]))
+        self.t6.set_angle_by_index(1, Angle([20]))
+        self.assertFalse(TF_Validator.check_pairing(self.tf1))
+
+    def test_solving(self):
+        tf = hide_angles(TF_Generator(seed=3).generate(200), 0.3)
+        tf.pairing_signatures()
+        solve(tf)
+        self.assert_same_as_rebuilt(tf)
+
+    def test_figures_sharing_triangles(self):
+        # each figure's signatures listen to the triangles, so neither goes stale;
+        # the angle at 4 of 4, 5, 6 precedes 5
+        other = TriangulatedFigure(self.tf1.get_triangles())
+        signatures, other_signatures = self.tf1.pairing_signatures(), other.pairing_signatures()
+        self.tf1.get_triangles()[6].set_angle_by_index(0, Angle([50]))
+        self.assertFalse(signatures.pairs(5))
+        self.assertFalse(other_signatures.pairs(5))
+        self.assertFalse(TF_Validator.check_pairing(self.tf1))
+        self.assert_same_as_rebuilt(self.tf1)
+
+    def test_validator_is_exact(self):
+        # 30 and 30 + 2 ** 61 - 1 have the same hash, so the same signatures
+        self.t6.set_angle_by_index(0, Angle([30]))
+        self.t5.set_angle_by_index(0, Angle([60]))
+        self.t4.set_angle_by_index(2, Angle([30 + 2 ** 61 - 1]))
+        self.t5.set_angle_by_index(2, Angle([60]))
+        signatures = self.tf1.pairing_signatures()
+        self.assertTrue(signatures.pairs(4))
+        self.assertFalse(TF_Validator.check_pairing(self.tf1))
+
+    def test_validator_leaves_figure_alone(self):
+        self.assertTrue(TF_Validator.check_pairing(self.tf1))
+        self.assertIsNone(self.t4.listeners)
+
+    def test_discarded_copy_detaches(self):
+        # A copy shares the triangles; its signatures go once it does
+        self.tf1.pairing_signatures()
+        shared = copy.copy(self.tf1)
+        shared.pairing_signatures()
+        self.assertEqual(2, len(self.t4.listeners))
+        del shared
+        gc.collect()
+        self.t4.set_angle_by_index(0, Angle([80]))
+        self.assertEqual(1, len(self.t4.listeners))
+        self.assert_same_as_rebuilt(self.tf1)
+
+    def test_add_detaches(self):
+        signatures = self.tf1.pairing_signatures()
+        self.tf1.add(Triangle([1, 3, 7], [60, 60, 60]))
+        self.assertIsNone(self.t4.listeners)
+        self.assertIsNot(signatures, self.tf1.pairing_signatures())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import copy
+import unittest
+from geopar.benchmark import hide_angles
+from geopar.run import elaborate
+from geopar.tf_generator import TF_Generator
+from geopar.tf_parallel_elaborations import TF_ParallelElaborations
+from geopar.tf_topology import TF_Topology
+
+__author__ = 'ebraude'
+
+
+class TestTFParallelElaborations(unittest.TestCase):
+
+    def setUp(self):
+        self.tf = hide_angles(TF_Generator(seed=5).generate(400), 0.4)
+
+    def test_partition(self):
+        topology = TF_Topology(self.tf)
+        regions = TF_ParallelElaborations.partition(topology, 3)
+        owned = sorted(t for region in regions for t in region[0])
+        self.assertEqual(list(range(400)), owned)
+        points = sorted(p for region in regions for p in region[2])
+        self.assertEqual(topology.interior_points(), points)
+        for own, halo, region_points in regions:
+            self.assertFalse(set(own) & set(halo))
+            for point in region_points:
+                self.assertTrue(set(topology.fan_of(point)) <= set(own) | set(halo))
+
+    def test_same_as_sequential(self):
+        sequential, parallel = copy.deepcopy(self.tf), copy.deepcopy(self.tf)
+        elaborate(sequential, ['apply_180_rule_to', 'apply_360_rule_to'])
+        elaborate(parallel, ['apply_180_rule_to', 'apply_360_rule_to'], processes=3)
+        self.assertEqual(str(sequential), str(parallel))
+        self.assertGreater(sum(t.number_of_known() for t in parallel.get_triangles()),
+                           sum(t.number_of_known() for t in self.tf.get_triangles()))
+
+    def test_inconsistent_premises(self):
+        # Every tenth known angle one degree off: regions may deduce a corner differently, and the
+        # sequential fixpoint is computed instead
+        for seed in range(4):
+            tf = hide_angles(TF_Generator(seed=seed).generate(400), 0.4)
+            for k, triangle in enumerate(tf.get_triangles()):
+                if k % 10 == 0 and triangle.get_angles()[0].is_known():
+                    triangle.set_angle_by_index(0, triangle.get_angles()[0] + 1)
+            sequential, parallel = copy.deepcopy(tf), copy.deepcopy(tf)
+            elaborate(sequential, ['apply_180_rule_to', 'apply_360_rule_to'])
+            elaborate(parallel, ['apply_180_rule_to', 'apply_360_rule_to'], processes=3)
+            self.assertEqual(str(sequential), str(parallel))
+            self.assertIsNone(parallel.get_topology())
+
+    def test_one_process(self):
+        sequential, parallel = copy.deepcopy(self.tf), copy.deepcopy(self.tf)
+        elaborate(sequential, ['apply_180_rule_to', 'apply_360_rule_to'])
+        TF_ParallelElaborations.apply_180_360_rules_to(parallel, 1)
+        self.assertEqual(str(sequential), str(parallel))
+
+
+if __name__ == '__main__':
+    unittest.main()
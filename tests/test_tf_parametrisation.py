@@ -0,0 +1,79 @@
+import copy
+import unittest
+from geopar.angle_class import Angle
+from geopar.benchmark import hide_angles
+from geopar.run import solve, INCONCLUSIVE_1A
+from geopar.tf_generator import TF_Generator
+from geopar.tf_parametrisation import TF_Parametrisation
+from geopar.triangle_class import Triangle
+from geopar.triangulated_figure_class import TriangulatedFigure
+
+__author__ = 'ebraude'
+
+
+class TestTFParametrisation(unittest.TestCase):
+
+    def setUp(self):
+        # As in test_triangulated_figure.py: interior points 4, 5, 6
+        self.tf = TriangulatedFigure([Triangle([1, 2, 5], [20, 10, 150]), Triangle([5, 2, 6], [80, 10, 90]),
+                                      Triangle([6, 2, 3], [140, 10, 30]), Triangle([4, 6, 3], [80, 70, 30]),
+                                      Triangle([1, 4, 3], [20, 130, 30]), Triangle([1, 5, 4], [20, 70, 90]),
+                                      Triangle([4, 5, 6], [60, 60, 60])])
+
+    def hide(self, some_corners):
+        for corner in some_corners:
+            self.tf.get_triangles()[corner // 3].set_angle_by_index(corner % 3, Angle([]))
+
+    def test_one_free(self):
+        # ∠(1,5,4), ∠(5,4,1), ∠(6,4,5) and ∠(4,5,6): their two triangles and points 4 and 5 each have two of them
+        self.hide([16, 17, 18, 19])
+        parametrisation = TF_Parametrisation(self.tf)
+        self.assertEqual([16, 17, 18, 19], parametrisation.unknowns)
+        self.assertEqual(1, len(parametrisation.free()))
+        self.assertEqual([16, 17, 18, 19], parametrisation.settling_corners())
+        terms, constant = parametrisation.expression(16)
+        self.assertEqual(list(parametrisation.free()), list(terms))
+        values = parametrisation.substitute({parametrisation.free()[0]: 60})
+        self.assertEqual([70, 90, 60, 60], [values[corner] for corner in [16, 17, 18, 19]])
+        self.assertTrue(parametrisation.consistent)
+
+    def test_text(self):
+        self.hide([18, 19, 20])
+        parametrisation = TF_Parametrisation(self.tf)
+        self.assertEqual({18: Angle([60]), 19: Angle([60]), 20: Angle([60])}, parametrisation.determined())
+        self.assertEqual('∠(6,4,5) = 60\n∠(4,5,6) = 60\n∠(5,6,4) = 60', parametrisation.text())
+        self.assertEqual(3, parametrisation.apply_determined())
+        self.assertTrue(self.tf.all_angles_are_known())
+
+    def test_inconsistent(self):
+        self.hide([18])
+        self.tf.get_triangles()[6].set_angle_by_index(1, Angle([50]))
+        self.assertFalse(TF_Parametrisation(self.tf).consistent)
+
+    def test_substitution_agrees_with_figure(self):
+        full = TF_Generator(seed=3).generate(200)
+        tf = hide_angles(copy.deepcopy(full), 0.5)
+        self.assertEqual(INCONCLUSIVE_1A, solve(tf, False))
+        parametrisation = TF_Parametrisation(tf)
+        self.assertLess(len(parametrisation.free()), len(parametrisation.unknowns))
+
+        def truth(corner):
+            return full.get_triangles()[corner // 3].get_angles()[corner % 3]
+
+        values = parametrisation.substitute({corner: truth(corner) for corner in parametrisation.free()})
+        for corner in parametrisation.unknowns:
+            self.assertEqual(truth(corner).get_coefficients(), values[corner].get_coefficients())
+
+    def test_settling_premise_settles(self):
+        self.hide([16, 17, 18, 19])
+        parametrisation = TF_Parametrisation(self.tf)
+        self.assertTrue(parametrisation.settling_corners())
+        for corner in parametrisation.settling_corners():
+            tf = copy.deepcopy(self.tf)
+            tf.get_triangles()[corner // 3].set_angle_by_index(corner % 3, Angle([45]))
+            settled = TF_Parametrisation(tf)
+            self.assertEqual([], settled.free())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from geopar.angle_class import Angle, angles_created
+from geopar.run import elaborate, validate
+from geopar.tf_profiler import TF_Profiler
+from geopar.triangle_class import Triangle
+from geopar.triangulated_figure_class import TriangulatedFigure
+
+__author__ = 'ebraude'
+
+# URL1:
+# https://docs.google.com/presentation/d/1nddxo9JPaoxz-Colod8qd6Yuj_k7LXhBfO3JlVSYXrE/edit?usp=sharing
+
+
+class TestTFProfiler(unittest.TestCase):
+
+    def setUp(self):
+        # TriangulatedFigure tf1 (URL1 at the top) with three unknown angles
+        self.tf1 = TriangulatedFigure([Triangle([1, 2, 5], [20, 10, 150]),
+                                       Triangle([5, 2, 6], [80, 10, 90]),
+                                       Triangle([6, 2, 3], [140, 10, 30]),
+                                       Triangle([4, 6, 3], [80, 70, 30]),
+                                       Triangle([1, 4, 3], [20, 130, 30]),
+                                       Triangle([1, 5, 4], [20, 70, 90]),
+                                       Triangle([4, 5, 6], [60, 60, 60])])
+        self.tf1.set_angle_by_angle_points(6, 4, 5, Angle.from_str('x'))
+        self.tf1.set_angle_by_angle_points(4, 5, 6, Angle.from_str('x'))
+        self.tf1.set_angle_by_angle_points(1, 4, 3, Angle.from_str('x'))
+        self.profiler = TF_Profiler()
+
+    def test_records(self):
+        elaborate(self.tf1, ['apply_180_rule_to', 'apply_360_rule_to'], 'before pairing', self.profiler)
+
+        self.assertTrue(self.tf1.all_angles_are_known())
+        self.assertEqual({'before pairing': 2}, self.profiler.iterations())
+        self.assertEqual(['apply_180_rule_to', 'apply_360_rule_to'] * 2,
+                         [record.rule for record in self.profiler.records])
+
+        totals = self.profiler.totals()
+        self.assertEqual(3, totals['apply_180_rule_to']['deduced'] + totals['apply_360_rule_to']['deduced'])
+        self.assertEqual(14, totals['apply_180_rule_to']['examined'])
+        self.assertEqual(6, totals['apply_360_rule_to']['examined'])
+        self.assertTrue(totals['apply_180_rule_to']['allocated'] > 0)
+        self.assertEqual(0, self.profiler.records[-1].deduced)
+
+    def test_other_threads_not_counted(self):
+        def rule(a_tf):
+            worker = threading.Thread(target=lambda: [Angle([1]) for _ in range(100)])
+            worker.start()
+            worker.join()
+            return Angle([2])
+
+        self.profiler.measure('rule', rule, self.tf1, 0)
+        self.assertEqual(1, self.profiler.records[0].allocated)
+        with self.assertRaises(ZeroDivisionError):
+            self.profiler.measure('failing', lambda tf: 1 / 0, self.tf1, 0)
+
+    def test_counting_only_while_measuring(self):
+        created = angles_created.created
+        Angle([1])
+        self.assertEqual(created, angles_created.created)
+        self.profiler.measure('rule', lambda tf: Angle([2]), self.tf1, 0)
+        self.assertEqual(1, self.profiler.records[0].allocated)
+        Angle([3])
+        self.assertEqual(created + 1, angles_created.created)
+
+    def test_validate(self):
+        elaborate(self.tf1, ['apply_180_rule_to', 'apply_360_rule_to'])
+        self.assertTrue(validate(self.tf1, self.profiler))
+        self.assertEqual(['check_180_rule', 'check_360_rule', 'check_pairing'],
+                         [record.rule for record in self.profiler.records])
+
+    def test_chrome_trace(self):
+        elaborate(self.tf1, ['apply_180_rule_to', 'apply_360_rule_to'], 'before pairing', self.profiler)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'trace.json')
+        self.profiler.write_chrome_trace(path)
+        with open(path) as file:
+            events = json.load(file)['traceEvents']
+        self.assertEqual(4 + 2, len(events))  # 4 rule applications in 2 iterations
+        self.assertTrue(all(event['ph'] == 'X' and event['dur'] >= 0 for event in events))
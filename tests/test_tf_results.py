@@ -0,0 +1,56 @@
+import io
+import json
+import unittest
+from geopar.benchmark import read_shapes
+from geopar.run import Parser, CONSEQUENCE, BUDGET_EXCEEDED
+from geopar.tf_budget import TF_Budget
+from geopar.tf_results import TF_ResultsWriter, solve_to_record
+
+__author__ = 'ebraude'
+
+
+class TestTFResults(unittest.TestCase):
+
+    def setUp(self):
+        label, text = read_shapes()[4]  # generalized morley
+        self.label, self.tf = label, Parser('').read_configuration_from(io.StringIO(text))
+
+    def test_record(self):
+        record = solve_to_record(4, self.label, self.tf)
+        self.assertEqual(CONSEQUENCE, record['outcome'])
+        self.assertEqual('consequence', record['classification'])
+        self.assertEqual({'180': True, '360': True, 'pairing': True}, record['valid'])
+        self.assertEqual(len(self.tf.get_triangles()), len(record['angles']))
+        self.assertEqual([str(c) for c in self.tf.get_triangles()[0].get_angles()[2].get_coefficients()],
+                         record['angles'][0][2])
+        self.assertEqual(12, record['statistics']['deduced'])
+        self.assertIsNone(record['statistics']['iterations'])
+        self.assertNotIn('exceeded', record)
+
+    def test_same_as_with_budget(self):
+        # Only a run with a budget counts its iterations
+        budgeted = Parser('').read_configuration_from(io.StringIO(read_shapes()[4][1]))
+        record = solve_to_record(4, self.label, self.tf)
+        budgeted_record = solve_to_record(4, self.label, budgeted, budget=TF_Budget())
+        self.assertEqual(budgeted_record['angles'], record['angles'])
+        self.assertEqual(budgeted_record['statistics']['deduced'], record['statistics']['deduced'])
+        self.assertGreater(budgeted_record['statistics']['iterations'], 0)
+
+    def test_budget_exceeded(self):
+        record = solve_to_record(4, self.label, self.tf, budget=TF_Budget(iterations=1))
+        self.assertEqual(BUDGET_EXCEEDED, record['outcome'])
+        self.assertEqual('iterations', record['exceeded'])
+        self.assertIn(None, [angle for angles in record['angles'] for angle in angles])
+
+    def test_writer(self):
+        file = io.StringIO()
+        with TF_ResultsWriter(file) as writer:
+            writer.write(solve_to_record(4, self.label, self.tf))
+            writer.write({'index': 5})
+        lines = file.getvalue().split('\n')
+        self.assertEqual(['', 2], [lines[-1], writer.number_written])
+        self.assertEqual(self.label, json.loads(lines[0])['label'])
+
+
+if __name__ == '__main__':
+    unittest.main()
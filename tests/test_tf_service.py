@@ -0,0 +1,131 @@
+import asyncio
+import concurrent.futures
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from geopar.benchmark import read_shapes, hide_angles
+from geopar.run import Parser, UNIQUE, CONSEQUENCE, INCONCLUSIVE_1A, BUDGET_EXCEEDED
+from geopar.tf_client import TF_Client
+from geopar.tf_generator import TF_Generator
+from geopar.tf_service import TF_Service, figure_from_json, figure_to_json, solve_request
+
+__author__ = 'ebraude'
+
+
+class TestTFService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # A service with 2 workers on a Unix socket, in a thread of its own
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.directory.cleanup)
+        cls.path = os.path.join(cls.directory.name, 'geopar.sock')
+        cls.service, started = TF_Service(workers=2), threading.Event()
+        cls.loop = asyncio.new_event_loop()
+
+        def serve():
+            asyncio.set_event_loop(cls.loop)
+            cls.loop.run_until_complete(cls.service.start(cls.path))
+            started.set()
+            cls.loop.run_forever()
+
+        cls.thread = threading.Thread(target=serve, daemon=True)
+        cls.thread.start()
+        started.wait()
+
+    @classmethod
+    def tearDownClass(cls):
+        async def shut_down():
+            cls.service.close()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shut_down(), cls.loop).result()
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join()
+        cls.loop.close()
+
+    def setUp(self):
+        self.shapes = read_shapes()
+
+    def test_json_format(self):
+        tf = TF_Generator(seed=1).generate(20, unknown_ratio=0.3)
+        self.assertEqual(tf.get_id(), figure_from_json(figure_to_json(tf)).get_id())
+
+    def test_solve_request(self):
+        reply = solve_request({'figure': self.shapes[3][1]})
+        self.assertEqual('ok', reply['status'])
+        self.assertEqual(UNIQUE, reply['outcome'])
+        self.assertEqual(self.shapes[3][1].split('\n')[0], reply['figure'].split('\n')[0])
+
+        tf = Parser('').read_configuration_from(io.StringIO(self.shapes[0][1]))
+        reply = solve_request({'figure': figure_to_json(tf), 'pairing': False})
+        self.assertEqual(INCONCLUSIVE_1A, reply['outcome'])
+        self.assertEqual(len(tf.get_triangles()), len(reply['figure']['triangles']))
+
+        reply = solve_request({'figure': '1 3\n1, 2, 3; 60, 60, q + 60\n'})
+        self.assertEqual('error', reply['status'])
+
+    def test_pipelined(self):
+        with TF_Client(self.path) as client:
+            replies = client.solve_all([text for label, text in self.shapes])
+        self.assertEqual([CONSEQUENCE] * 3 + [UNIQUE] + [CONSEQUENCE] * 2, [r['outcome'] for r in replies])
+
+    def test_bad_request(self):
+        with TF_Client(self.path) as client:
+            client.file.write(b'not json\n')
+            client.file.flush()
+            self.assertEqual('error', client.receive()['status'])
+            self.assertEqual('ok', client.solve(self.shapes[3][1])['status'])
+
+    def test_bad_timeout(self):
+        with TF_Client(self.path) as client:
+            client.file.write(json.dumps({'id': 3, 'figure': self.shapes[3][1], 'timeout': '10'}).encode() + b'\n')
+            client.file.flush()
+            reply = client.receive()
+            self.assertEqual((3, 'error'), (reply['id'], reply['status']))
+            self.assertIn('timeout', reply['error'])
+            self.assertEqual('ok', client.solve(self.shapes[3][1])['status'])
+
+    def test_broken_pool(self):
+        # A request that cannot be submitted to the workers still gets its reply
+        class Writer(object):
+            def __init__(self):
+                self.lines = []
+
+            def write(self, a_line):
+                self.lines.append(a_line)
+
+            async def drain(self):
+                pass
+
+        service, writer = TF_Service(workers=1), Writer()
+        service.executor = concurrent.futures.ProcessPoolExecutor(1)
+        service.executor.shutdown()
+        asyncio.run(service.reply(json.dumps({'id': 4, 'figure': self.shapes[3][1]}).encode(), writer))
+        reply = json.loads(writer.lines[0])
+        self.assertEqual((4, 'error'), (reply['id'], reply['status']))
+
+    def test_timeout(self):
+        big = hide_angles(TF_Generator(seed=2).generate(1500), 0.5)
+        with TF_Client(self.path) as client:
+            reply = client.solve(figure_to_json(big), timeout=0.01)
+        self.assertEqual(BUDGET_EXCEEDED, reply['outcome'])
+        self.assertEqual('seconds', reply['exceeded'])
+        self.assertEqual(1500, len(reply['figure']['triangles']))
+
+    def test_budget(self):
+        tf = Parser('').read_configuration_from(io.StringIO(self.shapes[0][1]))
+        reply = solve_request({'figure': figure_to_json(tf), 'budget': {'deduced': 2}})
+        self.assertEqual(BUDGET_EXCEEDED, reply['outcome'])
+        self.assertEqual('deduced', reply['exceeded'])
+        self.assertEqual(2, reply['statistics']['deduced'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from geopar.angle_class import Angle
+from geopar.run import solve, UNIQUE
+from geopar.tf_generator import TF_Generator
+from geopar.tf_results import angles_to_json
+from geopar.tf_template import TF_Template
+from geopar.triangle_class import Triangle
+from geopar.triangulated_figure_class import TriangulatedFigure
+
+__author__ = 'ebraude'
+
+
+class TestTFTemplate(unittest.TestCase):
+
+    def setUp(self):
+        # As in test_triangulated_figure.py: interior points 4, 5, 6, all angles known
+        self.tf = TriangulatedFigure([Triangle([1, 2, 5], [20, 10, 150]), Triangle([5, 2, 6], [80, 10, 90]),
+                                      Triangle([6, 2, 3], [140, 10, 30]), Triangle([4, 6, 3], [80, 70, 30]),
+                                      Triangle([1, 4, 3], [20, 130, 30]), Triangle([1, 5, 4], [20, 70, 90]),
+                                      Triangle([4, 5, 6], [60, 60, 60])])
+        self.template = TF_Template(self.tf, 'seven')
+
+    def test_figure(self):
+        tf = self.template.figure(self.template.hiding([0, 20]))
+        self.assertFalse(tf.get_triangles()[0].get_angles()[0].is_known())
+        self.assertFalse(tf.get_triangles()[6].get_angles()[2].is_known())
+        self.assertEqual(19, sum(triangle.number_of_known() for triangle in tf.get_triangles()))
+        self.assertEqual([4, 5, 6], tf.get_interior_points())
+        self.assertRaises(Exception, self.template.figure, [Angle([60])])
+
+    def test_fans_are_those_of_the_figure(self):
+        tf = self.template.figure(self.template.premises)
+        expected, actual = self.tf.fans(), tf.fans()
+        self.assertEqual(list(expected), list(actual))
+        index_of = {id(triangle): t for t, triangle in enumerate(self.tf.get_triangles())}
+        index_in_variant = {id(triangle): t for t, triangle in enumerate(tf.get_triangles())}
+        for point in expected:
+            self.assertEqual(sorted((index_of[id(t)], f, p) for t, f, p in expected[point]),
+                             sorted((index_in_variant[id(t)], f, p) for t, f, p in actual[point]))
+
+    def test_variants_are_independent(self):
+        first, second = self.template.figure(self.template.hiding([0])), self.template.figure(self.template.hiding([1]))
+        solve(first)
+        self.assertFalse(second.get_triangles()[0].get_angles()[1].is_known())
+        self.assertTrue(self.template.premises[0].is_known())
+
+    def test_hidings(self):
+        vectors = list(self.template.hidings(2))
+        self.assertEqual(21 * 20 // 2, len(vectors))
+        self.assertEqual([None, None], vectors[0][:2])
+
+    def test_solve_all(self):
+        records = list(self.template.solve_all(self.template.hidings(1)))
+        self.assertEqual(list(range(21)), [record['index'] for record in records])
+        self.assertEqual({'seven'}, {record['label'] for record in records})
+        self.assertEqual({UNIQUE}, {record['outcome'] for record in records})
+        self.assertEqual(angles_to_json(self.tf), records[0]['angles'])
+
+    def test_solve_all_in_a_pool(self):
+        template = TF_Template(TF_Generator(seed=5).generate(60))
+        vectors = list(template.hidings(1))[:12]
+        sequential = list(template.solve_all(vectors))
+        pooled = list(template.solve_all(vectors, workers=2))
+        for record in sequential + pooled:
+            del record['statistics']
+        self.assertEqual(sequential, pooled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import multiprocessing
+import unittest
+from geopar.tf_elaborations_class import TF_Elaborations
+from geopar.tf_generator import TF_Generator
+from geopar.tf_topology import TF_Topology
+
+__author__ = 'ebraude'
+
+
+def known_after_rules(a_handle, some_angles):
+    # Worker: applies the 180 and 360 rules to its own angles on the shared topology
+
+    topology = TF_Topology.attach(a_handle)
+    tf = topology.figure(some_angles)
+    for _ in range(10):
+        TF_Elaborations.apply_180_rule_to(tf)
+        TF_Elaborations.apply_360_rule_to(tf)
+    result = sum(triangle.number_of_known() for triangle in tf.get_triangles())
+    topology.close()
+    return result
+
+
+class TestTFTopology(unittest.TestCase):
+
+    def setUp(self):
+        self.tf = TF_Generator(seed=4).generate(120, unknown_ratio=0.2)
+        self.topology = TF_Topology(self.tf)
+
+    def test_points(self):
+        self.assertEqual(sorted(self.tf.get_points()), self.topology.points())
+        self.assertEqual(sorted(self.tf.get_interior_points()), self.topology.interior_points())
+
+    def test_fans(self):
+        interior = self.topology.interior_points()
+        for point in self.tf.get_points():
+            expected = [id(t) for t in self.tf.triangles_at(point)]
+            actual = [id(self.tf.get_triangles()[t]) for t in self.topology.fan_of(point)]
+            if point in interior:  # a closed fan may start anywhere
+                k = actual.index(expected[0])
+                actual = actual[k:] + actual[:k]
+            self.assertEqual(expected, actual)
+
+    def test_edges(self):
+        edges = {frozenset(self.topology.edges[2 * e:2 * e + 2]) for e in range(len(self.topology.edges) // 2)}
+        self.assertEqual(len(self.topology.edges) // 2, len(edges))
+        # Euler characteristic of a disk
+        self.assertEqual(1, len(self.topology.vertex_ids) - len(edges) + self.topology.number_of_triangles)
+
+    def test_figure_uses_topology(self):
+        tf = self.topology.figure(TF_Topology.angles_of(self.tf))
+        self.assertEqual(self.tf.get_id(), tf.get_id())
+        self.assertEqual(self.topology.interior_points(), tf.get_interior_points())
+        self.assertRaises(Exception, self.topology.fan_of, -1)
+        tf.add(self.tf.get_triangles()[0])
+        self.assertIsNone(tf._topology)
+
+    def test_shared_memory(self):
+        with self.topology.share() as shared:
+            attached = TF_Topology.attach(shared.handle)
+            self.assertEqual(self.topology.interior_points(), attached.interior_points())
+            point = self.topology.interior_points()[0]
+            self.assertEqual(self.topology.fan_of(point), attached.fan_of(point))
+            with self.assertRaises(TypeError):
+                attached.fan_triangles[0] = 1
+            attached.close()
+
+    def test_workers(self):
+        angles = TF_Topology.angles_of(self.tf)
+        sequential = self.topology.figure(angles)
+        for _ in range(10):
+            TF_Elaborations.apply_180_rule_to(sequential)
+            TF_Elaborations.apply_360_rule_to(sequential)
+        expected = sum(triangle.number_of_known() for triangle in sequential.get_triangles())
+
+        with self.topology.share() as shared, multiprocessing.Pool(2) as pool:
+            results = pool.starmap(known_after_rules, [(shared.handle, angles)] * 2)
+        self.assertEqual([expected, expected], results)
+
+
+if __name__ == '__main__':
+    unittest.main()
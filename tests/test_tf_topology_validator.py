@@ -0,0 +1,61 @@
+import unittest
+from geopar.tf_generator import TF_Generator
+from geopar.tf_topology_validator import TF_TopologyValidator
+from geopar.triangle_class import Triangle
+from geopar.triangulated_figure_class import TriangulatedFigure
+
+__author__ = 'ebraude'
+
+
+def figure(*some_points):
+    # Returns: a TriangulatedFigure of equilateral triangles with some_points
+
+    return TriangulatedFigure([Triangle(list(points), [60, 60, 60]) for points in some_points])
+
+
+class TestTFTopologyValidator(unittest.TestCase):
+
+    def test_valid(self):
+        self.assertEqual([], TF_TopologyValidator.errors(TF_Generator(seed=2).generate(500)))
+        self.assertEqual([], TF_TopologyValidator.errors(figure((1, 2, 3))))
+        TF_TopologyValidator.check(figure((1, 2, 3), (3, 2, 4)))
+
+    def test_points(self):
+        errors = TF_TopologyValidator.errors(figure((1, 1, 2), (1, 2, 3), (3, 1, 2)))
+        self.assertEqual(['triangle 0 (1, 1, 2) does not have three distinct points.',
+                          'triangle 2 (3, 1, 2) has the same points as triangle 1 (1, 2, 3).'], errors)
+
+    def test_orientation(self):
+        errors = TF_TopologyValidator.errors(figure((1, 2, 3), (3, 2, 4), (2, 4, 5)))
+        self.assertEqual(['triangle 1 (3, 2, 4) and triangle 2 (2, 4, 5) both have the edge 2->4: '
+                          'one of them is not clockwise, or they overlap.'], errors)
+
+    def test_two_fans_at_a_point(self):
+        # a bow tie: two fans at 1, on which triangles_at() used to loop forever
+        tf = figure((1, 2, 3), (1, 3, 4), (1, 5, 6), (1, 6, 7))
+        self.assertEqual(['The triangles at point 1 do not form one fan: triangle 2 (1, 5, 6), '
+                          'triangle 3 (1, 6, 7) not joined to triangle 1 (1, 3, 4).'], TF_TopologyValidator.errors(tf))
+        self.assertRaises(Exception, tf.triangles_at, 1)
+        self.assertRaisesRegex(Exception, 'Not a triangulated disk', TF_TopologyValidator.check, tf)
+
+    def test_connected(self):
+        errors = TF_TopologyValidator.errors(figure((1, 2, 3), (4, 5, 6)))
+        self.assertEqual(['The figure is not connected: triangle 1 (4, 5, 6) cannot be reached from '
+                          'triangle 0 (1, 2, 3).'], errors)
+
+    def test_euler(self):
+        tetrahedron = figure((1, 2, 3), (1, 3, 4), (1, 4, 2), (2, 4, 3))
+        self.assertIn('Euler characteristic is 2, not 1: it has no boundary',
+                      TF_TopologyValidator.errors(tetrahedron)[0])
+
+        # the fan of an interior point whose neighbours are interior as well, taken out, leaves a hole
+        tf = TF_Generator(seed=2).generate(200)
+        interior = set(tf.get_interior_points())
+        point = next(p for p in sorted(interior)
+                     if all(q in interior for t in tf.triangles_at(p) for q in t.get_points() if q != p))
+        holed = TriangulatedFigure([t for t in tf.get_triangles() if not t.has_point(point)])
+        self.assertIn('Euler characteristic is 0, not 1: it has holes', TF_TopologyValidator.errors(holed)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import io
+import unittest
+from geopar.benchmark import hide_angles
+from geopar.run import solve
+from geopar.tf_generator import TF_Generator
+from geopar.tf_writer import TF_Writer
+
+__author__ = 'ebraude'
+
+
+class TestTFWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tf = hide_angles(TF_Generator(seed=4).generate(60), 0.3)
+
+    def test_write_figure(self):
+        for buffer_size in [1, 100, 1 << 16]:
+            file = io.StringIO()
+            with TF_Writer(file, buffer_size=buffer_size, cache_size=10) as writer:
+                writer.write_figure(self.tf)
+            self.assertEqual(str(self.tf), file.getvalue())
+
+    def test_buffered(self):
+        file = io.StringIO()
+        writer = TF_Writer(file, buffer_size=1 << 16)
+        writer.write_figure(self.tf)
+        self.assertEqual('', file.getvalue())
+        writer.flush()
+        self.assertEqual(str(self.tf), file.getvalue())
+
+    def test_write_changes(self):
+        premises = TF_Writer.premises(self.tf)
+        unknown = sum(3 - triangle.number_of_known() for triangle in self.tf.get_triangles())
+        solve(self.tf)
+        deduced = unknown - sum(3 - triangle.number_of_known() for triangle in self.tf.get_triangles())
+
+        file = io.StringIO()
+        with TF_Writer(file) as writer:
+            self.assertEqual(deduced, writer.write_changes(self.tf, premises))
+        lines = file.getvalue().split('\n')[:-1]
+        self.assertEqual(deduced, len(lines))
+        p1, p2, p3 = map(int, lines[0][2:lines[0].index(')')].split(','))
+        self.assertEqual(lines[0].split(' = ')[1], str(self.tf.get_angle_by_angle_points(p1, p2, p3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -86,6 +86,23 @@ class TestTFPreprocessor(unittest.TestCase):
 
         self.assertTrue(True)
 
+    def test_pairing_at(self):
+        # at 4, the angles following are 60, 70, 30, 20 and those preceding 60, 30, 20, 70
+        self.tf1.set_angle_by_angle_points(4, 6, 3, Angle.from_str('x'))
+        self.tf1.set_angle_by_angle_points(1, 5, 4, Angle.from_str('x'))
+        self.assertEqual(TF_Elaborations.apply_pairing_at(self.tf1, 4), [[4, 6, 3], [1, 5, 4]])
+        self.assertEqual(self.tf1.get_angle_by_angle_points(4, 6, 3), 70)
+        self.assertEqual(self.tf1.get_angle_by_angle_points(1, 5, 4), 70)
+
+    def test_pairing_at_compares_multisets(self):
+        # the known angles following (60, 30, 30) and preceding (60, 30, 60) are the same set, but do not pair
+        self.tf1.set_angle_by_angle_points(4, 6, 3, Angle.from_str('x'))
+        self.tf1.set_angle_by_angle_points(1, 5, 4, Angle.from_str('x'))
+        self.t6.set_angle_by_index(0, Angle([30]))
+        self.t5.set_angle_by_index(0, Angle([60]))
+        self.assertEqual(TF_Elaborations.apply_pairing_at(self.tf1, 4), [])
+        self.assertFalse(self.tf1.get_angle_by_angle_points(4, 6, 3).is_known())
+
     def test_theorem_3(self):
         preprocessor = TF_Elaborations()
         print('original:')
@@ -1,3 +1,5 @@
+import pickle
+import tracemalloc
 import unittest
 from geopar.triangle_class import Triangle
 from geopar.angle_class import Angle
@@ -41,13 +43,29 @@ class TestTriangle(unittest.TestCase):
         self.assertEqual(hash(self.triangle3), hash(self.triangle3))  # c == c
         self.assertEqual(hash(self.triangle3), hash(self.triangle3a))  # c == d
 
+    def test_hash_after_change(self):
+        triangle = Triangle([1, 2, 3], [20, 30, 130])
+        before = hash(triangle)
+        triangle.set_angle_by_point(2, Angle.from_str('x'))
+        self.assertNotEqual(before, hash(triangle))
+        triangle.complete_unknown_angle()
+        self.assertEqual(before, hash(triangle))
+        triangle.set_angle_by_index(0, 30)
+        self.assertEqual(hash(Triangle([1, 2, 3], [30, 30, 130])), hash(triangle))
+
+    def test_pickle(self):
+        copied = pickle.loads(pickle.dumps(self.triangle2))
+        self.assertEqual(self.triangle2.get_points(), copied.get_points())
+        self.assertEqual(2, copied.number_of_known())
+        self.assertEqual(hash(self.triangle2), hash(copied))
+
     def test_get_angles(self):
         self.assertTrue(20 in self.triangle0.get_angles())
         self.assertTrue(30 in self.triangle1.get_angles())
         self.assertTrue(Angle.from_str('30 40 110') in self.triangle2.get_angles())
 
     def test_get_points(self):
-        self.assertEqual(self.triangle0.get_points(), [1, 2, 3])
+        self.assertEqual(self.triangle0.get_points(), (1, 2, 3))
         self.assertTrue(77 in self.triangle1.get_points())
         self.assertFalse(78 in self.triangle1.get_points())
 
@@ -95,6 +113,11 @@ class TestTriangle(unittest.TestCase):
         self.assertTrue(self.triangle0.has_all_points([1, 2, 3]))
         self.assertTrue(self.triangle1.has_all_points([1, 2, 77]))
 
+    def test_has_all_points_other_sets(self):
+        self.assertFalse(self.triangle0.has_all_points([1, 2, 4]))
+        self.assertFalse(self.triangle0.has_all_points([1, 2]))
+        self.assertFalse(self.triangle0.has_all_points([1, 2, 3, 4]))
+
     def test_has_unknown(self):
         self.assertFalse(self.triangle0.has_unknown_angle())
         self.assertTrue(self.triangle2.has_unknown_angle())
@@ -126,6 +149,50 @@ class TestTriangle(unittest.TestCase):
         with self.assertRaises(Exception):
             self.triangle1.set_angle_by_index(3)
 
+    def test_known_kept_up_to_date(self):
+        triangle = Triangle([1, 2, 3], [20, 30, 130])
+        triangle.set_angle_by_point(2, Angle.from_str('x'))
+        self.assertEqual(2, triangle.number_of_known())
+        self.assertTrue(triangle.has_unknown_angle())
+        triangle.set_angle_by_index(0, Angle([]))
+        self.assertEqual(1, triangle.number_of_known())
+        triangle.set_angle_by_index(0, 20)
+        self.assertIsInstance(triangle.angle_of_point(1), Angle)
+        triangle.complete_unknown_angle()
+        self.assertEqual(30, triangle.angle_of_point(2))
+        self.assertFalse(triangle.has_unknown_angle())
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            self.triangle0.colour = 'red'
+
+    def test_size(self):
+        # Bytes per Triangle, without its Angles: the Triangle of the original (non-slotted) class took 360
+        angles = [Angle([60]), Angle([60]), Angle([60])]
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            triangles = [Triangle([3 * i, 3 * i + 1, 3 * i + 2], angles) for i in range(5000)]
+            size = (tracemalloc.get_traced_memory()[0] - before) / len(triangles)
+        finally:
+            tracemalloc.stop()
+        self.assertLess(size, 360)
+
+    def test_listeners(self):
+        changes = []
+
+        def listener(triangle, i, replaced):
+            changes.append((i, replaced))
+
+        self.assertIsNone(self.triangle0.listeners)
+        self.triangle0.add_listener(listener)
+        self.triangle0.set_angle_by_index(0, 30)
+        self.assertEqual([(0, Angle([20]))], changes)
+        self.triangle0.remove_listener(listener)
+        self.assertIsNone(self.triangle0.listeners)
+        self.triangle0.set_angle_by_index(0, 20)
+        self.assertEqual(1, len(changes))
+
     def test_sum_of_known_angles(self):
         self.assertEqual(self.triangle0.sum_of_known_angles(), Angle([180]))
         self.assertEqual(self.triangle2.sum_of_known_angles(), Angle([90, 100, 170]))
@@ -140,3 +140,17 @@ class TestTriangulatedFigure(unittest.TestCase):
         self.tf1.set_angle_by_angle_points(1, 4, 3, Angle.from_str('x'))
         self.tf1.make_angles_known_at(4)
         self.assertEqual(self.tf1.get_angle_by_angle_points(1, 4, 3), 130)
+
+    def test_fans(self):
+        fans = self.tf1.fans()
+        self.assertEqual(sorted(fans), sorted(self.tf1.get_interior_points()))
+        for point, fan in fans.items():
+            self.assertEqual([t for t, following, preceding in fan], self.tf1.triangles_at(point))
+            for t, following, preceding in fan:
+                self.assertEqual(t.points[following], t.point_following(point))
+                self.assertEqual(t.points[preceding], t.point_preceding(point))
+
+        # the records are kept until add()
+        self.assertIs(self.tf1.fans(), fans)
+        self.tf1.add(Triangle([1, 3, 7], [60, 60, 60]))
+        self.assertIsNot(self.tf1.fans(), fans)